@@ -1,77 +1,96 @@
 # Hoist all functions to the top level
-from .maps import (
-    create_map,
-    delete_map,
-    get_map,
-    update_map,
-    move_map,
-    create_embed_token,
-    add_source_layer,
-    duplicate_map,
-    # Deprecated
-    get_map_details,
-)
-from .exceptions import AuthError
-from .layers import (
-    list_layers,
-    upload_file,
-    upload_geodataframe,
-    upload_dataframe,
-    upload_url,
-    refresh_file_layer,
-    refresh_url_layer,
-    get_layer,
-    update_layer_style,
-    get_export_link,
-    download_layer,
-    update_layers,
-    delete_layer,
-    publish_layer,
-    create_custom_export,
-    get_custom_export_status,
-    duplicate_layers,
-    # Deprecated
-    get_layer_details,
-)
+from .cache import ResponseCache
+from .client import FeltClient
+from .columnar import ColumnarFeatures
+from .comments import delete_comment, export_comments, resolve_comment
+from .diskcache import DiskCache
 from .elements import (
-    list_elements,
-    list_element_groups,
-    upsert_elements,
     delete_element,
+    diff_elements,
     get_element_group,
-    upsert_element_groups,
+    iter_element_group,
+    iter_elements,
+    list_element_groups,
+    list_elements,
+    list_elements_in_group,
+    post_element_group,
     # Deprecated:
     post_elements,
-    post_element_group,
-    list_elements_in_group,
+    sync_elements,
+    upsert_element_groups,
+    upsert_elements,
+    upsert_elements_batched,
 )
+from .exceptions import AuthError, BatchError, ExportError
+from .exports import ExportFuture, ExportManager, export_layers
 from .layer_groups import (
-    list_layer_groups,
+    delete_layer_group,
     get_layer_group,
+    list_layer_groups,
+    publish_layer_group,
     update_layer_group,
     update_layer_groups,
-    delete_layer_group,
-    publish_layer_group,
 )
+from .layers import (
+    create_custom_export,
+    delete_layer,
+    download_custom_export,
+    download_layer,
+    duplicate_layers,
+    get_custom_export_status,
+    get_export_link,
+    get_layer,
+    # Deprecated
+    get_layer_details,
+    list_layers,
+    publish_layer,
+    refresh_file_layer,
+    refresh_url_layer,
+    update_layer_style,
+    update_layers,
+    upload_dataframe,
+    upload_file,
+    upload_files,
+    upload_geodataframe,
+    upload_url,
+    wait_for_layers,
+)
+from .library import list_library_layers
+from .manifest import UploadManifest
+from .maps import (
+    add_source_layer,
+    create_embed_token,
+    create_map,
+    delete_map,
+    duplicate_map,
+    get_map,
+    # Deprecated
+    get_map_details,
+    move_map,
+    update_map,
+)
+from .models import Layer, LayerGroup, Map
+from .pool import ConnectionPool
 from .projects import (
-    list_projects,
     create_project,
+    delete_project,
     get_project,
+    list_projects,
     update_project,
-    delete_project,
 )
+from .ratelimit import RateLimiter
+from .retry import Retry
 from .sources import (
-    list_sources,
     create_source,
-    get_source,
-    update_source,
     delete_source,
+    get_source,
+    list_sources,
     sync_source,
+    update_source,
 )
-from .library import list_library_layers
-from .comments import export_comments, resolve_comment, delete_comment
 from .user import get_current_user
 
+
 __doc__ = """
 The official Python client for the Felt API
 ===========================================
@@ -84,74 +103,87 @@ refreshing files and (Geo)DataFrames or updating layer styles and element proper
 """
 
 __all__ = [
-    # Maps
+    "AuthError",
+    "BatchError",
+    "ColumnarFeatures",
+    "ConnectionPool",
+    "DiskCache",
+    "ExportError",
+    "ExportFuture",
+    "ExportManager",
+    "FeltClient",
+    "Layer",
+    "LayerGroup",
+    "Map",
+    "RateLimiter",
+    "ResponseCache",
+    "Retry",
+    "UploadManifest",
+    "add_source_layer",
+    "create_custom_export",
+    "create_embed_token",
     "create_map",
+    "create_project",
+    "create_source",
+    "delete_comment",
+    "delete_element",
+    "delete_layer",
+    "delete_layer_group",
     "delete_map",
-    "update_map",
-    "move_map",
-    "create_embed_token",
-    "add_source_layer",
+    "delete_project",
+    "delete_source",
+    "diff_elements",
+    "download_custom_export",
+    "download_layer",
+    "duplicate_layers",
     "duplicate_map",
+    "export_comments",
+    "export_layers",
+    "get_current_user",
+    "get_custom_export_status",
+    "get_element_group",
+    "get_export_link",
+    "get_layer",
+    "get_layer_details",
+    "get_layer_group",
     "get_map",
-    # Layers
+    "get_map_details",
+    "get_project",
+    "get_source",
+    "iter_element_group",
+    "iter_elements",
+    "list_element_groups",
+    "list_elements",
+    "list_elements_in_group",
+    "list_layer_groups",
     "list_layers",
-    "upload_file",
-    "upload_geodataframe",
-    "upload_dataframe",
-    "upload_url",
+    "list_library_layers",
+    "list_projects",
+    "list_sources",
+    "move_map",
+    "post_element_group",
+    "post_elements",
+    "publish_layer",
+    "publish_layer_group",
     "refresh_file_layer",
     "refresh_url_layer",
-    "get_layer",
-    "update_layer_style",
-    "get_export_link",
-    "download_layer",
-    "update_layers",
-    "delete_layer",
-    "publish_layer",
-    "create_custom_export",
-    "get_custom_export_status",
-    "duplicate_layers",
-    # Layer groups
-    "list_layer_groups",
-    "get_layer_group",
+    "resolve_comment",
+    "sync_elements",
+    "sync_source",
     "update_layer_group",
     "update_layer_groups",
-    "delete_layer_group",
-    "publish_layer_group",
-    # Elements
-    "list_elements",
-    "list_element_groups",
-    "get_element_group",
-    "upsert_elements",
-    "delete_element",
-    "upsert_element_groups",
-    # Projects
-    "list_projects",
-    "create_project",
-    "get_project",
+    "update_layer_style",
+    "update_layers",
+    "update_map",
     "update_project",
-    "delete_project",
-    # Sources
-    "list_sources",
-    "create_source",
-    "get_source",
     "update_source",
-    "delete_source",
-    "sync_source",
-    # Library
-    "list_library_layers",
-    # Comments
-    "export_comments",
-    "resolve_comment",
-    "delete_comment",
-    # User
-    "get_current_user",
-    # Exceptions
-    "AuthError",
-    # Deprecated
-    "post_elements",
-    "post_element_group",
-    "get_map_details",
-    "get_layer_details",
-    "list_elements_in_group",
+    "upload_dataframe",
+    "upload_file",
+    "upload_files",
+    "upload_geodataframe",
+    "upload_url",
+    "upsert_element_groups",
+    "upsert_elements",
+    "upsert_elements_batched",
+    "wait_for_layers",
 ]
@@ -0,0 +1,156 @@
+# Hoist all coroutine functions to the top level
+from .client import AsyncFeltClient
+from .comments import delete_comment, export_comments, resolve_comment
+from .elements import (
+    delete_element,
+    diff_elements,
+    get_element_group,
+    iter_element_group,
+    iter_elements,
+    list_element_groups,
+    list_elements,
+    sync_elements,
+    upsert_element_groups,
+    upsert_elements,
+    upsert_elements_batched,
+)
+from .layer_groups import (
+    delete_layer_group,
+    get_layer_group,
+    list_layer_groups,
+    publish_layer_group,
+    update_layer_group,
+    update_layer_groups,
+)
+from .layers import (
+    create_custom_export,
+    delete_layer,
+    download_custom_export,
+    download_layer,
+    duplicate_layers,
+    get_custom_export_status,
+    get_export_link,
+    get_layer,
+    list_layers,
+    publish_layer,
+    refresh_file_layer,
+    refresh_url_layer,
+    update_layer_style,
+    update_layers,
+    upload_dataframe,
+    upload_file,
+    upload_files,
+    upload_geodataframe,
+    upload_url,
+    wait_for_layers,
+)
+from .library import list_library_layers
+from .maps import (
+    add_source_layer,
+    create_embed_token,
+    create_map,
+    delete_map,
+    duplicate_map,
+    get_map,
+    move_map,
+    update_map,
+)
+from .pool import AsyncConnectionPool
+from .projects import (
+    create_project,
+    delete_project,
+    get_project,
+    list_projects,
+    update_project,
+)
+from .sources import (
+    create_source,
+    delete_source,
+    get_source,
+    list_sources,
+    sync_source,
+    update_source,
+)
+from .user import get_current_user
+
+
+__doc__ = """
+Async client for the Felt API
+=============================
+
+Coroutine versions of every function in `felt_python`, sent through a
+non-blocking connection pool so that many calls can run concurrently on one
+event loop.
+
+    import asyncio
+    from felt_python import aio
+
+    async def main():
+        maps = await asyncio.gather(*(aio.get_map(map_id) for map_id in map_ids))
+"""
+
+__all__ = [
+    "AsyncConnectionPool",
+    "AsyncFeltClient",
+    "add_source_layer",
+    "create_custom_export",
+    "create_embed_token",
+    "create_map",
+    "create_project",
+    "create_source",
+    "delete_comment",
+    "delete_element",
+    "delete_layer",
+    "delete_layer_group",
+    "delete_map",
+    "delete_project",
+    "delete_source",
+    "diff_elements",
+    "download_custom_export",
+    "download_layer",
+    "duplicate_layers",
+    "duplicate_map",
+    "export_comments",
+    "get_current_user",
+    "get_custom_export_status",
+    "get_element_group",
+    "get_export_link",
+    "get_layer",
+    "get_layer_group",
+    "get_map",
+    "get_project",
+    "get_source",
+    "iter_element_group",
+    "iter_elements",
+    "list_element_groups",
+    "list_elements",
+    "list_layer_groups",
+    "list_layers",
+    "list_library_layers",
+    "list_projects",
+    "list_sources",
+    "move_map",
+    "publish_layer",
+    "publish_layer_group",
+    "refresh_file_layer",
+    "refresh_url_layer",
+    "resolve_comment",
+    "sync_elements",
+    "sync_source",
+    "update_layer_group",
+    "update_layer_groups",
+    "update_layer_style",
+    "update_layers",
+    "update_map",
+    "update_project",
+    "update_source",
+    "upload_dataframe",
+    "upload_file",
+    "upload_files",
+    "upload_geodataframe",
+    "upload_url",
+    "upsert_element_groups",
+    "upsert_elements",
+    "upsert_elements_batched",
+    "wait_for_layers",
+]
@@ -0,0 +1,65 @@
+"""Wrapper for async API calls"""
+
+import contextvars
+import threading
+import typing
+
+from ..codec import decode_json, encode_json, load_json  # noqa: F401
+from ..pool import Response
+from .pool import AsyncStreamingResponse
+
+
+if typing.TYPE_CHECKING:
+    from .client import AsyncFeltClient
+
+
+# Client used by the module-level coroutines, see `felt_python.api.current_client`
+current_client: contextvars.ContextVar["AsyncFeltClient | None"] = (
+    contextvars.ContextVar("felt_async_client", default=None)
+)
+_default_client: "AsyncFeltClient | None" = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> "AsyncFeltClient":
+    """Return the client used by module-level coroutines, creating it if needed"""
+    global _default_client
+    if _default_client is None:
+        from .client import AsyncFeltClient
+
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = AsyncFeltClient()
+    return _default_client
+
+
+def set_default_client(client: "AsyncFeltClient | None"):
+    """Replace the client used by module-level coroutines"""
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
+
+
+def get_client() -> "AsyncFeltClient":
+    """Return the client that requests in the current context should use"""
+    return current_client.get() or get_default_client()
+
+
+async def make_request(
+    url: str,
+    method: typing.Literal["GET", "POST", "PATCH", "DELETE"],
+    json: dict | list | bytes | None = None,
+    api_token: str | None = None,
+) -> Response:
+    """Basic wrapper for async requests that adds auth"""
+    return await get_client().request(url, method, json=json, api_token=api_token)
+
+
+async def stream_request(
+    url: str,
+    method: typing.Literal["GET", "POST", "PATCH", "DELETE"] = "GET",
+    json: dict | list | bytes | None = None,
+    api_token: str | None = None,
+) -> AsyncStreamingResponse:
+    """Like `make_request`, but the response body is read on demand"""
+    return await get_client().stream(url, method, json=json, api_token=api_token)
@@ -0,0 +1,309 @@
+"""Reusable async client session"""
+
+import asyncio
+import functools
+import inspect
+import typing
+import urllib.error
+
+from ..cache import ResponseCache
+from ..client import BaseClient
+from ..compression import COMPRESSION_THRESHOLD
+from ..diskcache import DiskCache
+from ..pool import Response
+from ..ratelimit import RateLimiter
+from ..retry import Retry
+from ..singleflight import AsyncSingleFlight
+from . import (
+    api,
+    comments,
+    elements,
+    layer_groups,
+    layers,
+    library,
+    maps,
+    projects,
+    sources,
+    user,
+)
+from .pool import AsyncConnectionPool, AsyncStreamingResponse
+
+
+P = typing.ParamSpec("P")
+R = typing.TypeVar("R")
+
+
+def _method(
+    func: typing.Callable[P, typing.Awaitable[R]],
+) -> typing.Callable[
+    typing.Concatenate["AsyncFeltClient", P],
+    typing.Coroutine[typing.Any, typing.Any, R],
+]:
+    """Expose a module-level coroutine function as an AsyncFeltClient method"""
+    if inspect.isasyncgenfunction(func):
+        return _generator_method(func)
+
+    @functools.wraps(func)
+    async def method(self: "AsyncFeltClient", *args: P.args, **kwargs: P.kwargs) -> R:
+        token = api.current_client.set(self)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            api.current_client.reset(token)
+
+    return method
+
+
+def _generator_method(func):
+    """Expose an async generator function as a method, using the client while it runs"""
+
+    @functools.wraps(func)
+    async def method(self: "AsyncFeltClient", *args, **kwargs):
+        iterator = func(*args, **kwargs)
+        try:
+            while True:
+                token = api.current_client.set(self)
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    api.current_client.reset(token)
+                yield item
+        finally:
+            await iterator.aclose()
+
+    return method
+
+
+class AsyncFeltClient(BaseClient):
+    """Async session for the Felt API
+
+    The asyncio counterpart of `felt_python.FeltClient`: every API function is
+    available as a coroutine method, e.g. `await client.create_map(...)`.
+
+    Args:
+        api_token: API token to authenticate with. Defaults to the
+            FELT_API_TOKEN environment variable.
+        base_url: Base URL of the API. Defaults to the FELT_BASE_URL
+            environment variable or the production API.
+        pool: Connection pool to send requests through. A new pool is
+            created if not provided.
+        retry: Policy for retrying failed requests, see `felt_python.FeltClient`
+        rate_limit: Optional rate limiter that requests wait for before being
+            sent. Share one between clients to limit them together.
+        compression: Content-Encoding to compress JSON request bodies with
+        compression_threshold: Minimum size in bytes of a request body for it
+            to be compressed
+        cache: Optional cache for the responses of GET requests
+        disk_cache: Optional persistent cache for library listings and
+            downloaded layers
+        coalesce: Whether concurrent identical GET requests share a single
+            request
+    """
+
+    def __init__(
+        self,
+        api_token: str | None = None,
+        base_url: str | None = None,
+        pool: AsyncConnectionPool | None = None,
+        retry: Retry | None = None,
+        rate_limit: RateLimiter | None = None,
+        compression: typing.Literal["gzip", "zstd"] | None = None,
+        compression_threshold: int = COMPRESSION_THRESHOLD,
+        cache: ResponseCache | None = None,
+        disk_cache: DiskCache | None = None,
+        coalesce: bool = False,
+    ):
+        super().__init__(
+            api_token,
+            base_url,
+            retry,
+            rate_limit,
+            compression,
+            compression_threshold,
+            cache,
+            disk_cache,
+        )
+        self.pool = pool or AsyncConnectionPool()
+        self.single_flight = AsyncSingleFlight() if coalesce else None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close all idle connections held by the client"""
+        self.pool.clear()
+
+    async def request(
+        self,
+        url: str,
+        method: typing.Literal["GET", "POST", "PATCH", "DELETE"],
+        json: dict | list | bytes | None = None,
+        api_token: str | None = None,
+    ) -> Response:
+        """Send an authenticated request to the API, retrying if needed"""
+        return await self._request(url, method, json, api_token, stream=False)
+
+    async def stream(
+        self,
+        url: str,
+        method: typing.Literal["GET", "POST", "PATCH", "DELETE"] = "GET",
+        json: dict | list | bytes | None = None,
+        api_token: str | None = None,
+    ) -> AsyncStreamingResponse:
+        """Send an authenticated request and return a response read on demand
+
+        Only opening the response is retried. Close the response, or use it as
+        a context manager, to release its connection.
+        """
+        return await self._request(url, method, json, api_token, stream=True)
+
+    async def _request(self, url, method, json, api_token, stream):
+        url, data, headers = self.prepare_request(url, json, api_token)
+        if method != "GET" or stream:
+            try:
+                return await self._retrying(method, url, data, headers, stream)
+            finally:
+                path = self.cache_path(url)
+                if method != "GET" and path is not None and self.cache is not None:
+                    self.cache.invalidate(path)
+        if self.single_flight is None:
+            return await self._get(url, headers)
+        key = (url, headers["Authorization"])
+        response, shared = await self.single_flight.do(key, self._get, url, headers)
+        return self.shared_response(response) if shared else response
+
+    async def _get(self, url, headers):
+        path = self.cache_path(url)
+        if path is None:
+            return await self._retrying("GET", url, None, headers, False)
+        cached, entry = await self._cache_call(url, self.cached_response, url, headers)
+        if cached is not None:
+            return cached
+        try:
+            response = await self._retrying("GET", url, None, headers, False)
+        except urllib.error.HTTPError as exc:
+            if exc.code != 304 or entry is None:
+                raise
+            return await self._cache_call(
+                url, self.not_modified, url, path, headers, entry, exc.headers
+            )
+        await self._cache_call(url, self.store_response, url, path, headers, response)
+        return response
+
+    async def _cache_call(self, url, function, *args):
+        """Call a cache method, in a worker thread if it may use the disk cache
+
+        The disk cache runs SQLite queries and file I/O, which would block the
+        event loop.
+        """
+        if self.disk_cache is not None and self.disk_cache.handles(url):
+            return await asyncio.to_thread(function, *args)
+        return function(*args)
+
+    async def _retrying(self, method, url, data, headers, stream):
+        attempt = 1
+        while True:
+            try:
+                response = await self._send(method, url, data, headers, stream)
+                return self.decode_response(response)
+            except urllib.error.URLError as exc:
+                delay = self.retry.get_delay(method, attempt, exc)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _send(self, method, url, data, headers, stream):
+        send = self.pool.stream if stream else self.pool.urlopen
+        if self.rate_limit is None:
+            return await send(method, url, body=data, headers=headers)
+
+        key = headers["Authorization"]
+        await self.rate_limit.acquire_async(key)
+        try:
+            response = await send(method, url, body=data, headers=headers)
+        except urllib.error.HTTPError as exc:
+            await self.rate_limit.release_async(key, exc.headers, exc.code)
+            raise
+        except BaseException:
+            self.rate_limit.release(key)
+            raise
+        # Streamed bodies are read later, the request counts as done once open
+        await self.rate_limit.release_async(key, response.headers, response.status)
+        return response
+
+    # Maps
+    create_map = _method(maps.create_map)
+    delete_map = _method(maps.delete_map)
+    get_map = _method(maps.get_map)
+    update_map = _method(maps.update_map)
+    move_map = _method(maps.move_map)
+    create_embed_token = _method(maps.create_embed_token)
+    add_source_layer = _method(maps.add_source_layer)
+    duplicate_map = _method(maps.duplicate_map)
+    # Layers
+    list_layers = _method(layers.list_layers)
+    upload_file = _method(layers.upload_file)
+    upload_files = _method(layers.upload_files)
+    upload_geodataframe = _method(layers.upload_geodataframe)
+    upload_dataframe = _method(layers.upload_dataframe)
+    upload_url = _method(layers.upload_url)
+    refresh_file_layer = _method(layers.refresh_file_layer)
+    refresh_url_layer = _method(layers.refresh_url_layer)
+    get_layer = _method(layers.get_layer)
+    wait_for_layers = _method(layers.wait_for_layers)
+    update_layer_style = _method(layers.update_layer_style)
+    get_export_link = _method(layers.get_export_link)
+    download_layer = _method(layers.download_layer)
+    update_layers = _method(layers.update_layers)
+    delete_layer = _method(layers.delete_layer)
+    publish_layer = _method(layers.publish_layer)
+    create_custom_export = _method(layers.create_custom_export)
+    get_custom_export_status = _method(layers.get_custom_export_status)
+    download_custom_export = _method(layers.download_custom_export)
+    duplicate_layers = _method(layers.duplicate_layers)
+    # Layer groups
+    list_layer_groups = _method(layer_groups.list_layer_groups)
+    get_layer_group = _method(layer_groups.get_layer_group)
+    update_layer_group = _method(layer_groups.update_layer_group)
+    update_layer_groups = _method(layer_groups.update_layer_groups)
+    delete_layer_group = _method(layer_groups.delete_layer_group)
+    publish_layer_group = _method(layer_groups.publish_layer_group)
+    # Elements
+    list_elements = _method(elements.list_elements)
+    iter_elements = _method(elements.iter_elements)
+    list_element_groups = _method(elements.list_element_groups)
+    get_element_group = _method(elements.get_element_group)
+    iter_element_group = _method(elements.iter_element_group)
+    upsert_elements = _method(elements.upsert_elements)
+    upsert_elements_batched = _method(elements.upsert_elements_batched)
+    diff_elements = _method(elements.diff_elements)
+    sync_elements = _method(elements.sync_elements)
+    delete_element = _method(elements.delete_element)
+    upsert_element_groups = _method(elements.upsert_element_groups)
+    # Projects
+    list_projects = _method(projects.list_projects)
+    create_project = _method(projects.create_project)
+    get_project = _method(projects.get_project)
+    update_project = _method(projects.update_project)
+    delete_project = _method(projects.delete_project)
+    # Sources
+    list_sources = _method(sources.list_sources)
+    create_source = _method(sources.create_source)
+    get_source = _method(sources.get_source)
+    update_source = _method(sources.update_source)
+    delete_source = _method(sources.delete_source)
+    sync_source = _method(sources.sync_source)
+    # Library
+    list_library_layers = _method(library.list_library_layers)
+    # Comments
+    export_comments = _method(comments.export_comments)
+    resolve_comment = _method(comments.resolve_comment)
+    delete_comment = _method(comments.delete_comment)
+    # User
+    get_current_user = _method(user.get_current_user)
@@ -0,0 +1,39 @@
+"""Comments
+
+Async versions of the functions in `felt_python.comments`.
+"""
+
+from ..comments import COMMENT, COMMENT_EXPORT, COMMENT_RESOLVE
+from .api import load_json, make_request
+
+
+async def export_comments(
+    map_id: str, format: str = "json", api_token: str | None = None
+):
+    """Export comments from a map"""
+    url = f"{COMMENT_EXPORT.format(map_id=map_id)}?format={format}"
+    response = await make_request(
+        url=url,
+        method="GET",
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def resolve_comment(map_id: str, comment_id: str, api_token: str | None = None):
+    """Resolve a comment"""
+    response = await make_request(
+        url=COMMENT_RESOLVE.format(map_id=map_id, comment_id=comment_id),
+        method="POST",
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def delete_comment(map_id: str, comment_id: str, api_token: str | None = None):
+    """Delete a comment"""
+    await make_request(
+        url=COMMENT.format(map_id=map_id, comment_id=comment_id),
+        method="DELETE",
+        api_token=api_token,
+    )
@@ -0,0 +1,251 @@
+"""Elements and element groups
+
+Async versions of the functions in `felt_python.elements`.
+"""
+
+import asyncio
+import typing
+
+from ..columnar import ColumnarBuilder
+from ..elements import (
+    ELEMENT,
+    ELEMENT_GROUP,
+    ELEMENT_GROUPS,
+    ELEMENTS,
+    STREAM_CHUNK_SIZE,
+    UPSERT_BATCH_BYTES,
+    UPSERT_BATCH_FEATURES,
+    _batch_features,
+    _ElementDiff,
+    _iter_features,
+)
+from ..exceptions import REQUEST_ERRORS, BatchError
+from ..geojson import aiter_features
+from .api import decode_json, load_json, make_request, stream_request
+
+
+async def list_elements(
+    map_id: str, api_token: str | None = None, columnar: bool = False
+):
+    """List all elements on a map"""
+    if columnar:
+        return await _build_columnar(iter_elements(map_id, api_token))
+    response = await make_request(
+        url=ELEMENTS.format(map_id=map_id),
+        method="GET",
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def iter_elements(map_id: str, api_token: str | None = None):
+    """Iterate over the elements on a map without loading them all at once"""
+    async with await stream_request(
+        url=ELEMENTS.format(map_id=map_id), api_token=api_token
+    ) as response:
+        async for feature in aiter_features(response.iter_chunks(STREAM_CHUNK_SIZE)):
+            yield feature
+
+
+async def list_element_groups(map_id: str, api_token: str | None = None):
+    """List all element groups on a map"""
+    response = await make_request(
+        url=ELEMENT_GROUPS.format(map_id=map_id),
+        method="GET",
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def get_element_group(
+    map_id: str,
+    element_group_id: str,
+    api_token: str | None = None,
+    columnar: bool = False,
+):
+    """Get contents of an element group"""
+    if columnar:
+        return await _build_columnar(
+            iter_element_group(map_id, element_group_id, api_token)
+        )
+    response = await make_request(
+        url=ELEMENT_GROUP.format(map_id=map_id, element_group_id=element_group_id),
+        method="GET",
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def iter_element_group(
+    map_id: str, element_group_id: str, api_token: str | None = None
+):
+    """Iterate over the elements in a group without loading them all at once"""
+    async with await stream_request(
+        url=ELEMENT_GROUP.format(map_id=map_id, element_group_id=element_group_id),
+        api_token=api_token,
+    ) as response:
+        async for feature in aiter_features(response.iter_chunks(STREAM_CHUNK_SIZE)):
+            yield feature
+
+
+async def upsert_elements(
+    map_id: str, geojson_feature_collection: dict | str, api_token: str | None = None
+):
+    """Create or update elements"""
+    if isinstance(geojson_feature_collection, str):
+        geojson_feature_collection = decode_json(geojson_feature_collection)
+        assert isinstance(geojson_feature_collection, dict), (
+            "geojson_feature_collection must be a valid GeoJSON"
+        )
+    response = await make_request(
+        url=ELEMENTS.format(map_id=map_id),
+        method="POST",
+        json=geojson_feature_collection,
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def upsert_elements_batched(
+    map_id: str,
+    features: dict | str | typing.Iterable[dict],
+    max_features: int = UPSERT_BATCH_FEATURES,
+    max_bytes: int = UPSERT_BATCH_BYTES,
+    max_workers: int = 4,
+    api_token: str | None = None,
+):
+    """Create or update many elements in concurrent batches"""
+    url = ELEMENTS.format(map_id=map_id)
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def post(start: int, stop: int, body: bytes):
+        try:
+            response = await make_request(
+                url=url, method="POST", json=body, api_token=api_token
+            )
+            return start, stop, load_json(response)["features"]
+        except REQUEST_ERRORS as exc:
+            return start, stop, exc
+        finally:
+            semaphore.release()
+
+    tasks = []
+    for start, stop, body in _batch_features(
+        _iter_features(features), max_features, max_bytes
+    ):
+        # Only encode the next batch once a request slot is free
+        await semaphore.acquire()
+        tasks.append(asyncio.create_task(post(start, stop, body)))
+    outcomes = await asyncio.gather(*tasks)
+
+    features, errors = [], []
+    for start, stop, outcome in outcomes:
+        if isinstance(outcome, Exception):
+            errors.append((start, stop, outcome))
+        else:
+            features.extend(outcome)
+
+    result = {"type": "FeatureCollection", "features": features}
+    if errors:
+        raise BatchError(
+            f"{len(errors)} of {len(outcomes)} batches failed", result, errors
+        )
+    return result
+
+
+async def diff_elements(
+    map_id: str,
+    features: dict | str | typing.Iterable[dict],
+    key: str | None = None,
+    precision: int | None = None,
+    delete: bool = True,
+    api_token: str | None = None,
+) -> dict:
+    """Compare features with the elements on a map"""
+    diff = _ElementDiff(features, key, precision, delete)
+    async for element in iter_elements(map_id, api_token):
+        diff.add_element(element)
+    return diff.result()
+
+
+async def sync_elements(
+    map_id: str,
+    features: dict | str | typing.Iterable[dict],
+    key: str | None = None,
+    precision: int | None = None,
+    delete: bool = True,
+    max_workers: int = 4,
+    api_token: str | None = None,
+) -> dict:
+    """Make the elements on a map match features, changing only what differs"""
+    result = await diff_elements(map_id, features, key, precision, delete, api_token)
+    result["elements"] = {"type": "FeatureCollection", "features": []}
+    errors: list[tuple[int, int, Exception]] = []
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def upsert():
+        if not result["upsert"]:
+            return
+        try:
+            result["elements"] = await upsert_elements_batched(
+                map_id,
+                result["upsert"],
+                max_workers=max_workers,
+                api_token=api_token,
+            )
+        except BatchError as exc:
+            result["elements"] = exc.result
+            errors.extend(exc.errors)
+
+    async def delete_one(element_id: str):
+        async with semaphore:
+            await delete_element(map_id, element_id, api_token)
+
+    upserted, *deleted = await asyncio.gather(
+        upsert(),
+        *(delete_one(element_id) for element_id in result["delete"]),
+        return_exceptions=True,
+    )
+    if isinstance(upserted, BaseException):
+        raise upserted
+    for index, outcome in enumerate(deleted, len(result["upsert"])):
+        if isinstance(outcome, REQUEST_ERRORS):
+            errors.append((index, index + 1, outcome))
+        elif isinstance(outcome, BaseException):
+            # e.g. a cancelled delete, which must not pass for a success
+            raise outcome
+
+    if errors:
+        raise BatchError(f"{len(errors)} element requests failed", result, errors)
+    return result
+
+
+async def delete_element(map_id: str, element_id: str, api_token: str | None = None):
+    """Delete an element"""
+    await make_request(
+        url=ELEMENT.format(map_id=map_id, element_id=element_id),
+        method="DELETE",
+        api_token=api_token,
+    )
+
+
+async def upsert_element_groups(
+    map_id: str,
+    element_groups: list[dict],
+    api_token: str | None = None,
+):
+    """Post multiple element groups"""
+    response = await make_request(
+        url=ELEMENT_GROUPS.format(map_id=map_id),
+        method="POST",
+        json=element_groups,
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def _build_columnar(features: typing.AsyncIterator[dict]):
+    builder = ColumnarBuilder()
+    async for feature in features:
+        builder.append(feature)
+    return builder.build()
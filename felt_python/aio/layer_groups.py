@@ -0,0 +1,117 @@
+"""Layer groups
+
+Async versions of the functions in `felt_python.layer_groups`.
+"""
+
+from ..layer_groups import GROUP, GROUPS, GROUPS_PUBLISH
+from ..models import LayerGroup, load_model
+from .api import load_json, make_request
+
+
+async def list_layer_groups(
+    map_id: str, api_token: str | None = None, typed: bool = False
+):
+    """List layer groups on a map"""
+    response = await make_request(
+        url=GROUPS.format(map_id=map_id),
+        method="GET",
+        api_token=api_token,
+    )
+    if typed:
+        return load_model(response, LayerGroup)
+    return load_json(response)
+
+
+async def get_layer_group(
+    map_id: str,
+    layer_group_id: str,
+    api_token: str | None = None,
+    typed: bool = False,
+):
+    """Get details of a layer group"""
+    response = await make_request(
+        url=GROUP.format(map_id=map_id, layer_group_id=layer_group_id),
+        method="GET",
+        api_token=api_token,
+    )
+    if typed:
+        return load_model(response, LayerGroup)
+    return load_json(response)
+
+
+async def update_layer_groups(
+    map_id: str,
+    layer_group_params_list: list[dict[str, str | int]],
+    api_token: str | None = None,
+):
+    """Update multiple layer groups at once"""
+    response = await make_request(
+        url=GROUPS.format(map_id=map_id),
+        method="POST",
+        json=layer_group_params_list,
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def delete_layer_group(
+    map_id: str,
+    layer_group_id: str,
+    api_token: str | None = None,
+):
+    """Delete a layer group from a map"""
+    await make_request(
+        url=GROUP.format(map_id=map_id, layer_group_id=layer_group_id),
+        method="DELETE",
+        api_token=api_token,
+    )
+
+
+async def update_layer_group(
+    map_id: str,
+    layer_group_id: str,
+    name: str | None = None,
+    caption: str | None = None,
+    ordering_key: int | None = None,
+    visibility_interaction: str | None = None,
+    api_token: str | None = None,
+):
+    """Update a single layer group"""
+    json_payload: dict = {}
+
+    if name is not None:
+        json_payload["name"] = name
+    if caption is not None:
+        json_payload["caption"] = caption
+    if ordering_key is not None:
+        json_payload["ordering_key"] = ordering_key
+    if visibility_interaction is not None:
+        json_payload["visibility_interaction"] = visibility_interaction
+
+    response = await make_request(
+        url=GROUP.format(map_id=map_id, layer_group_id=layer_group_id),
+        method="POST",
+        json=json_payload,
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def publish_layer_group(
+    map_id: str,
+    layer_group_id: str,
+    name: str | None = None,
+    api_token: str | None = None,
+):
+    """Publish a layer group to the Felt library"""
+    json_payload = {}
+    if name is not None:
+        json_payload["name"] = name
+
+    response = await make_request(
+        url=GROUPS_PUBLISH.format(map_id=map_id, layer_group_id=layer_group_id),
+        method="POST",
+        json=json_payload,
+        api_token=api_token,
+    )
+    return load_json(response)
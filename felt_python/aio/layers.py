@@ -0,0 +1,765 @@
+"""Layers
+
+Async versions of the functions in `felt_python.layers`. Blocking work such as
+serializing dataframes and reading or writing files runs in a worker thread.
+"""
+
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+import typing
+import urllib.error
+import urllib.parse
+
+from .. import bulk
+from ..compression import should_zip, zip_file
+from ..exceptions import REQUEST_ERRORS
+from ..layers import (
+    DOWNLOAD_CHUNK_SIZE,
+    LAYER,
+    LAYER_CUSTOM_EXPORT,
+    LAYER_CUSTOM_EXPORT_STATUS,
+    LAYER_DUPLICATE,
+    LAYER_EXPORT_LINK,
+    LAYER_PUBLISH,
+    LAYER_REFRESH,
+    LAYER_UPDATE_STYLE,
+    LAYER_UPLOAD,
+    LAYERS,
+    MIN_RANGE_SIZE,
+    _check_format,
+    _content_range_total,
+    _iter_multipart_body,
+    _LayerWaiter,
+    _multipart_envelope,
+    _upload_arguments,
+    _upload_payload,
+    _UploadProgress,
+    _write_frame_buffer,
+    _write_frame_file,
+)
+from ..manifest import UploadManifest
+from ..models import Layer, load_model
+from .api import get_client, load_json, make_request
+from .pool import AsyncConnectionPool, AsyncStreamingResponse
+
+
+async def list_layers(map_id: str, api_token: str | None = None, typed: bool = False):
+    """List layers on a map"""
+    response = await make_request(
+        url=LAYERS.format(map_id=map_id),
+        method="GET",
+        api_token=api_token,
+    )
+    if typed:
+        return load_model(response, Layer)
+    return load_json(response)
+
+
+async def upload_file(
+    map_id: str,
+    file_name: str,
+    layer_name: str,
+    metadata: dict[str, str] | None = None,
+    hints: list[dict[str, str]] | None = None,
+    lat: float | None = None,
+    lng: float | None = None,
+    zoom: float | None = None,
+    api_token: str | None = None,
+    progress: typing.Callable[[int, int], None] | None = None,
+    compress: bool = False,
+):
+    """Upload a file to a Felt map"""
+    async with _zipped(file_name, compress) as upload_name:
+        response = await make_request(
+            url=LAYER_UPLOAD.format(map_id=map_id),
+            method="POST",
+            api_token=api_token,
+            json=_upload_payload(layer_name, metadata, hints, lat, lng, zoom),
+        )
+        return await _upload_file(load_json(response), upload_name, progress)
+
+
+async def upload_files(
+    map_id: str,
+    uploads: typing.Iterable[str | dict],
+    max_workers: int = 4,
+    progress: typing.Callable[[int, int], None] | None = None,
+    compress: bool = False,
+    api_token: str | None = None,
+) -> bulk.Results:
+    """Upload many files to a Felt map concurrently"""
+    arguments = [_upload_arguments(upload, compress) for upload in uploads]
+    tracker = _UploadProgress([upload["file_name"] for upload in arguments], progress)
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def run_one(call: bulk.Call) -> bulk.Result:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = bulk.Result(call, value=await call())
+            except REQUEST_ERRORS as exc:
+                result = bulk.Result(call, error=exc)
+            result.elapsed = time.perf_counter() - start
+            return result
+
+    calls = [
+        bulk.Call(
+            upload_file,
+            map_id,
+            api_token=api_token,
+            progress=tracker.callback(index),
+            **upload,
+        )
+        for index, upload in enumerate(arguments)
+    ]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run_one(call) for call in calls))
+    return bulk.Results(results, time.perf_counter() - start)
+
+
+async def upload_dataframe(
+    map_id: str,
+    dataframe: "pandas.DataFrame",  # type: ignore[name-defined] # noqa: F821
+    layer_name: str,
+    metadata: dict[str, str] | None = None,
+    hints: list[dict[str, str]] | None = None,
+    api_token: str | None = None,
+    format: typing.Literal["csv", "parquet"] = "csv",
+    compression: str | None = None,
+    in_memory: bool = False,
+):
+    """Upload a Pandas DataFrame to a Felt map"""
+    return await _upload_frame(
+        map_id,
+        dataframe,
+        f"dataframe.{format}",
+        _upload_payload(layer_name, metadata, hints),
+        api_token,
+        format,
+        compression,
+        in_memory,
+    )
+
+
+async def upload_geodataframe(
+    map_id: str,
+    geodataframe: "geopandas.GeoDataFrame",  # type: ignore[name-defined] # noqa: F821
+    layer_name: str,
+    metadata: dict[str, str] | None = None,
+    hints: list[dict[str, str]] | None = None,
+    api_token: str | None = None,
+    format: typing.Literal["gpkg", "parquet", "fgb"] = "gpkg",
+    compression: str | None = None,
+    in_memory: bool = False,
+):
+    """Upload a GeoPandas GeoDataFrame to a Felt map"""
+    return await _upload_frame(
+        map_id,
+        geodataframe,
+        f"geodataframe.{format}",
+        _upload_payload(layer_name, metadata, hints),
+        api_token,
+        format,
+        compression,
+        in_memory,
+    )
+
+
+async def refresh_file_layer(
+    map_id: str,
+    layer_id: str,
+    file_name: str,
+    api_token: str | None = None,
+    progress: typing.Callable[[int, int], None] | None = None,
+    compress: bool = False,
+    manifest: UploadManifest | None = None,
+):
+    """Refresh a layer originated from a file upload"""
+    upload = None
+    if manifest is not None:
+        # Hashing a file that may be unchanged reads it, so it runs in a thread
+        upload = await asyncio.to_thread(manifest.begin, layer_id, file_name)
+        if upload is None:
+            return {"layer_id": layer_id, "skipped": True}
+    async with _zipped(file_name, compress) as upload_name:
+        response = await make_request(
+            url=LAYER_REFRESH.format(map_id=map_id, layer_id=layer_id),
+            method="POST",
+            api_token=api_token,
+        )
+        reader = upload.reader if upload and upload_name == file_name else None
+        result = await _upload_file(load_json(response), upload_name, progress, reader)
+    if upload is not None:
+        await asyncio.to_thread(upload.commit)
+    return result
+
+
+async def upload_url(
+    map_id: str,
+    layer_url: str,
+    layer_name: str,
+    metadata: dict[str, str] | None = None,
+    hints: list[dict[str, str]] | None = None,
+    api_token: str | None = None,
+):
+    """Upload a URL to a Felt map"""
+    json_payload: dict = {
+        "import_url": layer_url,
+        "name": layer_name,
+    }
+
+    if metadata is not None:
+        json_payload["metadata"] = metadata
+    if hints is not None:
+        json_payload["hints"] = hints
+
+    response = await make_request(
+        url=LAYER_UPLOAD.format(map_id=map_id),
+        method="POST",
+        api_token=api_token,
+        json=json_payload,
+    )
+    return load_json(response)
+
+
+async def refresh_url_layer(map_id: str, layer_id: str, api_token: str | None = None):
+    """Refresh a layer originated from a URL upload"""
+    response = await make_request(
+        url=LAYER_REFRESH.format(
+            map_id=map_id,
+            layer_id=layer_id,
+        ),
+        method="POST",
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def get_layer(
+    map_id: str,
+    layer_id: str,
+    api_token: str | None = None,
+    typed: bool = False,
+):
+    """Get details of a layer"""
+    response = await make_request(
+        url=LAYER.format(
+            map_id=map_id,
+            layer_id=layer_id,
+        ),
+        method="GET",
+        api_token=api_token,
+    )
+    if typed:
+        return load_model(response, Layer)
+    return load_json(response)
+
+
+async def wait_for_layers(
+    map_id: str,
+    layer_ids: typing.Iterable[str],
+    timeout: float | None = 600.0,
+    poll_interval: float = 1.0,
+    max_poll_interval: float = 15.0,
+    backoff: float = 1.5,
+    progress: typing.Callable[[int, int], None] | None = None,
+    api_token: str | None = None,
+    typed: bool = False,
+):
+    """Wait until layers on a map have finished processing"""
+    waiter = _LayerWaiter(
+        map_id, layer_ids, timeout, poll_interval, max_poll_interval, backoff, progress
+    )
+    while True:
+        waiter.expire(get_client())
+        delay = waiter.update(await list_layers(map_id, api_token))
+        if delay is None:
+            return waiter.result(typed)
+        await asyncio.sleep(delay)
+
+
+async def update_layer_style(
+    map_id: str,
+    layer_id: str,
+    style: dict,
+    api_token: str | None = None,
+):
+    """Update a layer's style"""
+    response = await make_request(
+        url=LAYER_UPDATE_STYLE.format(
+            map_id=map_id,
+            layer_id=layer_id,
+        ),
+        method="POST",
+        json={"style": style},
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def get_export_link(
+    map_id: str,
+    layer_id: str,
+    api_token: str | None = None,
+):
+    """Get a download link for a layer"""
+    response = await make_request(
+        url=LAYER_EXPORT_LINK.format(map_id=map_id, layer_id=layer_id),
+        method="GET",
+        api_token=api_token,
+    )
+    return load_json(response)["export_link"]
+
+
+async def download_layer(
+    map_id: str,
+    layer_id: str,
+    file_name: str | None = None,
+    api_token: str | None = None,
+    resume: bool = False,
+    progress: typing.Callable[[int, int | None, float], None] | None = None,
+    parallel: int = 1,
+) -> str:
+    """Download a layer to a file"""
+    export_link = await get_export_link(map_id, layer_id, api_token)
+    cache_key = LAYER.format(map_id=map_id, layer_id=layer_id)
+    return await _download_file(
+        export_link, file_name, resume, progress, parallel, cache_key
+    )
+
+
+async def update_layers(
+    map_id: str,
+    layer_params_list: list[dict[str, object]],
+    api_token: str | None = None,
+):
+    """Update multiple layers at once"""
+    response = await make_request(
+        url=LAYERS.format(map_id=map_id),
+        method="POST",
+        json=layer_params_list,
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def delete_layer(
+    map_id: str,
+    layer_id: str,
+    api_token: str | None = None,
+):
+    """Delete a layer from a map"""
+    await make_request(
+        url=LAYER.format(map_id=map_id, layer_id=layer_id),
+        method="DELETE",
+        api_token=api_token,
+    )
+
+
+async def publish_layer(
+    map_id: str,
+    layer_id: str,
+    name: str | None = None,
+    api_token: str | None = None,
+):
+    """Publish a layer to the Felt library"""
+    json_payload: dict = {}
+    if name is not None:
+        json_payload["name"] = name
+
+    response = await make_request(
+        url=LAYER_PUBLISH.format(map_id=map_id, layer_id=layer_id),
+        method="POST",
+        json=json_payload,
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def create_custom_export(
+    map_id: str,
+    layer_id: str,
+    output_format: str,
+    filters: list | None = None,
+    email_on_completion: bool = True,
+    api_token: str | None = None,
+):
+    """Create a custom export of a layer"""
+    json_payload: dict = {
+        "output_format": output_format,
+        "email_on_completion": email_on_completion,
+    }
+
+    if filters is not None:
+        json_payload["filters"] = filters
+
+    response = await make_request(
+        url=LAYER_CUSTOM_EXPORT.format(map_id=map_id, layer_id=layer_id),
+        method="POST",
+        json=json_payload,
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def get_custom_export_status(
+    map_id: str,
+    layer_id: str,
+    export_id: str,
+    api_token: str | None = None,
+):
+    """Check the status of a custom export"""
+    response = await make_request(
+        url=LAYER_CUSTOM_EXPORT_STATUS.format(
+            map_id=map_id,
+            layer_id=layer_id,
+            export_id=export_id,
+        ),
+        method="GET",
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def download_custom_export(
+    map_id: str,
+    layer_id: str,
+    export_id: str,
+    file_name: str | None = None,
+    api_token: str | None = None,
+    resume: bool = False,
+    progress: typing.Callable[[int, int | None, float], None] | None = None,
+    parallel: int = 1,
+) -> str:
+    """Download a completed custom export to a file"""
+    status = await get_custom_export_status(map_id, layer_id, export_id, api_token)
+    download_url = status.get("download_url")
+    if not download_url:
+        raise ValueError(
+            f"Custom export {export_id} is not ready (status: {status.get('status')})"
+        )
+    cache_key = LAYER_CUSTOM_EXPORT_STATUS.format(
+        map_id=map_id, layer_id=layer_id, export_id=export_id
+    )
+    return await _download_file(
+        download_url, file_name, resume, progress, parallel, cache_key
+    )
+
+
+async def duplicate_layers(
+    duplicate_params: list[dict[str, str]], api_token: str | None = None
+):
+    """Duplicate layers from one map to another"""
+    response = await make_request(
+        url=LAYER_DUPLICATE,
+        method="POST",
+        json=duplicate_params,
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def _upload_frame(
+    map_id, frame, file_name, json_payload, api_token, format, compression, in_memory
+):
+    _check_format(format, compression)
+    if compression == "zip":
+        file_name += ".zip"
+
+    if not in_memory:
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = await asyncio.to_thread(
+                _write_frame_file, frame, tempdir, file_name, format, compression
+            )
+            presigned_upload = await _create_upload(map_id, json_payload, api_token)
+            return await _upload_file(presigned_upload, path)
+
+    # Create the upload while the frame is being serialized
+    written = asyncio.ensure_future(
+        asyncio.to_thread(_write_frame_buffer, frame, file_name, format, compression)
+    )
+    try:
+        presigned_upload = await _create_upload(map_id, json_payload, api_token)
+    except BaseException:
+        await asyncio.gather(written, return_exceptions=True)
+        raise
+    try:
+        buffer = await written
+    except BaseException:
+        await _discard_upload(map_id, presigned_upload, api_token)
+        raise
+    with buffer:
+        return await _upload_buffer(presigned_upload, buffer, file_name)
+
+
+async def _create_upload(map_id: str, json_payload: dict, api_token: str | None):
+    response = await make_request(
+        url=LAYER_UPLOAD.format(map_id=map_id),
+        method="POST",
+        api_token=api_token,
+        json=json_payload,
+    )
+    return load_json(response)
+
+
+async def _discard_upload(map_id: str, presigned_upload: dict, api_token: str | None):
+    if "layer_id" in presigned_upload:
+        try:
+            await delete_layer(
+                map_id, presigned_upload["layer_id"], api_token=api_token
+            )
+        except urllib.error.URLError:
+            pass
+
+
+@contextlib.asynccontextmanager
+async def _zipped(file_name: str, compress: bool) -> typing.AsyncIterator[str]:
+    if not (compress and should_zip(file_name)):
+        yield file_name
+        return
+    with tempfile.TemporaryDirectory() as tempdir:
+        arcname = os.path.basename(file_name)
+        zip_name = os.path.join(tempdir, arcname + ".zip")
+        await asyncio.to_thread(zip_file, file_name, arcname, zip_name)
+        yield zip_name
+
+
+@contextlib.asynccontextmanager
+async def _open(file_name: str, mode: str) -> typing.AsyncIterator[typing.IO]:
+    """Open a file in a worker thread, as opening and closing may block"""
+    file_obj = await asyncio.to_thread(open, file_name, mode)
+    try:
+        yield file_obj
+    finally:
+        await asyncio.to_thread(file_obj.close)
+
+
+async def _upload_file(presigned_upload, file_name, progress=None, reader=None):
+    async def send():
+        async with _open(file_name, "rb") as file_obj:
+            return await _upload_file_obj(
+                presigned_upload,
+                reader(file_obj) if reader is not None else file_obj,
+                os.path.basename(file_name),
+                progress,
+                True,
+            )
+
+    return await _retry_upload(send)
+
+
+async def _upload_buffer(presigned_upload, buffer, file_name):
+    async def send():
+        buffer.seek(0)
+        # The buffer may have spilled over to a temporary file on disk
+        return await _upload_file_obj(presigned_upload, buffer, file_name, None, True)
+
+    return await _retry_upload(send)
+
+
+async def _retry_upload(send: typing.Callable[[], typing.Awaitable[dict]]) -> dict:
+    retry = get_client().retry
+    attempt = 1
+    while True:
+        try:
+            return await send()
+        except urllib.error.URLError as exc:
+            # Sending to a presigned URL can be repeated, like a PUT
+            delay = retry.get_delay("PUT", attempt, exc)
+            if delay is None:
+                raise
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+async def _upload_file_obj(
+    presigned_upload, file_obj, file_name, progress=None, blocking=False
+):
+    headers, preamble, epilogue = _multipart_envelope(
+        presigned_upload["presigned_attributes"], file_obj, file_name
+    )
+    body = _iter_multipart_body(
+        preamble,
+        file_obj,
+        epilogue,
+        int(headers["Content-Length"]),
+        progress,
+    )
+    # Reads from a file on disk block, so they run in a worker thread
+    await get_client().pool.urlopen(
+        "POST",
+        presigned_upload["url"],
+        body=_iter_in_thread(body) if blocking else body,
+        headers=headers,
+    )
+    return presigned_upload
+
+
+async def _iter_in_thread(iterator: typing.Iterator[bytes]):
+    """Consume a blocking iterator without blocking the event loop"""
+    while (chunk := await asyncio.to_thread(next, iterator, None)) is not None:
+        yield chunk
+
+
+async def _download_file(
+    url: str,
+    file_name: str | None = None,
+    resume: bool = False,
+    progress: typing.Callable[[int, int | None, float], None] | None = None,
+    parallel: int = 1,
+    cache_key: str | None = None,
+) -> str:
+    """Stream a URL to a file through a temporary file, see `layers._download_file`"""
+    if file_name is None and resume:
+        file_name = os.path.basename(urllib.parse.urlparse(url).path)
+
+    offset = 0
+    if file_name is not None and resume and os.path.exists(f"{file_name}.part"):
+        offset = os.path.getsize(f"{file_name}.part")
+
+    headers = {}
+    if offset:
+        headers = {"Range": f"bytes={offset}-"}
+    elif parallel > 1:
+        headers = {"Range": "bytes=0-0"}
+
+    client = get_client()
+    disk_cache = client.disk_cache if cache_key is not None and not offset else None
+    cached = None
+    if disk_cache is not None:
+        assert cache_key is not None
+        cached = await asyncio.to_thread(disk_cache.get_file, cache_key)
+    if cached is not None:
+        headers.update(cached.validators())
+
+    pool = client.pool
+    try:
+        response = await pool.stream("GET", url, headers=headers)
+    except urllib.error.HTTPError as exc:
+        if exc.code == 304 and cached is not None:
+            if file_name is None:
+                file_name = os.path.basename(urllib.parse.urlparse(url).path)
+            assert disk_cache is not None
+            with contextlib.suppress(FileNotFoundError):
+                return await asyncio.to_thread(
+                    disk_cache.restore_file, cached, file_name
+                )
+            response = await pool.stream("GET", url)
+        else:
+            if exc.code != 416:
+                raise
+            total = _content_range_total(exc.headers.get("Content-Range"))
+            if offset and total == offset:
+                assert file_name is not None
+                os.replace(f"{file_name}.part", file_name)
+                return file_name
+            offset = 0
+            response = await pool.stream("GET", url)
+
+    async with response:
+        if file_name is None:
+            parsed_url = urllib.parse.urlparse(response.url)
+            file_name = os.path.basename(parsed_url.path)
+        part_name = f"{file_name}.part"
+
+        if response.status == 206:
+            total = _content_range_total(response.getheader("Content-Range"))
+        else:
+            offset = 0
+            content_length = response.getheader("Content-Length")
+            total = int(content_length) if content_length else None
+
+        ranged = response.status == 206 and not offset and total is not None
+        if not ranged:
+            try:
+                await _write_stream(response, part_name, offset, total, progress)
+            except BaseException:
+                if not resume and os.path.exists(part_name):
+                    os.remove(part_name)
+                raise
+        else:
+            await response.read()
+
+    if ranged:
+        assert total is not None
+        try:
+            await _download_ranges(
+                pool, response.url, part_name, total, parallel, progress
+            )
+        except BaseException:
+            if os.path.exists(part_name):
+                os.remove(part_name)
+            raise
+
+    os.replace(part_name, file_name)
+    if disk_cache is not None:
+        assert cache_key is not None
+        await asyncio.to_thread(
+            disk_cache.put_file, cache_key, file_name, response.headers
+        )
+    return file_name
+
+
+async def _write_stream(
+    response: AsyncStreamingResponse,
+    part_name: str,
+    offset: int,
+    total: int | None,
+    progress: typing.Callable[[int, int | None, float], None] | None = None,
+):
+    downloaded = offset
+    started = time.monotonic()
+    async with _open(part_name, "ab" if offset else "wb") as file_obj:
+        async for chunk in response.iter_chunks(DOWNLOAD_CHUNK_SIZE):
+            await asyncio.to_thread(file_obj.write, chunk)
+            downloaded += len(chunk)
+            if progress is not None:
+                elapsed = time.monotonic() - started
+                rate = (downloaded - offset) / elapsed if elapsed else 0.0
+                progress(downloaded, total, rate)
+
+
+async def _download_ranges(
+    pool: AsyncConnectionPool,
+    url: str,
+    part_name: str,
+    total: int,
+    parallel: int,
+    progress: typing.Callable[[int, int | None, float], None] | None = None,
+):
+    """Download byte ranges concurrently into a preallocated file"""
+    async with _open(part_name, "wb") as file_obj:
+        await asyncio.to_thread(file_obj.truncate, total)
+
+    count = max(1, min(parallel, total // MIN_RANGE_SIZE))
+    size = -(-total // count)
+    ranges = [(start, min(start + size, total) - 1) for start in range(0, total, size)]
+
+    downloaded = 0
+    started = time.monotonic()
+
+    async def fetch(start: int, end: int):
+        nonlocal downloaded
+        response = await pool.stream(
+            "GET", url, headers={"Range": f"bytes={start}-{end}"}
+        )
+        async with response:
+            content_range = response.getheader("Content-Range") or ""
+            if response.status != 206 or not content_range.startswith(
+                f"bytes {start}-"
+            ):
+                raise ValueError(f"Server did not honour range {start}-{end}")
+            async with _open(part_name, "r+b") as file_obj:
+                file_obj.seek(start)
+                async for chunk in response.iter_chunks(DOWNLOAD_CHUNK_SIZE):
+                    await asyncio.to_thread(file_obj.write, chunk)
+                    downloaded += len(chunk)
+                    if progress is not None:
+                        elapsed = time.monotonic() - started
+                        rate = downloaded / elapsed if elapsed else 0.0
+                        progress(downloaded, total, rate)
+
+    await asyncio.gather(*(fetch(start, end) for start, end in ranges))
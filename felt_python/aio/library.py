@@ -0,0 +1,18 @@
+"""Layer library
+
+Async versions of the functions in `felt_python.library`.
+"""
+
+from ..library import LIBRARY
+from .api import load_json, make_request
+
+
+async def list_library_layers(source: str = "workspace", api_token: str | None = None):
+    """List layers available in the layer library"""
+    url = f"{LIBRARY}?source={source}"
+    response = await make_request(
+        url=url,
+        method="GET",
+        api_token=api_token,
+    )
+    return load_json(response)
@@ -0,0 +1,199 @@
+"""Maps
+
+Async versions of the functions in `felt_python.maps`.
+"""
+
+from ..maps import (
+    MAP,
+    MAP_ADD_SOURCE_LAYER,
+    MAP_DUPLICATE,
+    MAP_EMBED_TOKEN,
+    MAP_MOVE,
+    MAP_UPDATE,
+    MAPS,
+)
+from ..models import Map, load_model
+from .api import load_json, make_request
+
+
+async def create_map(
+    title: str | None = None,
+    description: str | None = None,
+    public_access: str | None = None,
+    basemap: str | None = None,
+    lat: float | None = None,
+    lon: float | None = None,
+    zoom: float | None = None,
+    layer_urls: list[str] | None = None,
+    workspace_id: str | None = None,
+    api_token: str | None = None,
+):
+    """Create a new Felt map"""
+    json_args: dict = {}
+
+    if title is not None:
+        json_args["title"] = title
+    if description is not None:
+        json_args["description"] = description
+    if public_access is not None:
+        json_args["public_access"] = public_access
+    if basemap is not None:
+        json_args["basemap"] = basemap
+    if lat is not None:
+        json_args["lat"] = lat
+    if lon is not None:
+        json_args["lon"] = lon
+    if zoom is not None:
+        json_args["zoom"] = zoom
+    if layer_urls is not None:
+        json_args["layer_urls"] = layer_urls
+    if workspace_id is not None:
+        json_args["workspace_id"] = workspace_id
+
+    response = await make_request(
+        url=MAPS,
+        method="POST",
+        json=json_args,
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def delete_map(map_id: str, api_token: str | None = None):
+    """Delete a map"""
+    await make_request(
+        url=MAP.format(map_id=map_id),
+        method="DELETE",
+        api_token=api_token,
+    )
+
+
+async def get_map(map_id: str, api_token: str | None = None, typed: bool = False):
+    """Get details of a map"""
+    response = await make_request(
+        url=MAP.format(map_id=map_id),
+        method="GET",
+        api_token=api_token,
+    )
+    if typed:
+        return load_model(response, Map)
+    return load_json(response)
+
+
+async def update_map(
+    map_id: str,
+    title: str | None = None,
+    description: str | None = None,
+    public_access: str | None = None,
+    basemap: str | None = None,
+    table_settings: dict | None = None,
+    viewer_permissions: dict | None = None,
+    api_token: str | None = None,
+):
+    """Update a map's details"""
+    json_args: dict = {}
+    if title is not None:
+        json_args["title"] = title
+    if description is not None:
+        json_args["description"] = description
+    if public_access is not None:
+        json_args["public_access"] = public_access
+    if basemap is not None:
+        json_args["basemap"] = basemap
+    if table_settings is not None:
+        json_args["table_settings"] = table_settings
+    if viewer_permissions is not None:
+        json_args["viewer_permissions"] = viewer_permissions
+
+    response = await make_request(
+        url=MAP_UPDATE.format(map_id=map_id),
+        method="POST",
+        json=json_args,
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def move_map(
+    map_id: str,
+    project_id: str | None = None,
+    folder_id: str | None = None,
+    api_token: str | None = None,
+):
+    """Move a map to a different project or folder"""
+    if project_id is not None and folder_id is not None:
+        raise ValueError("Cannot specify both project_id and folder_id")
+    if project_id is None and folder_id is None:
+        raise ValueError("Must specify either project_id or folder_id")
+
+    json_args = {}
+    if project_id is not None:
+        json_args["project_id"] = project_id
+    if folder_id is not None:
+        json_args["folder_id"] = folder_id
+
+    response = await make_request(
+        url=MAP_MOVE.format(map_id=map_id),
+        method="POST",
+        json=json_args,
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def create_embed_token(
+    map_id: str, user_email: str | None = None, api_token: str | None = None
+):
+    """Create an embed token for a map"""
+    url = MAP_EMBED_TOKEN.format(map_id=map_id)
+    if user_email:
+        url = f"{url}?user_email={user_email}"
+
+    response = await make_request(
+        url=url,
+        method="POST",
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def add_source_layer(
+    map_id: str, source_layer_params: dict[str, str], api_token: str | None = None
+):
+    """Add a layer from a source to a map"""
+    response = await make_request(
+        url=MAP_ADD_SOURCE_LAYER.format(map_id=map_id),
+        method="POST",
+        json=source_layer_params,
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def duplicate_map(
+    map_id: str,
+    title: str | None = None,
+    project_id: str | None = None,
+    folder_id: str | None = None,
+    api_token: str | None = None,
+):
+    """Duplicate a map"""
+    if project_id is not None and folder_id is not None:
+        raise ValueError("Cannot specify both project_id and folder_id")
+
+    json_args: dict = {}
+    if title is not None:
+        json_args["title"] = title
+
+    if project_id is not None:
+        json_args["destination"] = {"project_id": project_id}
+    elif folder_id is not None:
+        json_args["destination"] = {"folder_id": folder_id}
+
+    response = await make_request(
+        url=MAP_DUPLICATE.format(map_id=map_id),
+        method="POST",
+        json=json_args,
+        api_token=api_token,
+    )
+    return load_json(response)
@@ -0,0 +1,482 @@
+"""Keep-alive HTTP connection pool for asyncio"""
+
+import asyncio
+import collections
+import email.parser
+import functools
+import http.client
+import io
+import ssl
+import threading
+import time
+import typing
+import urllib.error
+import urllib.parse
+
+from ..pool import (
+    MAX_REDIRECTS,
+    Response,
+    get_redirect,
+    http_error,
+    pool_key,
+    raise_for_status,
+    urllib_open,
+    uses_proxy,
+)
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.loop = asyncio.get_running_loop()
+
+    def close(self):
+        try:
+            self.writer.close()
+        except RuntimeError:
+            # The event loop the connection was opened on is already closed
+            pass
+
+
+class AsyncConnectionPool:
+    """Pool of HTTP/1.1 keep-alive connections built on asyncio streams
+
+    Mirrors `felt_python.pool.ConnectionPool`, but never blocks the event loop.
+    Connections are only reused within the event loop that opened them.
+
+    Args:
+        maxsize: Maximum number of idle connections kept per host
+        idle_timeout: Seconds after which an idle connection is evicted instead
+            of being reused
+        timeout: Timeout in seconds for connecting and for each read
+        ssl_context: Optional SSL context used for HTTPS connections
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10,
+        idle_timeout: float = 30.0,
+        timeout: float | None = None,
+        ssl_context: ssl.SSLContext | None = None,
+    ):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.discarded = 0
+        self._idle: dict[tuple, collections.deque] = {}
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict[str, int]:
+        """Counters for connection reuse, see `ConnectionPool.stats`"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "discarded": self.discarded,
+                "idle": sum(len(idle) for idle in self._idle.values()),
+            }
+
+    def clear(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn, _ in connections:
+                conn.close()
+
+    async def urlopen(
+        self,
+        method: str,
+        url: str,
+        body: bytes
+        | typing.Iterable[bytes]
+        | typing.AsyncIterable[bytes]
+        | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> Response:
+        """Send a request and return the buffered response
+
+        Redirects are followed and non-2xx responses raise
+        `urllib.error.HTTPError`, matching `urllib.request.urlopen`.
+        """
+        response = await self._open(method, url, body, headers, stream=False)
+        assert isinstance(response, Response)
+        return response
+
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        body: bytes
+        | typing.Iterable[bytes]
+        | typing.AsyncIterable[bytes]
+        | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> "AsyncStreamingResponse":
+        """Send a request and return a response whose body is read on demand
+
+        The connection is returned to the pool when the response is closed
+        after its body has been read completely.
+        """
+        response = await self._open(method, url, body, headers, stream=True)
+        assert isinstance(response, AsyncStreamingResponse)
+        return response
+
+    async def _open(self, method, url, body, headers, stream):
+        headers = dict(headers or {})
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(url)
+            if uses_proxy(parts):
+                if isinstance(body, typing.AsyncIterable):
+                    body = b"".join([chunk async for chunk in body])
+                response = await asyncio.to_thread(
+                    urllib_open, url, method, body, headers
+                )
+                if stream:
+                    return AsyncStreamingResponse(
+                        response.url,
+                        response.status,
+                        response.reason,
+                        response.headers,
+                        _BufferedBody(response.getvalue()),
+                        self,
+                        lambda: None,
+                    )
+                return response
+
+            key = pool_key(parts)
+            conn, status, reason, response_headers, response_body = await self._send(
+                key, parts, method, body, headers
+            )
+            if stream and 200 <= status < 300:
+                return AsyncStreamingResponse(
+                    url,
+                    status,
+                    reason,
+                    response_headers,
+                    response_body,
+                    self,
+                    functools.partial(self._release, key, conn, response_body),
+                )
+
+            try:
+                data = await self._wait(response_body.read())
+            except (TimeoutError, OSError, EOFError, ValueError) as exc:
+                conn.close()
+                raise urllib.error.URLError(exc) from exc
+            except BaseException:
+                conn.close()
+                raise
+            self._release(key, conn, response_body)
+
+            response = Response(url, status, reason, response_headers, data)
+            redirect = get_redirect(response, method, headers)
+            if redirect is None:
+                raise_for_status(response)
+                return response
+            url, method, headers = redirect
+            body = None
+
+        raise http_error(response, "Too many redirects")
+
+    async def _send(self, key, parts, method, body, headers):
+        path = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        head = _request_head(key, method, path, body, headers)
+        replayable = body is None or isinstance(body, bytes)
+        while True:
+            conn, reused = await self._checkout(key)
+            try:
+                conn.writer.write(head)
+                if isinstance(body, bytes):
+                    conn.writer.write(body)
+                elif isinstance(body, typing.AsyncIterable):
+                    async for chunk in body:
+                        conn.writer.write(chunk)
+                        await conn.writer.drain()
+                elif body is not None:
+                    for chunk in body:
+                        conn.writer.write(chunk)
+                        await conn.writer.drain()
+                await conn.writer.drain()
+                status, reason, response_headers, response_body = await self._wait(
+                    _read_head(conn.reader, method)
+                )
+            except (http.client.RemoteDisconnected, ConnectionResetError) as exc:
+                conn.close()
+                if reused and replayable:
+                    continue
+                raise urllib.error.URLError(exc) from exc
+            except (TimeoutError, OSError, EOFError) as exc:
+                conn.close()
+                raise urllib.error.URLError(exc) from exc
+            except BaseException:
+                conn.close()
+                raise
+            return conn, status, reason, response_headers, response_body
+
+    def _release(self, key, conn: _Connection, body: "_Body"):
+        # A connection can only be reused once its response has been consumed
+        if body.done and not body.will_close:
+            self._checkin(key, conn)
+        else:
+            conn.close()
+
+    async def _checkout(self, key) -> tuple[_Connection, bool]:
+        now = time.monotonic()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle:
+                conn, last_used = idle.pop()
+                if (
+                    now - last_used > self.idle_timeout
+                    or conn.loop is not loop
+                    or conn.reader.at_eof()
+                ):
+                    self.evictions += 1
+                    conn.close()
+                    continue
+                self.hits += 1
+                return conn, True
+            self.misses += 1
+
+        scheme, host, port = key
+        try:
+            reader, writer = await self._wait(
+                asyncio.open_connection(
+                    host,
+                    port,
+                    ssl=self.ssl_context if scheme == "https" else None,
+                )
+            )
+        except (TimeoutError, OSError) as exc:
+            raise urllib.error.URLError(exc) from exc
+        return _Connection(reader, writer), False
+
+    def _checkin(self, key, conn: _Connection):
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.setdefault(key, collections.deque())
+            while idle and now - idle[0][1] > self.idle_timeout:
+                idle.popleft()[0].close()
+                self.evictions += 1
+            if len(idle) >= self.maxsize:
+                self.discarded += 1
+                conn.close()
+                return
+            idle.append((conn, now))
+
+    async def _wait(self, awaitable):
+        if self.timeout is None:
+            return await awaitable
+        return await asyncio.wait_for(awaitable, self.timeout)
+
+
+def _request_head(key, method, path, body, headers) -> bytes:
+    scheme, host, port = key
+    default_port = 443 if scheme == "https" else 80
+    lines = [f"{method} {path} HTTP/1.1"]
+    names = {name.lower() for name in headers}
+    if "host" not in names:
+        lines.append(
+            f"Host: {host}" if port == default_port else f"Host: {host}:{port}"
+        )
+    if "accept-encoding" not in names:
+        lines.append("Accept-Encoding: identity")
+    if "content-length" not in names:
+        if isinstance(body, bytes):
+            lines.append(f"Content-Length: {len(body)}")
+        elif body is None and method in ("POST", "PUT", "PATCH"):
+            lines.append("Content-Length: 0")
+        elif body is not None:
+            raise ValueError("Content-Length header is required for streamed bodies")
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+class _Body:
+    """Incremental reader for a response body"""
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        length: int | None,
+        chunked: bool = False,
+        will_close: bool = False,
+    ):
+        self.reader = reader
+        self.remaining = length
+        self.chunked = chunked
+        # Without a length or chunked encoding the body ends when the server
+        # closes the connection
+        self.will_close = will_close or (length is None and not chunked)
+        self.done = length == 0 and not chunked
+        self._chunk_left = 0
+
+    async def read(self, amt: int = -1) -> bytes:
+        """Read up to `amt` bytes, or the rest of the body if `amt` is negative"""
+        if self.done:
+            return b""
+        if self.chunked:
+            return await self._read_chunked(amt)
+        if self.remaining is None:
+            data = await self.reader.read(amt)
+            if amt < 0 or not data:
+                self.done = True
+            return data
+
+        size = self.remaining if amt < 0 else min(amt, self.remaining)
+        data = await self.reader.readexactly(size)
+        self.remaining -= size
+        self.done = self.remaining == 0
+        return data
+
+    async def _read_chunked(self, amt: int) -> bytes:
+        parts = []
+        while True:
+            if self._chunk_left == 0:
+                size_line = await self.reader.readline()
+                self._chunk_left = int(size_line.split(b";", 1)[0].strip(), 16)
+                if self._chunk_left == 0:
+                    # Discard trailers
+                    while await self.reader.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    self.done = True
+                    break
+            size = self._chunk_left if amt < 0 else min(amt, self._chunk_left)
+            parts.append(await self.reader.readexactly(size))
+            self._chunk_left -= size
+            if self._chunk_left == 0:
+                await self.reader.readexactly(2)
+            if amt >= 0:
+                break
+        return b"".join(parts)
+
+
+class _BufferedBody:
+    """Body of a response that has already been read, e.g. through a proxy"""
+
+    will_close = True
+
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+        self.done = False
+
+    async def read(self, amt: int = -1) -> bytes:
+        return self._data.read(amt)
+
+
+class AsyncStreamingResponse:
+    """HTTP response whose body is read from the connection on demand
+
+    Use as an async context manager, or call `close`, to release the connection.
+    Reads are decompressed with `decoder` if it is set.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        status: int,
+        reason: str,
+        headers,
+        body: _Body | _BufferedBody,
+        pool: AsyncConnectionPool,
+        release: typing.Callable[[], None],
+    ):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.decoder = None
+        self._body = body
+        self._pool = pool
+        self._release: typing.Callable[[], None] | None = release
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    async def read(self, amt: int = -1) -> bytes:
+        data = await self._read(amt)
+        if self.decoder is None:
+            return data
+        while data:
+            if decoded := self.decoder.decompress(data):
+                return decoded
+            data = await self._read(amt)
+        return self.decoder.flush()
+
+    async def _read(self, amt: int) -> bytes:
+        try:
+            return await self._pool._wait(self._body.read(amt))
+        except (TimeoutError, OSError, EOFError, ValueError) as exc:
+            self._body.will_close = True
+            self.close()
+            raise urllib.error.URLError(exc) from exc
+
+    async def iter_chunks(self, chunk_size: int) -> typing.AsyncIterator[bytes]:
+        """Yield the body in chunks of at most `chunk_size` bytes"""
+        while chunk := await self.read(chunk_size):
+            yield chunk
+
+    def getheader(self, name: str, default: str | None = None) -> str | None:
+        return self.headers.get(name, default)
+
+    def close(self):
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+
+async def _read_head(reader: asyncio.StreamReader, method: str):
+    """Read the status line and headers of a response"""
+    while True:
+        status_line = await reader.readline()
+        if not status_line:
+            raise http.client.RemoteDisconnected(
+                "Remote end closed connection without response"
+            )
+        try:
+            version, status_code, *reason_parts = (
+                status_line.decode("iso-8859-1").rstrip("\r\n").split(" ", 2)
+            )
+            status = int(status_code)
+        except ValueError:
+            raise http.client.BadStatusLine(repr(status_line)) from None
+        reason = reason_parts[0] if reason_parts else ""
+
+        header_lines = []
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            header_lines.append(line.decode("iso-8859-1"))
+        headers = email.parser.Parser(_class=http.client.HTTPMessage).parsestr(
+            "".join(header_lines)
+        )
+        # Skip interim responses such as 100 Continue
+        if status >= 200 or status == 101:
+            break
+
+    connection = (headers.get("Connection") or "").lower()
+    will_close = "close" in connection or (
+        version == "HTTP/1.0" and "keep-alive" not in connection
+    )
+
+    if method == "HEAD" or status in (204, 304):
+        body = _Body(reader, 0, will_close=will_close)
+    elif "chunked" in (headers.get("Transfer-Encoding") or "").lower():
+        body = _Body(reader, None, chunked=True, will_close=will_close)
+    elif headers.get("Content-Length") is not None:
+        body = _Body(reader, int(headers["Content-Length"]), will_close=will_close)
+    else:
+        body = _Body(reader, None)
+    return status, reason, headers, body
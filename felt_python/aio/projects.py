@@ -0,0 +1,75 @@
+"""Projects
+
+Async versions of the functions in `felt_python.projects`.
+"""
+
+from ..projects import PROJECT, PROJECT_UPDATE, PROJECTS
+from .api import load_json, make_request
+
+
+async def list_projects(workspace_id: str | None = None, api_token: str | None = None):
+    """List all projects accessible to the authenticated user"""
+    url = PROJECTS
+    if workspace_id:
+        url = f"{url}?workspace_id={workspace_id}"
+    response = await make_request(
+        url=url,
+        method="GET",
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def create_project(name: str, visibility: str, api_token: str | None = None):
+    """Create a new project"""
+    response = await make_request(
+        url=PROJECTS,
+        method="POST",
+        json={"name": name, "visibility": visibility},
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def get_project(project_id: str, api_token: str | None = None):
+    """Get details of a project"""
+    response = await make_request(
+        url=PROJECT.format(project_id=project_id),
+        method="GET",
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def update_project(
+    project_id: str,
+    name: str | None = None,
+    visibility: str | None = None,
+    api_token: str | None = None,
+):
+    """Update a project's details"""
+    json_args = {}
+    if name is not None:
+        json_args["name"] = name
+    if visibility is not None:
+        json_args["visibility"] = visibility
+
+    response = await make_request(
+        url=PROJECT_UPDATE.format(project_id=project_id),
+        method="POST",
+        json=json_args,
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def delete_project(project_id: str, api_token: str | None = None):
+    """Delete a project
+
+    Note: This will delete all Folders and Maps inside the project!
+    """
+    await make_request(
+        url=PROJECT.format(project_id=project_id),
+        method="DELETE",
+        api_token=api_token,
+    )
@@ -0,0 +1,94 @@
+"""Sources
+
+Async versions of the functions in `felt_python.sources`.
+"""
+
+from ..sources import SOURCE, SOURCE_SYNC, SOURCE_UPDATE, SOURCES
+from .api import load_json, make_request
+
+
+async def list_sources(workspace_id: str | None = None, api_token: str | None = None):
+    """List all sources accessible to the authenticated user"""
+    url = SOURCES
+    if workspace_id:
+        url = f"{url}?workspace_id={workspace_id}"
+    response = await make_request(
+        url=url,
+        method="GET",
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def create_source(
+    name: str,
+    connection: dict[str, str],
+    permissions: dict[str, str] | None = None,
+    api_token: str | None = None,
+):
+    """Create a new source"""
+    json_payload = {"name": name, "connection": connection}
+    if permissions:
+        json_payload["permissions"] = permissions
+
+    response = await make_request(
+        url=SOURCES,
+        method="POST",
+        json=json_payload,
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def get_source(source_id: str, api_token: str | None = None):
+    """Get details of a source"""
+    response = await make_request(
+        url=SOURCE.format(source_id=source_id),
+        method="GET",
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def update_source(
+    source_id: str,
+    name: str | None = None,
+    connection: dict[str, str] | None = None,
+    permissions: dict[str, str] | None = None,
+    api_token: str | None = None,
+):
+    """Update a source's details"""
+    json_payload: dict = {}
+    if name is not None:
+        json_payload["name"] = name
+    if connection is not None:
+        json_payload["connection"] = connection
+    if permissions is not None:
+        json_payload["permissions"] = permissions
+
+    response = await make_request(
+        url=SOURCE_UPDATE.format(source_id=source_id),
+        method="POST",
+        json=json_payload,
+        api_token=api_token,
+    )
+    return load_json(response)
+
+
+async def delete_source(source_id: str, api_token: str | None = None):
+    """Delete a source"""
+    await make_request(
+        url=SOURCE.format(source_id=source_id),
+        method="DELETE",
+        api_token=api_token,
+    )
+
+
+async def sync_source(source_id: str, api_token: str | None = None):
+    """Trigger synchronization of a source"""
+    response = await make_request(
+        url=SOURCE_SYNC.format(source_id=source_id),
+        method="POST",
+        api_token=api_token,
+    )
+    return load_json(response)
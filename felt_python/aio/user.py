@@ -0,0 +1,17 @@
+"""User
+
+Async versions of the functions in `felt_python.user`.
+"""
+
+from ..user import USER
+from .api import load_json, make_request
+
+
+async def get_current_user(api_token: str | None = None):
+    """Get details of the currently authenticated user"""
+    response = await make_request(
+        url=USER,
+        method="GET",
+        api_token=api_token,
+    )
+    return load_json(response)
@@ -1,11 +1,10 @@
 """Wrapper for API calls using requests"""
 
-import http.client
-import json as json_
+import contextvars
 import os
+import threading
 import typing
-import urllib.request
-from importlib.metadata import version, PackageNotFoundError
+
 
 try:
     import certifi
@@ -14,42 +13,78 @@ except ImportError:
 else:
     os.putenv("SSL_CERT_FILE", certifi.where())
 
-from .exceptions import AuthError
+from .codec import (  # noqa: F401
+    JSONCodec,
+    decode_json,
+    encode_json,
+    get_json_codec,
+    load_json,
+    set_json_codec,
+)
+from .pool import ConnectionPool, Response, StreamingResponse
+
+
+if typing.TYPE_CHECKING:
+    from .client import FeltClient
 
 
 BASE_URL = os.getenv("FELT_BASE_URL", "https://felt.com/api/v2/")
 
+# Shared by all modules so that consecutive calls reuse open connections
+connection_pool = ConnectionPool()
+
+# Client used by the module-level functions. FeltClient methods set this for the
+# duration of the call so that nested requests go through the same client.
+current_client: contextvars.ContextVar["FeltClient | None"] = contextvars.ContextVar(
+    "felt_client", default=None
+)
+_default_client: "FeltClient | None" = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> "FeltClient":
+    """Return the client used by module-level functions, creating it if needed"""
+    global _default_client
+    if _default_client is None:
+        from .client import FeltClient
+
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = FeltClient(pool=connection_pool)
+    return _default_client
+
+
+def set_default_client(client: "FeltClient | None"):
+    """Replace the client used by module-level functions
+
+    Passing None discards the current default client, so that a new one is
+    created (reading FELT_API_TOKEN again) on the next request.
+    """
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
+
+
+def get_client() -> "FeltClient":
+    """Return the client that requests in the current context should use"""
+    return current_client.get() or get_default_client()
+
 
 def make_request(
     url: str,
     method: typing.Literal["GET", "POST", "PATCH", "DELETE"],
-    json: dict | list | None = None,
+    json: dict | list | bytes | None = None,
     api_token: str | None = None,
-) -> http.client.HTTPResponse:
+) -> Response:
     """Basic wrapper for requests that adds auth"""
-    if not api_token:
-        try:
-            api_token = os.environ["FELT_API_TOKEN"]
-        except KeyError as exc:
-            raise AuthError(
-                "No API token found. Pass explicitly or set the FELT_API_TOKEN environment variable"
-            ) from exc
-
-    try:
-        package_version = version("felt_python")
-    except PackageNotFoundError:
-        package_version = "local"
-
-    data, headers = (
-        None,
-        {
-            "Authorization": f"Bearer {api_token}",
-            "User-Agent": f"felt-python/{package_version}",
-        },
-    )
-    if json is not None:
-        data = json_.dumps(json).encode("utf8")
-        headers["Content-Type"] = "application/json"
-
-    request = urllib.request.Request(url, data=data, headers=headers, method=method)
-    return urllib.request.urlopen(request)
+    return get_client().request(url, method, json=json, api_token=api_token)
+
+
+def stream_request(
+    url: str,
+    method: typing.Literal["GET", "POST", "PATCH", "DELETE"] = "GET",
+    json: dict | list | bytes | None = None,
+    api_token: str | None = None,
+) -> StreamingResponse:
+    """Like `make_request`, but the response body is read on demand"""
+    return get_client().stream(url, method, json=json, api_token=api_token)
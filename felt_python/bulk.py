@@ -0,0 +1,173 @@
+"""Run many API calls concurrently"""
+
+import concurrent.futures
+import contextvars
+import statistics
+import threading
+import time
+import typing
+
+from . import api
+
+
+if typing.TYPE_CHECKING:
+    from .client import FeltClient
+
+
+class Call:
+    """A function and the arguments to call it with
+
+    Args:
+        func: Function to call, e.g. `felt_python.get_map`
+        *args: Positional arguments
+        **kwargs: Keyword arguments
+    """
+
+    def __init__(self, func: typing.Callable, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self):
+        return self.func(*self.args, **self.kwargs)
+
+    def __repr__(self):
+        name = getattr(self.func, "__name__", repr(self.func))
+        args = [repr(a) for a in self.args]
+        args += [f"{k}={v!r}" for k, v in self.kwargs.items()]
+        return f"{name}({', '.join(args)})"
+
+
+class Result:
+    """Outcome of a call: its return value, or the exception it raised"""
+
+    def __init__(
+        self,
+        call: Call,
+        value: typing.Any = None,
+        error: BaseException | None = None,
+        elapsed: float = 0.0,
+    ):
+        self.call = call
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self):
+        """Return the value, or raise the exception of a failed call"""
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def __repr__(self):
+        outcome = f"error={self.error!r}" if self.error else f"value={self.value!r}"
+        return f"Result({self.call!r}, {outcome})"
+
+
+class Results(list[Result]):
+    """Results in the order of the calls, with aggregate statistics"""
+
+    def __init__(self, results: typing.Iterable[Result], elapsed: float):
+        super().__init__(results)
+        self.elapsed = elapsed
+
+    @property
+    def values(self) -> list:
+        """Return values of all calls, None for those that failed"""
+        return [result.value for result in self]
+
+    @property
+    def errors(self) -> list[Result]:
+        """Results of the calls that raised"""
+        return [result for result in self if not result.ok]
+
+    def stats(self) -> dict[str, float]:
+        """Counts, wall time and per-call latency percentiles in seconds"""
+        latencies = sorted(result.elapsed for result in self)
+        stats = {
+            "calls": len(self),
+            "succeeded": len(self) - len(self.errors),
+            "failed": len(self.errors),
+            "elapsed": self.elapsed,
+        }
+        if latencies:
+            stats.update(
+                {
+                    "latency_total": sum(latencies),
+                    "latency_mean": statistics.fmean(latencies),
+                    "latency_p50": _percentile(latencies, 0.5),
+                    "latency_p95": _percentile(latencies, 0.95),
+                    "latency_max": latencies[-1],
+                }
+            )
+        return stats
+
+
+def run(
+    calls: typing.Iterable[Call | tuple],
+    max_workers: int = 8,
+    client: "FeltClient | None" = None,
+    progress: typing.Callable[[int, int], None] | None = None,
+) -> Results:
+    """Run API calls concurrently on a bounded thread pool
+
+    Calls share the connection pool of the client they run with. A call that
+    raises doesn't stop the others; its exception is kept in its result.
+
+    Args:
+        calls: Calls to make, as `Call` objects or `(func, *args)` tuples
+        max_workers: Maximum number of calls in flight. Keep this at or below
+            the connection pool's `maxsize` so connections are reused.
+        client: Client to make the calls with. Defaults to the current client.
+        progress: Optional callable receiving the number of finished calls and
+            the total after each call
+
+    Returns:
+        The results, in the same order as `calls`
+
+    Example:
+        results = bulk.run(
+            [bulk.Call(felt_python.get_map, map_id) for map_id in map_ids]
+        )
+        maps = [result.value for result in results if result.ok]
+    """
+    pending = [c if isinstance(c, Call) else Call(*c) for c in calls]
+    client = client or api.get_client()
+    total = len(pending)
+    done = 0
+    lock = threading.Lock()
+
+    def run_one(call: Call) -> Result:
+        nonlocal done
+        start = time.perf_counter()
+        try:
+            result = Result(call, value=call())
+        except Exception as exc:  # noqa: BLE001 - calls are arbitrary functions
+            result = Result(call, error=exc)
+        result.elapsed = time.perf_counter() - start
+        if progress is not None:
+            with lock:
+                done += 1
+                progress(done, total)
+        return result
+
+    def submit(executor, call: Call):
+        # Each call runs in a copy of this context with the client selected
+        context = contextvars.copy_context()
+        context.run(api.current_client.set, client)
+        return executor.submit(context.run, run_one, call)
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [submit(executor, call) for call in pending]
+        results = [future.result() for future in futures]
+    return Results(results, time.perf_counter() - start)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    return values[min(len(values) - 1, max(0, round(q * len(values)) - 1))]
@@ -0,0 +1,222 @@
+"""In-memory cache of API responses"""
+
+import collections
+import hashlib
+import re
+import threading
+import time
+import urllib.parse
+
+from .pool import Response
+
+
+# Endpoints whose responses change without a mutating call from this client
+DEFAULT_TTLS = {
+    "maps/{map_id}/layers/{layer_id}/get_export_link": 0.0,
+    "maps/{map_id}/layers/{layer_id}/custom_exports/{export_id}": 0.0,
+}
+
+# Top-level collections. Creating an item only changes the listing of its
+# collection, while changing an item also drops the responses under it.
+_COLLECTIONS = frozenset({"maps", "projects", "sources"})
+
+
+class CacheEntry:
+    """A cached response and the validators to revalidate it with"""
+
+    __slots__ = ("body", "expires", "headers", "path", "reason", "status", "ttl")
+
+    def __init__(self, path, status, reason, headers, body, ttl):
+        self.path = path
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.ttl = ttl
+        self.expires = time.monotonic() + ttl
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires
+
+    def validators(self) -> dict[str, str]:
+        """Headers making a request conditional on the entry being outdated"""
+        headers = {}
+        if etag := self.headers.get("ETag"):
+            headers["If-None-Match"] = etag
+        if last_modified := self.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def response(self, url: str) -> Response:
+        return Response(url, self.status, self.reason, self.headers, self.body)
+
+
+class ResponseCache:
+    """LRU cache of GET responses with per-endpoint expiry
+
+    Responses are cached per URL and API token. Once an entry expires, the
+    next request for it is sent with If-None-Match and If-Modified-Since when
+    the response had an ETag or Last-Modified header, and a 304 Not Modified
+    renews the entry without transferring the body again.
+
+    A POST, PATCH or DELETE through a client drops the cached responses of
+    the resource it changes, e.g. updating a layer style on a map drops the
+    cached map, its layers and layer groups, and the listing of the
+    collection it is in, e.g. deleting a source drops the cached sources.
+    Publishing also drops library listings. Calls that don't target a single resource, such as
+    `duplicate_layers`, clear the cache.
+
+    Only API responses are cached; streamed responses, such as element
+    iteration and downloads, never are.
+
+    Args:
+        maxsize: Maximum number of responses to keep
+        ttl: Seconds a response is used without revalidation
+        ttls: Seconds to use instead of `ttl` per endpoint, keyed by URL
+            template, e.g. `{"maps/{map_id}": 5, "user": 300}` or
+            `{felt_python.maps.MAP: 5}`. A TTL of 0 disables caching.
+            Export links and custom export status aren't cached by default.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: float = 30.0,
+        ttls: dict[str, float] | None = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._ttls = [
+            (_template_pattern(template), seconds)
+            for template, seconds in {**DEFAULT_TTLS, **(ttls or {})}.items()
+        ]
+        self._entries: collections.OrderedDict[tuple[str, str], CacheEntry] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._stats: collections.Counter[str] = collections.Counter()
+
+    def stats(self) -> dict[str, int]:
+        """Hits, misses, revalidations, evictions, invalidations and size"""
+        with self._lock:
+            names = ("hits", "misses", "revalidated", "evicted", "invalidated")
+            stats = {name: self._stats[name] for name in names}
+            stats["size"] = len(self._entries)
+        return stats
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._stats["invalidated"] += len(self._entries)
+            self._entries.clear()
+
+    def ttl_for(self, url: str) -> float:
+        """Seconds a response for `url` is cached"""
+        path = "/" + urllib.parse.urlsplit(url).path.strip("/")
+        for pattern, seconds in self._ttls:
+            if pattern.search(path):
+                return seconds
+        return self.ttl
+
+    def get(self, url: str, authorization: str) -> CacheEntry | None:
+        """Return the entry of a request, fresh or not, counting a hit or miss"""
+        key = _key(url, authorization)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            self._stats["hits" if entry is not None and entry.fresh else "misses"] += 1
+        return entry
+
+    def put(self, url: str, authorization: str, path: str, response: Response):
+        """Cache a successful response to the request for `url`
+
+        Args:
+            url: URL of the request
+            authorization: Authorization header of the request
+            path: Path of the request relative to the API root
+            response: The response, with its body decompressed
+        """
+        ttl = self.ttl_for(url)
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        if ttl <= 0 or "no-store" in cache_control:
+            return
+        entry = CacheEntry(
+            path,
+            response.status,
+            response.reason,
+            response.headers,
+            response.getvalue(),
+            ttl,
+        )
+        key = _key(url, authorization)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats["evicted"] += 1
+
+    def renew(self, entry: CacheEntry, headers=None):
+        """Extend an entry after the server confirmed it is unchanged"""
+        if headers is not None:
+            for name in ("ETag", "Last-Modified"):
+                if value := headers.get(name):
+                    del entry.headers[name]
+                    entry.headers[name] = value
+        entry.expires = time.monotonic() + entry.ttl
+        with self._lock:
+            self._stats["revalidated"] += 1
+
+    def expire(self, path: str):
+        """Make the responses for `path` be revalidated on their next request
+
+        Args:
+            path: Path of the request relative to the API root
+        """
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.path == path:
+                    entry.expires = 0.0
+
+    def invalidate(self, path: str):
+        """Drop responses that a mutating request to `path` may have changed
+
+        Args:
+            path: Path of the request relative to the API root
+        """
+        segments = urllib.parse.urlsplit(path).path.strip("/").split("/")
+        if len(segments) == 1 and segments[0] not in _COLLECTIONS:
+            self.clear()
+            return
+
+        # The listing of the collection, and everything under the item
+        listing = segments[0]
+        scopes = ["/".join(segments[:2])] if len(segments) > 1 else []
+        if segments[-1] == "publish":
+            scopes.append("library")
+
+        def affected(entry: CacheEntry) -> bool:
+            entry_path = urllib.parse.urlsplit(entry.path).path.strip("/")
+            return entry_path == listing or any(
+                entry_path == scope or entry_path.startswith(scope + "/")
+                for scope in scopes
+            )
+
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if affected(entry)]
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidated"] += len(stale)
+
+
+def _key(url: str, authorization: str) -> tuple[str, str]:
+    return hashlib.sha256(authorization.encode()).hexdigest()[:16], url
+
+
+def _template_pattern(template: str) -> re.Pattern:
+    """Regex matching the end of the paths of a URL template"""
+    path = urllib.parse.urlsplit(template).path.strip("/")
+    parts = re.split(r"\{[^}]*\}", path)
+    return re.compile("/" + "[^/]+".join(re.escape(part) for part in parts) + "$")
@@ -0,0 +1,467 @@
+"""Reusable client session"""
+
+import functools
+import inspect
+import os
+import time
+import typing
+import urllib.error
+from importlib.metadata import PackageNotFoundError, version
+
+from . import (
+    api,
+    comments,
+    elements,
+    layer_groups,
+    layers,
+    library,
+    maps,
+    projects,
+    sources,
+    user,
+)
+from .cache import CacheEntry, ResponseCache
+from .codec import encode_json
+from .compression import (
+    COMPRESSION_THRESHOLD,
+    accept_encoding,
+    compress,
+    decompress,
+    decompressor,
+)
+from .diskcache import DiskCache, DiskEntry
+from .exceptions import AuthError
+from .pool import ConnectionPool, Response, StreamingResponse
+from .ratelimit import RateLimiter
+from .retry import Retry
+from .singleflight import SingleFlight
+
+
+P = typing.ParamSpec("P")
+R = typing.TypeVar("R")
+
+
+@functools.cache
+def package_version() -> str:
+    """Installed version of felt-python, looked up once per process"""
+    try:
+        return version("felt_python")
+    except PackageNotFoundError:
+        return "local"
+
+
+def _method(
+    func: typing.Callable[P, R],
+) -> typing.Callable[typing.Concatenate["FeltClient", P], R]:
+    """Expose a module-level function as a FeltClient method"""
+    if inspect.isgeneratorfunction(func):
+        return _generator_method(func)
+
+    @functools.wraps(func)
+    def method(self: "FeltClient", *args: P.args, **kwargs: P.kwargs) -> R:
+        token = api.current_client.set(self)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            api.current_client.reset(token)
+
+    return method
+
+
+def _generator_method(func):
+    """Expose a generator function as a method, using the client while it runs"""
+
+    @functools.wraps(func)
+    def method(self: "FeltClient", *args, **kwargs):
+        iterator = func(*args, **kwargs)
+        try:
+            while True:
+                token = api.current_client.set(self)
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    api.current_client.reset(token)
+                yield item
+        finally:
+            iterator.close()
+
+    return method
+
+
+class BaseClient:
+    """Token, base URL and header handling shared by the sync and async clients"""
+
+    def __init__(
+        self,
+        api_token: str | None = None,
+        base_url: str | None = None,
+        retry: Retry | None = None,
+        rate_limit: RateLimiter | None = None,
+        compression: typing.Literal["gzip", "zstd"] | None = None,
+        compression_threshold: int = COMPRESSION_THRESHOLD,
+        cache: ResponseCache | None = None,
+        disk_cache: DiskCache | None = None,
+    ):
+        self.api_token = api_token or os.environ.get("FELT_API_TOKEN")
+        self.base_url = base_url or api.BASE_URL
+        self.retry = retry or Retry()
+        self.rate_limit = rate_limit
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self.cache = cache
+        self.disk_cache = disk_cache
+        self.headers = {
+            "User-Agent": f"felt-python/{package_version()}",
+            "Accept-Encoding": accept_encoding(),
+        }
+        self._authorization = f"Bearer {self.api_token}" if self.api_token else None
+
+    def prepare_request(
+        self,
+        url: str,
+        json: dict | list | bytes | None = None,
+        api_token: str | None = None,
+    ) -> tuple[str, bytes | None, dict[str, str]]:
+        """Return the URL, body and headers to send an API request with
+
+        `json` is serialized with the configured JSON codec unless it is bytes,
+        which are sent as they are.
+        """
+        headers = self.headers.copy()
+        headers["Authorization"] = self._get_authorization(api_token)
+        if self.base_url != api.BASE_URL and url.startswith(api.BASE_URL):
+            url = self.base_url + url[len(api.BASE_URL) :]
+
+        data = None
+        if isinstance(json, bytes):
+            data = json
+        elif json is not None:
+            data = encode_json(json)
+        if data is not None:
+            headers["Content-Type"] = "application/json"
+            if self.compression and len(data) >= self.compression_threshold:
+                data = compress(data, self.compression)
+                headers["Content-Encoding"] = self.compression
+        return url, data, headers
+
+    @staticmethod
+    def decode_response(response):
+        """Decompress a response according to its Content-Encoding"""
+        encoding = response.headers.get("Content-Encoding")
+        if not encoding:
+            return response
+        if isinstance(response, Response):
+            body = decompress(response.getvalue(), encoding)
+            return Response(
+                response.url, response.status, response.reason, response.headers, body
+            )
+        response.decoder = decompressor(encoding)
+        return response
+
+    def cache_path(self, url: str) -> str | None:
+        """Path of a request relative to the API root if it goes through a cache"""
+        if self.cache is None and self.disk_cache is None:
+            return None
+        if not url.startswith(self.base_url):
+            return None
+        return url[len(self.base_url) :]
+
+    def cached_response(
+        self, url: str, headers: dict[str, str]
+    ) -> tuple[Response | None, CacheEntry | DiskEntry | None]:
+        """Look up a GET request in the caches
+
+        Returns a fresh cached response to use as is, or else the stored entry
+        to revalidate, whose validators are added to `headers`.
+        """
+        authorization = headers["Authorization"]
+        entry: CacheEntry | DiskEntry | None = None
+        if self.cache is not None:
+            entry = self.cache.get(url, authorization)
+            if entry is not None and entry.fresh:
+                return entry.response(url), None
+        if (
+            entry is None
+            and self.disk_cache is not None
+            and self.disk_cache.handles(url)
+        ):
+            entry = self.disk_cache.get(url, authorization)
+        if entry is not None:
+            headers.update(entry.validators())
+        return None, entry
+
+    def not_modified(self, url, path, headers, entry, response_headers) -> Response:
+        """Return the cached response after a 304 Not Modified"""
+        if isinstance(entry, CacheEntry):
+            assert self.cache is not None
+            self.cache.renew(entry, response_headers)
+            return entry.response(url)
+        assert self.disk_cache is not None
+        self.disk_cache.renew(entry, response_headers)
+        response = entry.response(url)
+        if self.cache is not None:
+            self.cache.put(url, headers["Authorization"], path, response)
+        return response
+
+    @staticmethod
+    def shared_response(response: Response) -> Response:
+        """Copy of a response shared with another caller, with its own position"""
+        return Response(
+            response.url,
+            response.status,
+            response.reason,
+            response.headers,
+            response.getvalue(),
+        )
+
+    def store_response(self, url, path, headers, response: Response):
+        """Keep the response to a GET request in the caches"""
+        authorization = headers["Authorization"]
+        if self.cache is not None:
+            self.cache.put(url, authorization, path, response)
+        if self.disk_cache is not None and self.disk_cache.handles(url):
+            self.disk_cache.put(url, authorization, path, response)
+
+    def _get_authorization(self, api_token: str | None) -> str:
+        if api_token:
+            return f"Bearer {api_token}"
+        if self._authorization:
+            return self._authorization
+        # Token was not available when the client was created, it may be now
+        try:
+            return f"Bearer {os.environ['FELT_API_TOKEN']}"
+        except KeyError as exc:
+            raise AuthError(
+                "No API token found. Pass explicitly or set the FELT_API_TOKEN environment variable"
+            ) from exc
+
+
+class FeltClient(BaseClient):
+    """Session for the Felt API
+
+    Resolves the API token, base URL and default headers once and owns the
+    connection pool used for every request. All API functions are available
+    as methods, e.g. `client.create_map(...)`. Module-level functions such as
+    `felt_python.create_map` delegate to a default client.
+
+    Args:
+        api_token: API token to authenticate with. Defaults to the
+            FELT_API_TOKEN environment variable.
+        base_url: Base URL of the API. Defaults to the FELT_BASE_URL
+            environment variable or the production API.
+        pool: Connection pool to send requests through. A new pool is
+            created if not provided.
+        retry: Policy for retrying failed requests. Defaults to retrying
+            rate limited and transiently failing requests a few times. Pass
+            `Retry(max_attempts=1)` to disable retries.
+        rate_limit: Optional rate limiter that requests wait for before being
+            sent. Share one between clients to limit them together.
+        compression: Content-Encoding to compress JSON request bodies with.
+            "zstd" requires the zstandard package. Responses are always
+            decompressed transparently.
+        compression_threshold: Minimum size in bytes of a request body for it
+            to be compressed
+        cache: Optional cache for the responses of GET requests, which the
+            client's own mutating requests invalidate. Share one between
+            clients to cache for them together.
+        disk_cache: Optional persistent cache for library listings and
+            downloaded layers, reused when the server reports them unchanged
+        coalesce: Whether concurrent identical GET requests share a single
+            request, see `single_flight.stats()` for how many did
+    """
+
+    def __init__(
+        self,
+        api_token: str | None = None,
+        base_url: str | None = None,
+        pool: ConnectionPool | None = None,
+        retry: Retry | None = None,
+        rate_limit: RateLimiter | None = None,
+        compression: typing.Literal["gzip", "zstd"] | None = None,
+        compression_threshold: int = COMPRESSION_THRESHOLD,
+        cache: ResponseCache | None = None,
+        disk_cache: DiskCache | None = None,
+        coalesce: bool = False,
+    ):
+        super().__init__(
+            api_token,
+            base_url,
+            retry,
+            rate_limit,
+            compression,
+            compression_threshold,
+            cache,
+            disk_cache,
+        )
+        self.pool = pool or ConnectionPool()
+        self.single_flight = SingleFlight() if coalesce else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close all idle connections held by the client"""
+        self.pool.clear()
+
+    def request(
+        self,
+        url: str,
+        method: typing.Literal["GET", "POST", "PATCH", "DELETE"],
+        json: dict | list | bytes | None = None,
+        api_token: str | None = None,
+    ) -> Response:
+        """Send an authenticated request to the API, retrying if needed"""
+        return self._request(url, method, json, api_token, stream=False)
+
+    def stream(
+        self,
+        url: str,
+        method: typing.Literal["GET", "POST", "PATCH", "DELETE"] = "GET",
+        json: dict | list | bytes | None = None,
+        api_token: str | None = None,
+    ) -> StreamingResponse:
+        """Send an authenticated request and return a response read on demand
+
+        Only opening the response is retried. Close the response, or use it as
+        a context manager, to release its connection.
+        """
+        return self._request(url, method, json, api_token, stream=True)
+
+    def _request(self, url, method, json, api_token, stream):
+        url, data, headers = self.prepare_request(url, json, api_token)
+        if method != "GET" or stream:
+            try:
+                return self._retrying(method, url, data, headers, stream)
+            finally:
+                path = self.cache_path(url)
+                if method != "GET" and path is not None and self.cache is not None:
+                    self.cache.invalidate(path)
+        if self.single_flight is None:
+            return self._get(url, headers)
+        key = (url, headers["Authorization"])
+        response, shared = self.single_flight.do(key, self._get, url, headers)
+        return self.shared_response(response) if shared else response
+
+    def _get(self, url, headers):
+        path = self.cache_path(url)
+        if path is None:
+            return self._retrying("GET", url, None, headers, False)
+        cached, entry = self.cached_response(url, headers)
+        if cached is not None:
+            return cached
+        try:
+            response = self._retrying("GET", url, None, headers, False)
+        except urllib.error.HTTPError as exc:
+            if exc.code != 304 or entry is None:
+                raise
+            return self.not_modified(url, path, headers, entry, exc.headers)
+        self.store_response(url, path, headers, response)
+        return response
+
+    def _retrying(self, method, url, data, headers, stream):
+        attempt = 1
+        while True:
+            try:
+                response = self._send(method, url, data, headers, stream)
+                return self.decode_response(response)
+            except urllib.error.URLError as exc:
+                delay = self.retry.get_delay(method, attempt, exc)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    def _send(self, method, url, data, headers, stream):
+        send = self.pool.stream if stream else self.pool.urlopen
+        if self.rate_limit is None:
+            return send(method, url, body=data, headers=headers)
+
+        key = headers["Authorization"]
+        self.rate_limit.acquire(key)
+        try:
+            response = send(method, url, body=data, headers=headers)
+        except urllib.error.HTTPError as exc:
+            self.rate_limit.release(key, exc.headers, exc.code)
+            raise
+        except BaseException:
+            self.rate_limit.release(key)
+            raise
+        # Streamed bodies are read later, the request counts as done once open
+        self.rate_limit.release(key, response.headers, response.status)
+        return response
+
+    # Maps
+    create_map = _method(maps.create_map)
+    delete_map = _method(maps.delete_map)
+    get_map = _method(maps.get_map)
+    update_map = _method(maps.update_map)
+    move_map = _method(maps.move_map)
+    create_embed_token = _method(maps.create_embed_token)
+    add_source_layer = _method(maps.add_source_layer)
+    duplicate_map = _method(maps.duplicate_map)
+    # Layers
+    list_layers = _method(layers.list_layers)
+    upload_file = _method(layers.upload_file)
+    upload_files = _method(layers.upload_files)
+    upload_geodataframe = _method(layers.upload_geodataframe)
+    upload_dataframe = _method(layers.upload_dataframe)
+    upload_url = _method(layers.upload_url)
+    refresh_file_layer = _method(layers.refresh_file_layer)
+    refresh_url_layer = _method(layers.refresh_url_layer)
+    get_layer = _method(layers.get_layer)
+    wait_for_layers = _method(layers.wait_for_layers)
+    update_layer_style = _method(layers.update_layer_style)
+    get_export_link = _method(layers.get_export_link)
+    download_layer = _method(layers.download_layer)
+    update_layers = _method(layers.update_layers)
+    delete_layer = _method(layers.delete_layer)
+    publish_layer = _method(layers.publish_layer)
+    create_custom_export = _method(layers.create_custom_export)
+    get_custom_export_status = _method(layers.get_custom_export_status)
+    download_custom_export = _method(layers.download_custom_export)
+    duplicate_layers = _method(layers.duplicate_layers)
+    # Layer groups
+    list_layer_groups = _method(layer_groups.list_layer_groups)
+    get_layer_group = _method(layer_groups.get_layer_group)
+    update_layer_group = _method(layer_groups.update_layer_group)
+    update_layer_groups = _method(layer_groups.update_layer_groups)
+    delete_layer_group = _method(layer_groups.delete_layer_group)
+    publish_layer_group = _method(layer_groups.publish_layer_group)
+    # Elements
+    list_elements = _method(elements.list_elements)
+    iter_elements = _method(elements.iter_elements)
+    list_element_groups = _method(elements.list_element_groups)
+    get_element_group = _method(elements.get_element_group)
+    iter_element_group = _method(elements.iter_element_group)
+    upsert_elements = _method(elements.upsert_elements)
+    upsert_elements_batched = _method(elements.upsert_elements_batched)
+    diff_elements = _method(elements.diff_elements)
+    sync_elements = _method(elements.sync_elements)
+    delete_element = _method(elements.delete_element)
+    upsert_element_groups = _method(elements.upsert_element_groups)
+    # Projects
+    list_projects = _method(projects.list_projects)
+    create_project = _method(projects.create_project)
+    get_project = _method(projects.get_project)
+    update_project = _method(projects.update_project)
+    delete_project = _method(projects.delete_project)
+    # Sources
+    list_sources = _method(sources.list_sources)
+    create_source = _method(sources.create_source)
+    get_source = _method(sources.get_source)
+    update_source = _method(sources.update_source)
+    delete_source = _method(sources.delete_source)
+    sync_source = _method(sources.sync_source)
+    # Library
+    list_library_layers = _method(library.list_library_layers)
+    # Comments
+    export_comments = _method(comments.export_comments)
+    resolve_comment = _method(comments.resolve_comment)
+    delete_comment = _method(comments.delete_comment)
+    # User
+    get_current_user = _method(user.get_current_user)
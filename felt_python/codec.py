@@ -0,0 +1,125 @@
+"""JSON encoding and decoding of request and response bodies"""
+
+import json
+import typing
+
+
+try:
+    import orjson  # type: ignore[import-not-found]
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec  # type: ignore[import-not-found]
+except ImportError:
+    msgspec = None  # type: ignore[assignment]
+
+
+class JSONCodec:
+    """Functions encoding Python objects to JSON bytes and decoding them back
+
+    Args:
+        name: Name of the codec, e.g. "orjson"
+        encode: Function encoding an object to UTF-8 JSON bytes
+        decode: Function decoding UTF-8 JSON bytes (or a str) to an object
+    """
+
+    def __init__(
+        self,
+        name: str,
+        encode: typing.Callable[[typing.Any], bytes],
+        decode: typing.Callable[[bytes | str], typing.Any],
+    ):
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+
+    def __repr__(self):
+        return f"JSONCodec({self.name!r})"
+
+
+def _stdlib_encode(obj: typing.Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf8")
+
+
+def _orjson_encode(obj: typing.Any) -> bytes:
+    try:
+        return orjson.dumps(
+            obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    except TypeError:
+        # e.g. integers beyond 64 bits, which the standard library supports
+        return _stdlib_encode(obj)
+
+
+def _msgspec_encode(obj: typing.Any) -> bytes:
+    try:
+        return msgspec.json.encode(obj)
+    except TypeError:
+        return _stdlib_encode(obj)
+
+
+def _make_codec(name: str) -> JSONCodec:
+    if name == "orjson":
+        if orjson is None:
+            raise ImportError("The orjson codec requires the orjson package")
+        return JSONCodec("orjson", _orjson_encode, orjson.loads)
+    if name == "msgspec":
+        if msgspec is None:
+            raise ImportError("The msgspec codec requires the msgspec package")
+        return JSONCodec("msgspec", _msgspec_encode, msgspec.json.decode)
+    if name == "json":
+        return JSONCodec("json", _stdlib_encode, json.loads)
+    raise ValueError(f"Unknown JSON codec: {name}")
+
+
+def _default_codec() -> JSONCodec:
+    """The fastest codec available"""
+    if orjson is not None:
+        return _make_codec("orjson")
+    if msgspec is not None:
+        return _make_codec("msgspec")
+    return _make_codec("json")
+
+
+_codec = _default_codec()
+
+
+def get_json_codec() -> JSONCodec:
+    """Return the codec used for request and response bodies"""
+    return _codec
+
+
+def set_json_codec(codec: JSONCodec | str | None):
+    """Replace the codec used for request and response bodies
+
+    Args:
+        codec: A `JSONCodec`, or the name of a built-in one: "orjson",
+            "msgspec" or "json" for the standard library. None selects the
+            fastest one installed, which is the default.
+    """
+    global _codec
+    if codec is None:
+        codec = _default_codec()
+    elif isinstance(codec, str):
+        codec = _make_codec(codec)
+    _codec = codec
+
+
+def encode_json(obj: typing.Any) -> bytes:
+    """Encode an object to UTF-8 JSON bytes"""
+    return _codec.encode(obj)
+
+
+def decode_json(data: bytes | str) -> typing.Any:
+    """Decode JSON bytes or text"""
+    return _codec.decode(data)
+
+
+def load_json(response: typing.IO[bytes]) -> typing.Any:
+    """Decode the JSON body of a response
+
+    A buffered `Response` is decoded from its bytes without copying them.
+    """
+    getvalue = getattr(response, "getvalue", None)
+    return _codec.decode(getvalue() if getvalue is not None else response.read())
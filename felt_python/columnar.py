@@ -0,0 +1,308 @@
+"""Columnar storage for GeoJSON features, backed by NumPy arrays"""
+
+import array
+import typing
+
+
+try:
+    import numpy as np  # type: ignore[import-not-found]
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+
+# Geometry type codes, as used by GeoArrow and shapely.GeometryType
+GEOMETRY_TYPES = {
+    "Point": 0,
+    "LineString": 1,
+    "Polygon": 3,
+    "MultiPoint": 4,
+    "MultiLineString": 5,
+    "MultiPolygon": 6,
+}
+NO_GEOMETRY = -1
+_GEOMETRY_NAMES = {code: name for name, code in GEOMETRY_TYPES.items()}
+
+
+class ColumnarFeatures:
+    """Features stored as flat coordinate buffers and property columns
+
+    Every geometry is stored with the three levels of a MultiPolygon, in the
+    layout used by GeoArrow: `coords` holds the x, y of all vertices,
+    `ring_offsets` delimits the rings (or lines, or points) in `coords`,
+    `part_offsets` the parts in the rings and `geometry_offsets` each
+    feature's parts. A Point is thus one part with one ring of one vertex.
+    Z values are dropped.
+
+    Features are only converted back to GeoJSON dicts when accessed, e.g.
+    `features[0]` or `for feature in features`.
+
+    Attributes:
+        ids: Feature IDs
+        geometry_types: Geometry type code of each feature, see
+            `GEOMETRY_TYPES`, or `NO_GEOMETRY`
+        coords: Array of shape (n, 2) with the x, y of every vertex
+        ring_offsets: Start of each ring in `coords`, plus the end of the last
+        part_offsets: Start of each part in the rings, plus the end of the last
+        geometry_offsets: Start of each feature in the parts, plus the end
+        properties: Property name to array of values, with None where a
+            feature lacks the property
+    """
+
+    def __init__(
+        self,
+        ids: "np.ndarray",
+        geometry_types: "np.ndarray",
+        coords: "np.ndarray",
+        ring_offsets: "np.ndarray",
+        part_offsets: "np.ndarray",
+        geometry_offsets: "np.ndarray",
+        properties: dict[str, "np.ndarray"],
+    ):
+        self.ids = ids
+        self.geometry_types = geometry_types
+        self.coords = coords
+        self.ring_offsets = ring_offsets
+        self.part_offsets = part_offsets
+        self.geometry_offsets = geometry_offsets
+        self.properties = properties
+
+    @classmethod
+    def from_features(cls, features: typing.Iterable[dict]) -> "ColumnarFeatures":
+        """Build from GeoJSON Features, consuming an iterator one at a time"""
+        builder = ColumnarBuilder()
+        for feature in features:
+            builder.append(feature)
+        return builder.build()
+
+    def __len__(self) -> int:
+        return len(self.geometry_types)
+
+    def __getitem__(self, index: int) -> dict:
+        """Return a feature as a GeoJSON dict"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("feature index out of range")
+
+        feature = {"type": "Feature", "geometry": self.geometry(index)}
+        if self.ids[index] is not None:
+            feature["id"] = _to_python(self.ids[index])
+        feature["properties"] = {
+            name: _to_python(values[index])
+            for name, values in self.properties.items()
+            if values[index] is not None
+        }
+        return feature
+
+    def __iter__(self) -> typing.Iterator[dict]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the arrays, excluding Python objects they refer to"""
+        arrays = [
+            self.ids,
+            self.geometry_types,
+            self.coords,
+            self.ring_offsets,
+            self.part_offsets,
+            self.geometry_offsets,
+            *self.properties.values(),
+        ]
+        return sum(a.nbytes for a in arrays)
+
+    def geometry(self, index: int) -> dict | None:
+        """Return the geometry of a feature as a GeoJSON dict"""
+        code = int(self.geometry_types[index])
+        if code == NO_GEOMETRY:
+            return None
+
+        parts = []
+        start, stop = self.geometry_offsets[index : index + 2]
+        for part in range(start, stop):
+            rings = []
+            ring_start, ring_stop = self.part_offsets[part : part + 2]
+            for ring in range(ring_start, ring_stop):
+                coord_start, coord_stop = self.ring_offsets[ring : ring + 2]
+                rings.append(self.coords[coord_start:coord_stop].tolist())
+            parts.append(rings)
+
+        name = _GEOMETRY_NAMES[code]
+        if name == "Point":
+            coordinates = parts[0][0][0]
+        elif name == "LineString":
+            coordinates = parts[0][0]
+        elif name == "Polygon":
+            coordinates = parts[0]
+        elif name == "MultiPoint":
+            coordinates = [rings[0][0] for rings in parts]
+        elif name == "MultiLineString":
+            coordinates = [rings[0] for rings in parts]
+        else:
+            coordinates = parts
+        return {"type": name, "coordinates": coordinates}
+
+    def to_geojson(self) -> dict:
+        """Convert to a GeoJSON FeatureCollection dict"""
+        return {"type": "FeatureCollection", "features": list(self)}
+
+    def to_geodataframe(
+        self,
+    ) -> "geopandas.GeoDataFrame":  # type: ignore[name-defined] # noqa: F821
+        """Convert to a GeoDataFrame, building geometries from the coordinate arrays
+
+        Requires geopandas and shapely 2.
+        """
+        import geopandas  # type: ignore[import-untyped, import-not-found]
+        import shapely  # type: ignore[import-untyped, import-not-found]
+
+        geometries = np.full(len(self), None, dtype=object)
+        for code in np.unique(self.geometry_types):
+            if code == NO_GEOMETRY:
+                continue
+            selected = np.flatnonzero(self.geometry_types == code)
+            geometries[selected] = self._to_shapely(shapely, int(code), selected)
+
+        index = None
+        if any(feature_id is not None for feature_id in self.ids):
+            index = self.ids
+        return geopandas.GeoDataFrame(
+            dict(self.properties), geometry=geometries, index=index, crs="EPSG:4326"
+        )
+
+    def _to_shapely(self, shapely, code: int, selected: "np.ndarray"):
+        """Build shapely geometries for the selected features of one type"""
+        parts, geometry_offsets = _gather(self.geometry_offsets, selected)
+        rings, part_offsets = _gather(self.part_offsets, parts)
+        coords, ring_offsets = _gather(self.ring_offsets, rings)
+        coords = self.coords[coords]
+
+        name = _GEOMETRY_NAMES[code]
+        offsets: tuple[typing.Any, ...]
+        if name == "Point":
+            offsets = ()
+        elif name == "LineString":
+            offsets = (ring_offsets,)
+        elif name == "Polygon":
+            offsets = (ring_offsets, part_offsets)
+        elif name == "MultiPoint":
+            offsets = (ring_offsets[part_offsets[geometry_offsets]],)
+        elif name == "MultiLineString":
+            offsets = (ring_offsets, part_offsets[geometry_offsets])
+        else:
+            offsets = (ring_offsets, part_offsets, geometry_offsets)
+        return shapely.from_ragged_array(shapely.GeometryType(code), coords, offsets)
+
+
+class ColumnarBuilder:
+    """Accumulates features into a `ColumnarFeatures`
+
+    Coordinates and offsets are collected in compact `array.array` buffers,
+    so that building doesn't need the memory of a list of dicts.
+    """
+
+    def __init__(self):
+        if np is None:
+            raise ImportError("Columnar features require numpy")
+        self._ids: list = []
+        self._geometry_types = array.array("b")
+        self._coords = array.array("d")
+        self._ring_offsets = array.array("q", [0])
+        self._part_offsets = array.array("q", [0])
+        self._geometry_offsets = array.array("q", [0])
+        self._properties: dict[str, list] = {}
+
+    def append(self, feature: dict):
+        index = len(self._geometry_types)
+        self._ids.append(feature.get("id"))
+        self._add_geometry(feature.get("geometry"))
+
+        properties = feature.get("properties") or {}
+        for name, value in properties.items():
+            if name not in self._properties:
+                self._properties[name] = [None] * index
+            self._properties[name].append(value)
+        for name, values in self._properties.items():
+            if len(values) == index:
+                values.append(None)
+
+    def build(self) -> ColumnarFeatures:
+        return ColumnarFeatures(
+            ids=_column(self._ids),
+            geometry_types=np.frombuffer(self._geometry_types, dtype=np.int8),
+            coords=np.frombuffer(self._coords, dtype=np.float64).reshape(-1, 2),
+            ring_offsets=np.frombuffer(self._ring_offsets, dtype=np.int64),
+            part_offsets=np.frombuffer(self._part_offsets, dtype=np.int64),
+            geometry_offsets=np.frombuffer(self._geometry_offsets, dtype=np.int64),
+            properties={
+                name: _column(values) for name, values in self._properties.items()
+            },
+        )
+
+    def _add_geometry(self, geometry: dict | None):
+        if geometry is None:
+            self._geometry_types.append(NO_GEOMETRY)
+            self._geometry_offsets.append(len(self._part_offsets) - 1)
+            return
+
+        name = geometry["type"]
+        if name not in GEOMETRY_TYPES:
+            raise ValueError(f"Unsupported geometry type: {name}")
+        coordinates = geometry["coordinates"]
+        # Normalize to a list of parts, each a list of rings of positions
+        if name == "Point":
+            parts = [[[coordinates]]]
+        elif name == "LineString":
+            parts = [[coordinates]]
+        elif name == "Polygon":
+            parts = [coordinates]
+        elif name == "MultiPoint":
+            parts = [[[position]] for position in coordinates]
+        elif name == "MultiLineString":
+            parts = [[line] for line in coordinates]
+        else:
+            parts = coordinates
+
+        for rings in parts:
+            for ring in rings:
+                for position in ring:
+                    self._coords.append(position[0])
+                    self._coords.append(position[1])
+                self._ring_offsets.append(len(self._coords) // 2)
+            self._part_offsets.append(len(self._ring_offsets) - 1)
+        self._geometry_types.append(GEOMETRY_TYPES[name])
+        self._geometry_offsets.append(len(self._part_offsets) - 1)
+
+
+def _gather(offsets: "np.ndarray", selected: "np.ndarray"):
+    """Indices of the children of the selected items, and their new offsets"""
+    starts, stops = offsets[selected], offsets[selected + 1]
+    lengths = stops - starts
+    new_offsets = np.zeros(len(selected) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_offsets[1:])
+    shift = np.repeat(new_offsets[:-1] - starts, lengths)
+    children = np.arange(new_offsets[-1]) - shift
+    return children, new_offsets
+
+
+def _column(values: list) -> "np.ndarray":
+    """Typed array for values of a single numeric or boolean type, or else object
+
+    Integers mixed with floats are kept in an object array, so that they come
+    back as the integers they were rather than as floats.
+    """
+    kinds = {type(value) for value in values}
+    if kinds in ({int}, {float}, {bool}):
+        try:
+            return np.array(values)
+        except OverflowError:
+            pass
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def _to_python(value):
+    """Convert NumPy scalars back to Python values for GeoJSON"""
+    return value.item() if isinstance(value, np.generic) else value
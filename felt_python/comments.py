@@ -1,10 +1,8 @@
 """Comments"""
 
-import json
-
 from urllib.parse import urljoin
 
-from .api import make_request, BASE_URL
+from .api import BASE_URL, load_json, make_request
 
 
 COMMENT = urljoin(BASE_URL, "maps/{map_id}/comments/{comment_id}")
@@ -29,7 +27,7 @@ def export_comments(map_id: str, format: str = "json", api_token: str | None = N
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def resolve_comment(map_id: str, comment_id: str, api_token: str | None = None):
@@ -48,7 +46,7 @@ def resolve_comment(map_id: str, comment_id: str, api_token: str | None = None):
         method="POST",
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def delete_comment(map_id: str, comment_id: str, api_token: str | None = None):
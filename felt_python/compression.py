@@ -0,0 +1,84 @@
+"""Compression of request bodies, responses and uploaded files"""
+
+import gzip
+import os
+import shutil
+import typing
+import zipfile
+import zlib
+
+
+try:
+    import zstandard  # type: ignore[import-not-found]
+except ImportError:
+    zstandard = None  # type: ignore[assignment]
+
+
+# Request bodies smaller than this are sent uncompressed by default
+COMPRESSION_THRESHOLD = 64 * 1024
+
+# File types that are already compressed and gain nothing from zipping
+COMPRESSED_EXTENSIONS = frozenset(
+    {".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".kmz", ".parquet", ".pmtiles"}
+)
+
+
+def accept_encoding() -> str:
+    """Value for the Accept-Encoding header of the supported encodings"""
+    return "zstd, gzip, deflate" if zstandard is not None else "gzip, deflate"
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a request body with the given Content-Encoding"""
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if encoding == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd compression requires the zstandard package")
+        return zstandard.ZstdCompressor().compress(data)
+    raise ValueError(f"Unsupported compression: {encoding}")
+
+
+def decompressor(encoding: str | None):
+    """Incremental decompressor for a Content-Encoding, or None for identity"""
+    encoding = (encoding or "identity").strip().lower()
+    if encoding == "identity":
+        return None
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        return zlib.decompressobj()
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+
+
+def decompress(data: bytes, encoding: str | None) -> bytes:
+    """Decompress a response body with the given Content-Encoding"""
+    decoder = decompressor(encoding)
+    if decoder is None:
+        return data
+    return decoder.decompress(data) + decoder.flush()
+
+
+def should_zip(file_name: str) -> bool:
+    """Whether zipping a file before upload is likely to make it smaller"""
+    return os.path.splitext(file_name)[1].lower() not in COMPRESSED_EXTENSIONS
+
+
+def zip_file(
+    source: str | typing.IO[bytes], arcname: str, target: str | typing.IO[bytes]
+):
+    """Write a zip archive containing a single file
+
+    Args:
+        source: Path or binary file object of the file to archive
+        arcname: Name of the file inside the archive
+        target: Path or binary file object to write the archive to
+    """
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        if isinstance(source, str):
+            archive.write(source, arcname)
+        else:
+            with archive.open(arcname, "w", force_zip64=True) as entry:
+                shutil.copyfileobj(source, entry)
@@ -0,0 +1,340 @@
+"""Persistent on-disk cache of API responses and downloaded files"""
+
+import collections
+import contextlib
+import hashlib
+import http.client
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import typing
+
+from .cache import _template_pattern
+from .codec import decode_json, encode_json
+from .pool import Response
+
+
+# Endpoints whose responses are kept on disk by default
+DISK_ENDPOINTS = ("library",)
+
+# Headers kept with cached responses
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    meta TEXT NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+def default_path() -> str:
+    """Cache directory in the user's cache home, e.g. ~/.cache/felt-python"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "felt-python")
+
+
+class DiskEntry:
+    """A cached response or file, with the validators to revalidate it with"""
+
+    __slots__ = ("body", "digest", "key", "meta", "size")
+
+    def __init__(self, key: str, digest: str, size: int, meta: dict, body=None):
+        self.key = key
+        self.digest = digest
+        self.size = size
+        self.meta = meta
+        self.body = body
+
+    def validators(self) -> dict[str, str]:
+        """Headers making a request conditional on the entry being outdated"""
+        headers = {}
+        if etag := self.meta["headers"].get("ETag"):
+            headers["If-None-Match"] = etag
+        if last_modified := self.meta["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def response(self, url: str) -> Response:
+        meta = self.meta
+        headers = http.client.HTTPMessage()
+        for name, value in meta["headers"].items():
+            headers[name] = value
+        return Response(url, meta["status"], meta["reason"], headers, self.body)
+
+
+class DiskCache:
+    """Cache of responses and downloaded files that persists across processes
+
+    Entries are indexed in a SQLite database, and their contents stored once
+    per SHA-256 digest in a "blobs" directory next to it. Nothing is reused
+    without asking the server: requests are sent with If-None-Match and
+    If-Modified-Since, and the stored copy is used when the server answers
+    304 Not Modified. Responses without an ETag or Last-Modified header are
+    therefore not stored.
+
+    Clients given a disk cache keep the GET responses of `endpoints` in it,
+    by default the layer library. `download_layer` and
+    `download_custom_export` keep downloaded files in it.
+
+    Once the contents exceed `max_size`, the least recently used entries are
+    evicted. Several processes can share the same directory.
+
+    Args:
+        path: Directory to keep the cache in. Defaults to "felt-python" in
+            the user's cache directory.
+        max_size: Maximum total size of the cached contents in bytes
+        endpoints: URL templates of the GET endpoints to cache, e.g.
+            "library" or "maps/{map_id}/layers"
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike | None = None,
+        max_size: int = 1024**3,
+        endpoints: typing.Iterable[str] = DISK_ENDPOINTS,
+    ):
+        self.path = os.fspath(path or default_path())
+        self.max_size = max_size
+        self._patterns = [_template_pattern(endpoint) for endpoint in endpoints]
+        os.makedirs(os.path.join(self.path, "blobs"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._stats: collections.Counter[str] = collections.Counter()
+        self._db = sqlite3.connect(
+            os.path.join(self.path, "index.sqlite3"),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def handles(self, url: str) -> bool:
+        """Whether GET responses for `url` are kept in this cache"""
+        path = "/" + url.split("?", 1)[0].strip("/")
+        return any(pattern.search(path) for pattern in self._patterns)
+
+    def stats(self) -> dict[str, int]:
+        """Hits, misses, number of entries and total size of their contents
+
+        Hits are stored copies reused after the server confirmed them, and
+        misses lookups that found nothing, both counted in this process only.
+        """
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return {
+                "hits": self._stats["hits"],
+                "misses": self._stats["misses"],
+                "entries": entries,
+                "size": self._total_size(),
+            }
+
+    def clear(self):
+        """Remove every entry and its contents"""
+        with self._transaction() as db:
+            rows = db.execute("SELECT DISTINCT digest FROM entries")
+            digests = [row[0] for row in rows]
+            db.execute("DELETE FROM entries")
+        for digest in digests:
+            _remove(self._blob_path(digest))
+
+    # Responses
+
+    def get(self, url: str, authorization: str) -> DiskEntry | None:
+        """Return the stored response to a request, with its body"""
+        entry = self._get(_response_key(url, authorization))
+        if entry is not None:
+            try:
+                with open(self._blob_path(entry.digest), "rb") as f:
+                    entry.body = f.read()
+                return entry
+            except FileNotFoundError:
+                pass
+        self._count("misses")
+        return None
+
+    def put(self, url: str, authorization: str, path: str, response: Response):
+        """Store a successful response to the request for `url`"""
+        meta = _meta(response.headers)
+        if meta is None:
+            return
+        meta.update(status=response.status, reason=response.reason)
+        body = response.getvalue()
+        digest = hashlib.sha256(body).hexdigest()
+        if not os.path.exists(self._blob_path(digest)):
+            with self._temporary() as (f, temp_name):
+                f.write(body)
+            self._commit_blob(temp_name, digest)
+        self._put(_response_key(url, authorization), digest, len(body), meta)
+
+    def renew(self, entry: DiskEntry, headers=None) -> None:
+        """Mark an entry as used after the server confirmed it is unchanged"""
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE entries SET accessed = ? WHERE key = ?",
+                (time.time(), entry.key),
+            )
+        self._count("hits")
+
+    # Files
+
+    def get_file(self, key: str) -> DiskEntry | None:
+        """Return the entry of a stored file, without its contents"""
+        entry = self._get("file " + key)
+        if entry is None or not os.path.exists(self._blob_path(entry.digest)):
+            self._count("misses")
+            return None
+        return entry
+
+    def put_file(self, key: str, file_name: str, headers):
+        """Store a downloaded file with the validators of the response it came in
+
+        Args:
+            key: Identifier of the file, stable across downloads
+            file_name: Path of the downloaded file
+            headers: Headers of the response the file was downloaded from
+        """
+        meta = _meta(headers)
+        if meta is None:
+            return
+        digest = hashlib.sha256()
+        with self._temporary() as (f, temp_name), open(file_name, "rb") as source:
+            while chunk := source.read(1024 * 1024):
+                digest.update(chunk)
+                f.write(chunk)
+        self._commit_blob(temp_name, digest.hexdigest())
+        self._put("file " + key, digest.hexdigest(), os.path.getsize(file_name), meta)
+
+    def restore_file(self, entry: DiskEntry, file_name: str) -> str:
+        """Copy a stored file to `file_name`
+
+        Raises:
+            FileNotFoundError: If the contents were evicted in the meantime
+        """
+        part_name = f"{file_name}.part"
+        try:
+            shutil.copyfile(self._blob_path(entry.digest), part_name)
+        except FileNotFoundError:
+            _remove(part_name)
+            raise
+        os.replace(part_name, file_name)
+        self.renew(entry)
+        return file_name
+
+    # Internals
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _get(self, key: str) -> DiskEntry | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest, size, meta FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return DiskEntry(key, row[0], row[1], decode_json(row[2]))
+
+    def _put(self, key: str, digest: str, size: int, meta: dict):
+        with self._transaction() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, digest, size, encode_json(meta).decode(), time.time()),
+            )
+            evicted = self._evict(db)
+            placeholders = ",".join("?" * len(evicted))
+            referenced = {
+                row[0]
+                for row in db.execute(
+                    "SELECT DISTINCT digest FROM entries "
+                    f"WHERE digest IN ({placeholders})",
+                    evicted,
+                )
+            }
+        for unreferenced in set(evicted) - referenced:
+            _remove(self._blob_path(unreferenced))
+
+    def _evict(self, db: sqlite3.Connection) -> list[str]:
+        """Delete the least recently used entries beyond the size cap"""
+        evicted = []
+        excess = self._total_size() - self.max_size
+        rows = db.execute("SELECT key, digest, size FROM entries ORDER BY accessed")
+        for key, digest, size in rows.fetchall():
+            if excess <= 0:
+                break
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            evicted.append(digest)
+            if not db.execute(
+                "SELECT 1 FROM entries WHERE digest = ?", (digest,)
+            ).fetchone():
+                excess -= size
+        return evicted
+
+    def _total_size(self) -> int:
+        row = self._db.execute(
+            "SELECT SUM(size) FROM (SELECT DISTINCT digest, size FROM entries)"
+        ).fetchone()
+        return row[0] or 0
+
+    @contextlib.contextmanager
+    def _transaction(self) -> typing.Iterator[sqlite3.Connection]:
+        """Hold the index's write lock, shared with other processes"""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    @contextlib.contextmanager
+    def _temporary(self):
+        """Temporary file in the blob directory, removed if writing it fails"""
+        fd, temp_name = tempfile.mkstemp(dir=os.path.join(self.path, "blobs"))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                yield f, temp_name
+        except BaseException:
+            _remove(temp_name)
+            raise
+
+    def _commit_blob(self, temp_name: str, digest: str):
+        blob_path = self._blob_path(digest)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        os.replace(temp_name, blob_path)
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.path, "blobs", digest[:2], digest)
+
+
+def _response_key(url: str, authorization: str) -> str:
+    return hashlib.sha256(authorization.encode()).hexdigest()[:16] + " " + url
+
+
+def _meta(headers) -> dict | None:
+    """Headers worth keeping, or None if the response can't be revalidated"""
+    kept = {name: headers.get(name) for name in _KEPT_HEADERS if headers.get(name)}
+    if "ETag" not in kept and "Last-Modified" not in kept:
+        return None
+    return {"headers": kept}
+
+
+def _remove(path: str):
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
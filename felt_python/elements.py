@@ -1,10 +1,23 @@
 """Elements and element groups"""
 
+import concurrent.futures
+import contextvars
+import hashlib
 import json
-
+import typing
 from urllib.parse import urljoin
 
-from .api import make_request, BASE_URL
+from .api import (
+    BASE_URL,
+    decode_json,
+    encode_json,
+    load_json,
+    make_request,
+    stream_request,
+)
+from .columnar import ColumnarFeatures
+from .exceptions import REQUEST_ERRORS, BatchError
+from .geojson import iter_features
 from .util import deprecated
 
 
@@ -13,23 +26,56 @@ ELEMENT = urljoin(BASE_URL, "maps/{map_id}/elements/{element_id}")
 ELEMENT_GROUPS = urljoin(BASE_URL, "maps/{map_id}/element_groups")
 ELEMENT_GROUP = urljoin(BASE_URL, "maps/{map_id}/element_groups/{element_group_id}")
 
+# Size of the chunks streamed responses are parsed in
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Default bounds of each request made by upsert_elements_batched
+UPSERT_BATCH_FEATURES = 1000
+UPSERT_BATCH_BYTES = 4 * 1024 * 1024
+
+# Prefix of the element properties managed by Felt, such as its styles
+FELT_PROPERTY_PREFIX = "felt:"
 
-def list_elements(map_id: str, api_token: str | None = None):
+
+def list_elements(map_id: str, api_token: str | None = None, columnar: bool = False):
     """List all elements on a map
 
     Args:
         map_id: The ID of the map to list elements from
         api_token: Optional API token
+        columnar: Whether to return the elements as `ColumnarFeatures`, which
+            stores coordinates and properties in NumPy arrays. Requires numpy.
 
     Returns:
-        GeoJSON FeatureCollection of all elements
+        GeoJSON FeatureCollection of all elements, or `ColumnarFeatures`
     """
+    if columnar:
+        return ColumnarFeatures.from_features(iter_elements(map_id, api_token))
     response = make_request(
         url=ELEMENTS.format(map_id=map_id),
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
+
+
+def iter_elements(map_id: str, api_token: str | None = None):
+    """Iterate over the elements on a map without loading them all at once
+
+    The response is parsed incrementally, so memory use doesn't grow with the
+    number of elements.
+
+    Args:
+        map_id: The ID of the map to list elements from
+        api_token: Optional API token
+
+    Yields:
+        Each element as a GeoJSON Feature
+    """
+    with stream_request(
+        url=ELEMENTS.format(map_id=map_id), api_token=api_token
+    ) as response:
+        yield from iter_features(response.iter_chunks(STREAM_CHUNK_SIZE))
 
 
 def list_element_groups(map_id: str, api_token: str | None = None):
@@ -47,26 +93,57 @@ def list_element_groups(map_id: str, api_token: str | None = None):
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
-def get_element_group(map_id: str, element_group_id: str, api_token: str | None = None):
+def get_element_group(
+    map_id: str,
+    element_group_id: str,
+    api_token: str | None = None,
+    columnar: bool = False,
+):
     """Get contents of an element group
 
     Args:
         map_id: The ID of the map containing the group
         element_group_id: The ID of the element group to list elements from
         api_token: Optional API token
+        columnar: Whether to return the elements as `ColumnarFeatures`
 
     Returns:
-        GeoJSON FeatureCollection of all elements in the group
+        GeoJSON FeatureCollection of all elements in the group, or
+        `ColumnarFeatures`
     """
+    if columnar:
+        return ColumnarFeatures.from_features(
+            iter_element_group(map_id, element_group_id, api_token)
+        )
     response = make_request(
         url=ELEMENT_GROUP.format(map_id=map_id, element_group_id=element_group_id),
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
+
+
+def iter_element_group(
+    map_id: str, element_group_id: str, api_token: str | None = None
+):
+    """Iterate over the elements in a group without loading them all at once
+
+    Args:
+        map_id: The ID of the map containing the group
+        element_group_id: The ID of the element group to list elements from
+        api_token: Optional API token
+
+    Yields:
+        Each element in the group as a GeoJSON Feature
+    """
+    with stream_request(
+        url=ELEMENT_GROUP.format(map_id=map_id, element_group_id=element_group_id),
+        api_token=api_token,
+    ) as response:
+        yield from iter_features(response.iter_chunks(STREAM_CHUNK_SIZE))
 
 
 @deprecated(reason="Please use `get_element_group` instead")
@@ -101,7 +178,7 @@ def upsert_elements(
         GeoJSON FeatureCollection of the created or updated elements
     """
     if isinstance(geojson_feature_collection, str):
-        geojson_feature_collection = json.loads(geojson_feature_collection)
+        geojson_feature_collection = decode_json(geojson_feature_collection)
         assert isinstance(geojson_feature_collection, dict), (
             "geojson_feature_collection must be a valid GeoJSON"
         )
@@ -111,7 +188,364 @@ def upsert_elements(
         json=geojson_feature_collection,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
+
+
+def upsert_elements_batched(
+    map_id: str,
+    features: dict | str | typing.Iterable[dict],
+    max_features: int = UPSERT_BATCH_FEATURES,
+    max_bytes: int = UPSERT_BATCH_BYTES,
+    max_workers: int = 4,
+    api_token: str | None = None,
+):
+    """Create or update many elements in concurrent batches
+
+    Features are encoded one at a time and grouped into requests of at most
+    `max_features` features and `max_bytes` bytes, which are sent
+    concurrently. A feature larger than `max_bytes` is sent on its own.
+
+    Args:
+        map_id: The ID of the map to create or update elements on
+        features: GeoJSON FeatureCollection as dict or JSON string, or an
+            iterable of GeoJSON Features, which is consumed lazily
+        max_features: Maximum number of features per request
+        max_bytes: Maximum size of each request body in bytes
+        max_workers: Maximum number of requests in flight
+        api_token: Optional API token
+
+    Returns:
+        GeoJSON FeatureCollection of the created or updated elements, in the
+        order of the input features
+
+    Raises:
+        BatchError: If some batches failed. Its `result` holds the elements of
+            the batches that succeeded and its `errors` the failed batches.
+    """
+    url = ELEMENTS.format(map_id=map_id)
+
+    def post(body: bytes) -> list[dict]:
+        response = make_request(url=url, method="POST", json=body, api_token=api_token)
+        return load_json(response)["features"]
+
+    results: dict[tuple[int, int], list[dict]] = {}
+    errors: list[tuple[int, int, Exception]] = []
+    pending: dict[concurrent.futures.Future, tuple[int, int]] = {}
+
+    def collect(return_when):
+        done, _ = concurrent.futures.wait(pending, return_when=return_when)
+        for future in done:
+            start, stop = pending.pop(future)
+            try:
+                results[start, stop] = future.result()
+            except REQUEST_ERRORS as exc:
+                errors.append((start, stop, exc))
+
+    batches = _batch_features(_iter_features(features), max_features, max_bytes)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for start, stop, body in batches:
+            # Requests made from the workers go through the caller's client
+            context = contextvars.copy_context()
+            pending[executor.submit(context.run, post, body)] = (start, stop)
+            # Only encode a few batches ahead of the requests in flight
+            if len(pending) >= 2 * max_workers:
+                collect(concurrent.futures.FIRST_COMPLETED)
+        collect(concurrent.futures.ALL_COMPLETED)
+
+    result = {
+        "type": "FeatureCollection",
+        "features": [f for key in sorted(results) for f in results[key]],
+    }
+    if errors:
+        errors.sort(key=lambda error: error[0])
+        raise BatchError(
+            f"{len(errors)} of {len(errors) + len(results)} batches failed",
+            result,
+            errors,
+        )
+    return result
+
+
+def _iter_features(
+    features: dict | str | typing.Iterable[dict],
+) -> typing.Iterable[dict]:
+    if isinstance(features, str):
+        features = typing.cast(dict, decode_json(features))
+    if isinstance(features, dict):
+        assert features.get("type") == "FeatureCollection", (
+            "features must be a GeoJSON FeatureCollection or an iterable of Features"
+        )
+        return features["features"]
+    return features
+
+
+def _batch_features(
+    features: typing.Iterable[dict], max_features: int, max_bytes: int
+) -> typing.Iterator[tuple[int, int, bytes]]:
+    """Yield the range of features in each batch and its encoded request body"""
+    prefix, suffix = b'{"type":"FeatureCollection","features":[', b"]}"
+    batch: list[bytes] = []
+    size = start = 0
+    for index, feature in enumerate(features):
+        encoded = encode_json(feature)
+        if batch and (
+            len(batch) >= max_features
+            or len(prefix) + size + len(encoded) + len(suffix) > max_bytes
+        ):
+            yield start, index, prefix + b",".join(batch) + suffix
+            batch, size, start = [], 0, index
+        batch.append(encoded)
+        size += len(encoded) + 1
+    if batch:
+        yield start, start + len(batch), prefix + b",".join(batch) + suffix
+
+
+def diff_elements(
+    map_id: str,
+    features: dict | str | typing.Iterable[dict],
+    key: str | None = None,
+    precision: int | None = None,
+    delete: bool = True,
+    api_token: str | None = None,
+) -> dict:
+    """Compare features with the elements on a map
+
+    Elements are matched with features by ID, or by the value of the `key`
+    property. A matched element is unchanged if hashes of its geometry and
+    properties are equal to the feature's. Properties managed by Felt, whose
+    names start with "felt:", are left out of the comparison, and a property
+    set to null counts as missing. The upsert of a changed element keeps its
+    "felt:" properties and sets the properties the feature no longer has to
+    null.
+
+    The elements are streamed with `iter_elements` and not kept in memory.
+
+    Args:
+        map_id: The ID of the map to compare with
+        features: GeoJSON FeatureCollection as dict or JSON string, or an
+            iterable of GeoJSON Features
+        key: Property identifying features and the elements made from them.
+            By default features are matched by ID. Elements without the
+            property are left alone.
+        precision: Optional number of decimals to round coordinates to before
+            comparing, to ignore differences in floating point precision
+        delete: Whether elements without a matching feature are deleted
+        api_token: Optional API token
+
+    Returns:
+        A dict with the features to "upsert", carrying the IDs of the elements
+        they update, the IDs of the elements to "delete", and the number of
+        features "created", "updated" and "unchanged"
+
+    Raises:
+        ValueError: If several features have the same ID or `key` value
+    """
+    diff = _ElementDiff(features, key, precision, delete)
+    for element in iter_elements(map_id, api_token):
+        diff.add_element(element)
+    return diff.result()
+
+
+def sync_elements(
+    map_id: str,
+    features: dict | str | typing.Iterable[dict],
+    key: str | None = None,
+    precision: int | None = None,
+    delete: bool = True,
+    max_workers: int = 4,
+    api_token: str | None = None,
+) -> dict:
+    """Make the elements on a map match features, changing only what differs
+
+    Instead of deleting and recreating every element, the features are
+    compared with the current elements as in `diff_elements`. New and changed
+    features are sent with `upsert_elements_batched`, while elements without
+    a matching feature are deleted concurrently, each on up to `max_workers`
+    threads.
+
+    Args:
+        map_id: The ID of the map to update
+        features: GeoJSON FeatureCollection as dict or JSON string, or an
+            iterable of GeoJSON Features
+        key: Property identifying features, see `diff_elements`
+        precision: Decimals to compare coordinates at, see `diff_elements`
+        delete: Whether elements without a matching feature are deleted
+        max_workers: Maximum number of upsert and of delete requests in flight
+        api_token: Optional API token
+
+    Returns:
+        The diff returned by `diff_elements`, with the created and updated
+        elements under "elements" as a GeoJSON FeatureCollection
+
+    Raises:
+        ValueError: If several features have the same ID or `key` value
+        BatchError: If some requests failed. Its `result` holds the diff and
+            the elements that were upserted. Its `errors` are the failed
+            requests, as `(start, stop, exception)` over the items of the
+            diff's "upsert" list followed by its "delete" list.
+    """
+    result = diff_elements(map_id, features, key, precision, delete, api_token)
+    result["elements"] = {"type": "FeatureCollection", "features": []}
+    errors: list[tuple[int, int, Exception]] = []
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Deletes run while the upserts are sent, through the caller's client
+        deletes = [
+            executor.submit(
+                contextvars.copy_context().run,
+                delete_element,
+                map_id,
+                element_id,
+                api_token,
+            )
+            for element_id in result["delete"]
+        ]
+        if result["upsert"]:
+            try:
+                result["elements"] = upsert_elements_batched(
+                    map_id,
+                    result["upsert"],
+                    max_workers=max_workers,
+                    api_token=api_token,
+                )
+            except BatchError as exc:
+                result["elements"] = exc.result
+                errors.extend(exc.errors)
+        offset = len(result["upsert"])
+        for index, future in enumerate(deletes, offset):
+            try:
+                future.result()
+            except REQUEST_ERRORS as exc:
+                errors.append((index, index + 1, exc))
+
+    if errors:
+        raise BatchError(f"{len(errors)} element requests failed", result, errors)
+    return result
+
+
+class _ElementDiff:
+    """State of `diff_elements`, shared with its async version"""
+
+    def __init__(
+        self,
+        features: dict | str | typing.Iterable[dict],
+        key: str | None,
+        precision: int | None,
+        delete: bool,
+    ):
+        self.key = key
+        self.precision = precision
+        self.delete = delete
+        self.local: dict[str, dict] = {}
+        # Features without an ID or key are always created
+        self.created: list[dict] = []
+        for feature in _iter_features(features):
+            feature_key = self._key(feature)
+            if feature_key is None:
+                self.created.append(feature)
+            elif feature_key in self.local:
+                name = "ID" if key is None else f"{key!r} property"
+                raise ValueError(f"Several features have the {name} {feature_key!r}")
+            else:
+                self.local[feature_key] = feature
+        self.matched: set[str] = set()
+        self.upsert: list[dict] = []
+        self.delete_ids: list[str] = []
+        self.unchanged = 0
+
+    def _key(self, feature: dict) -> str | None:
+        if self.key is None:
+            value = feature.get("id")
+        else:
+            value = (feature.get("properties") or {}).get(self.key)
+        return None if value is None else str(value)
+
+    def add_element(self, element: dict):
+        element_key = self._key(element)
+        if element_key is None:
+            return
+        feature = self.local.get(element_key)
+        if feature is None or element_key in self.matched:
+            # No longer in the features, or a duplicate of a matched element
+            if self.delete:
+                self.delete_ids.append(element["id"])
+            return
+        self.matched.add(element_key)
+        properties = _user_properties(feature)
+        element_properties = _user_properties(element)
+        if _fingerprint(feature.get("geometry"), properties, self.precision) == (
+            _fingerprint(element.get("geometry"), element_properties, self.precision)
+        ):
+            self.unchanged += 1
+            return
+        managed = {
+            name: value
+            for name, value in (element.get("properties") or {}).items()
+            if name.startswith(FELT_PROPERTY_PREFIX)
+        }
+        removed = dict.fromkeys(element_properties.keys() - properties.keys())
+        self.upsert.append(
+            {
+                **feature,
+                "id": element["id"],
+                "properties": {
+                    **managed,
+                    **removed,
+                    **(feature.get("properties") or {}),
+                },
+            }
+        )
+
+    def result(self) -> dict:
+        updated = len(self.upsert)
+        created = self.created + [
+            feature
+            for feature_key, feature in self.local.items()
+            if feature_key not in self.matched
+        ]
+        return {
+            "upsert": self.upsert + created,
+            "delete": self.delete_ids,
+            "created": len(created),
+            "updated": updated,
+            "unchanged": self.unchanged,
+        }
+
+
+def _user_properties(feature: dict) -> dict:
+    """Properties of a feature other than those managed by Felt, without nulls"""
+    return {
+        name: value
+        for name, value in (feature.get("properties") or {}).items()
+        if value is not None and not name.startswith(FELT_PROPERTY_PREFIX)
+    }
+
+
+def _fingerprint(geometry: dict | None, properties: dict, precision: int | None):
+    """Hash of a geometry and properties, independent of the order of keys"""
+    geometry = _normalize_coordinates(geometry, precision)
+    encoded = json.dumps(
+        [geometry, properties],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.blake2b(encoded.encode(), digest_size=16).digest()
+
+
+def _normalize_coordinates(value, precision: int | None):
+    """Make numbers floats, so that 1 and 1.0 compare equal, and round them"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if precision is not None:
+            value = round(value, precision)
+        # Adding 0.0 also turns -0.0 into 0.0
+        return float(value) + 0.0
+    if isinstance(value, list):
+        return [_normalize_coordinates(item, precision) for item in value]
+    if isinstance(value, dict):
+        return {k: _normalize_coordinates(v, precision) for k, v in value.items()}
+    return value
 
 
 def delete_element(map_id: str, element_id: str, api_token: str | None = None):
@@ -136,7 +570,7 @@ def post_element_group(
     api_token: str | None = None,
 ):
     if isinstance(json_element, str):
-        json_element = json.loads(json_element)
+        json_element = decode_json(json_element)
         assert isinstance(json_element, dict), (
             "json_element must be a valid JSON object"
         )
@@ -164,4 +598,4 @@ def upsert_element_groups(
         json=element_groups,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
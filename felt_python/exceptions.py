@@ -3,3 +3,35 @@
 
 class AuthError(Exception):
     """Class for authentication errors"""
+
+
+class BatchError(Exception):
+    """Some batches of a batched request failed
+
+    Attributes:
+        result: Combined result of the batches that succeeded
+        errors: `(start, stop, exception)` for each failed batch, where
+            `start` and `stop` delimit its items in the input
+    """
+
+    def __init__(self, message: str, result, errors: list[tuple[int, int, Exception]]):
+        super().__init__(message)
+        self.result = result
+        self.errors = errors
+
+
+class ExportError(Exception):
+    """A custom export failed on the server
+
+    Attributes:
+        status: The export status the API returned
+    """
+
+    def __init__(self, message: str, status: dict):
+        super().__init__(message)
+        self.status = status
+
+
+# What a failed request can raise: HTTP and connection errors are OSErrors,
+# and unexpected responses fail to decode or lack the expected members
+REQUEST_ERRORS = (AuthError, OSError, ValueError, KeyError)
@@ -0,0 +1,364 @@
+"""Run many custom exports concurrently"""
+
+import concurrent.futures
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+import typing
+import urllib.parse
+
+from . import api
+from .client import FeltClient
+from .exceptions import ExportError
+from .layers import (
+    LAYER_CUSTOM_EXPORT_STATUS,
+    _download_file,
+    create_custom_export,
+    get_custom_export_status,
+)
+
+
+class ExportFuture(concurrent.futures.Future):
+    """Handle of a custom export, resolving to the path of the downloaded file
+
+    Attributes:
+        map_id: The ID of the map containing the layer
+        layer_id: The ID of the exported layer
+        output_format: The format the layer is exported in
+        export_id: The ID of the export request, once it has been created
+        status: The last status reported for the export
+        polls: Number of times the status was checked
+    """
+
+    def __init__(
+        self,
+        map_id: str,
+        layer_id: str,
+        output_format: str,
+        filters: list | None = None,
+        file_name: str | None = None,
+    ):
+        super().__init__()
+        self.map_id = map_id
+        self.layer_id = layer_id
+        self.output_format = output_format
+        self.filters = filters
+        self.file_name = file_name
+        self.export_id: str | None = None
+        self.status: str | None = None
+        self.polls = 0
+        self.interval = 0.0
+        self.deadline: float | None = None
+
+    def __repr__(self):
+        state = "cancelled" if self.cancelled() else self.status or "pending"
+        return (
+            f"ExportFuture(layer_id={self.layer_id!r}, "
+            f"export_id={self.export_id!r}, status={state!r})"
+        )
+
+
+class ExportManager:
+    """Create custom exports, poll them together and download them when ready
+
+    `submit` returns at once with an `ExportFuture`. Exports are created on a
+    thread pool, and a single scheduler thread then checks the status of every
+    pending export. Each export is polled quickly at first and less often the
+    longer it takes: the interval starts at `poll_interval` and grows by
+    `backoff` after every check, up to `max_poll_interval`. Completed exports
+    are streamed to disk on the thread pool while the others are still being
+    polled.
+
+    An export that fails resolves its future with an `ExportError`, and one
+    that isn't complete after `max_polls` checks or `timeout` seconds with a
+    `TimeoutError`.
+
+    Args:
+        client: Client to make the requests with. Defaults to the current client.
+        directory: Directory to download exports to, unless `submit` is given
+            a file name. Defaults to the current working directory.
+        max_workers: Maximum number of exports created or downloaded at once
+        max_polling: Maximum number of status checks in flight at once
+        poll_interval: Seconds before the first status check of an export
+        max_poll_interval: Maximum seconds between status checks of an export
+        backoff: Factor the interval between checks of an export grows by
+        max_polls: Maximum number of status checks per export
+        timeout: Maximum seconds an export may take to complete
+        parallel: Number of byte ranges to fetch concurrently per download,
+            see `download_layer`
+
+    Example:
+        with ExportManager(directory="exports") as manager:
+            futures = [
+                manager.submit(map_id, layer_id, "csv", filters=filters)
+                for layer_id in layer_ids
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                print(future.result())
+    """
+
+    def __init__(
+        self,
+        client: FeltClient | None = None,
+        directory: str | os.PathLike | None = None,
+        max_workers: int = 4,
+        max_polling: int = 4,
+        poll_interval: float = 1.0,
+        max_poll_interval: float = 30.0,
+        backoff: float = 1.5,
+        max_polls: int | None = 60,
+        timeout: float | None = None,
+        parallel: int = 1,
+    ):
+        self.client = client or api.get_client()
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+        self.max_polls = max_polls
+        self.timeout = timeout
+        self.parallel = parallel
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        # Status checks don't wait for downloads to free a worker
+        self._poller = concurrent.futures.ThreadPoolExecutor(max_workers=max_polling)
+        # Exports waiting for a status check, as (due time, sequence, future)
+        self._pending: list[tuple[float, int, ExportFuture]] = []
+        self._sequence = itertools.count()
+        # Exports being created or checked, which may be pushed back on to it
+        self._active = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._scheduler: threading.Thread | None = None
+        self._stats = {
+            "submitted": 0,
+            "polls": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def stats(self) -> dict[str, int]:
+        """Exports submitted, completed, failed and timed out, and status checks"""
+        with self._condition:
+            return dict(self._stats)
+
+    def submit(
+        self,
+        map_id: str,
+        layer_id: str,
+        output_format: str,
+        filters: list | None = None,
+        file_name: str | None = None,
+    ) -> ExportFuture:
+        """Create a custom export of a layer and download it once complete
+
+        Args:
+            map_id: The ID of the map containing the layer
+            layer_id: The ID of the layer to export
+            output_format: The format to export in.
+                Options are "csv", "gpkg", or "geojson"
+            filters: Optional list of filters in Felt Style Language filter format
+            file_name: Optional path to save the file to. Defaults to the name
+                of the exported file in `directory`.
+
+        Returns:
+            A future resolving to the path of the downloaded file
+        """
+        future = ExportFuture(map_id, layer_id, output_format, filters, file_name)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cannot submit exports after shutdown")
+            self._active += 1
+            self._stats["submitted"] += 1
+            if self._scheduler is None:
+                self._scheduler = threading.Thread(
+                    target=self._in_context(self._schedule),
+                    name="felt-export-scheduler",
+                    daemon=True,
+                )
+                self._scheduler.start()
+        self._executor.submit(self._in_context(self._create), future)
+        return future
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting exports, waiting for the submitted ones if `wait`"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            scheduler = self._scheduler
+        if wait and scheduler is not None:
+            scheduler.join()
+        self._poller.shutdown(wait=wait)
+        self._executor.shutdown(wait=wait)
+
+    def _in_context(self, func: typing.Callable) -> typing.Callable:
+        """Run `func` in a copy of this context with the manager's client"""
+        context = contextvars.copy_context()
+        context.run(api.current_client.set, self.client)
+        return lambda *args: context.run(func, *args)
+
+    def _create(self, future: ExportFuture):
+        try:
+            if not future.cancelled():
+                export = create_custom_export(
+                    future.map_id,
+                    future.layer_id,
+                    future.output_format,
+                    filters=future.filters,
+                    email_on_completion=False,
+                )
+                future.export_id = export["export_request_id"]
+                future.interval = self.poll_interval
+                if self.timeout is not None:
+                    future.deadline = time.monotonic() + self.timeout
+        # Any error must resolve the future, or its callers would wait forever
+        except Exception as exc:  # noqa: BLE001
+            self._fail(future, exc, "failed")
+        with self._condition:
+            self._active -= 1
+            if future.export_id is not None and not future.done():
+                self._push(future)
+            self._condition.notify()
+
+    def _push(self, future: ExportFuture):
+        due = time.monotonic() + future.interval
+        heapq.heappush(self._pending, (due, next(self._sequence), future))
+
+    def _schedule(self):
+        while True:
+            with self._condition:
+                while True:
+                    if not self._pending:
+                        if self._closed and not self._active:
+                            return
+                        self._condition.wait()
+                        continue
+                    delay = self._pending[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                now = time.monotonic()
+                while self._pending and self._pending[0][0] <= now:
+                    future = heapq.heappop(self._pending)[2]
+                    if not future.cancelled():
+                        self._active += 1
+                        self._poller.submit(self._in_context(self._poll), future)
+
+    def _poll(self, future: ExportFuture):
+        try:
+            self._check(future)
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._condition.notify()
+
+    def _check(self, future: ExportFuture):
+        assert future.export_id is not None
+        try:
+            status = get_custom_export_status(
+                future.map_id, future.layer_id, future.export_id
+            )
+        except Exception as exc:  # noqa: BLE001 - resolve the future, as above
+            self._fail(future, exc, "failed")
+            return
+        future.polls += 1
+        future.status = status.get("status")
+        with self._condition:
+            self._stats["polls"] += 1
+
+        if future.status == "completed" and status.get("download_url"):
+            self._executor.submit(
+                self._in_context(self._download), future, status["download_url"]
+            )
+        elif future.status == "failed":
+            error: Exception = ExportError(
+                f"Custom export {future.export_id} failed", status
+            )
+            self._fail(future, error, "failed")
+        elif self.max_polls is not None and future.polls >= self.max_polls:
+            error = TimeoutError(
+                f"Custom export {future.export_id} is not complete "
+                f"after {future.polls} status checks"
+            )
+            self._fail(future, error, "timed_out")
+        elif future.deadline is not None and time.monotonic() >= future.deadline:
+            error = TimeoutError(
+                f"Custom export {future.export_id} is not complete "
+                f"after {self.timeout} seconds"
+            )
+            self._fail(future, error, "timed_out")
+        else:
+            future.interval = min(
+                future.interval * self.backoff, self.max_poll_interval
+            )
+            with self._condition:
+                self._push(future)
+
+    def _download(self, future: ExportFuture, download_url: str):
+        if not future.set_running_or_notify_cancel():
+            return
+        file_name = future.file_name
+        if file_name is None and self.directory is not None:
+            base_name = os.path.basename(urllib.parse.urlparse(download_url).path)
+            file_name = os.path.join(self.directory, base_name)
+        cache_key = LAYER_CUSTOM_EXPORT_STATUS.format(
+            map_id=future.map_id, layer_id=future.layer_id, export_id=future.export_id
+        )
+        try:
+            path = _download_file(
+                download_url, file_name, parallel=self.parallel, cache_key=cache_key
+            )
+        except BaseException as exc:
+            self._fail(future, exc, "failed")
+            if not isinstance(exc, Exception):
+                raise
+        else:
+            future.set_result(path)
+            with self._condition:
+                self._stats["completed"] += 1
+
+    def _fail(self, future: ExportFuture, error: BaseException, outcome: str):
+        with self._condition:
+            self._stats[outcome] += 1
+        if future.running() or future.set_running_or_notify_cancel():
+            future.set_exception(error)
+
+
+def export_layers(
+    map_id: str,
+    layer_ids: typing.Iterable[str],
+    output_format: str,
+    filters: list | None = None,
+    directory: str | os.PathLike | None = None,
+    **kwargs,
+) -> list[ExportFuture]:
+    """Export layers of a map concurrently, waiting until all are downloaded
+
+    Args:
+        map_id: The ID of the map containing the layers
+        layer_ids: The IDs of the layers to export
+        output_format: The format to export in.
+            Options are "csv", "gpkg", or "geojson"
+        filters: Optional list of filters applied to every layer
+        directory: Directory to download the exports to
+        **kwargs: Other options of `ExportManager`, e.g. `max_workers`
+
+    Returns:
+        The finished futures, in the order of `layer_ids`. Call `result()` for
+        the path of each file, which raises if its export failed.
+    """
+    with ExportManager(directory=directory, **kwargs) as manager:
+        futures = [
+            manager.submit(map_id, layer_id, output_format, filters=filters)
+            for layer_id in layer_ids
+        ]
+    return futures
@@ -0,0 +1,228 @@
+"""Incremental parsing of GeoJSON FeatureCollections"""
+
+import codecs
+import json
+import re
+import typing
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Arrays without nested values or strings, like coordinates, which leave the
+# depth unchanged, or else a bracket, or a string up to its closing quote
+_TOKEN = re.compile(
+    r'(?:\[[^][{}"]*\][^][{}"]*)+|[][{}]|"[^"\\]*(?:\\.[^"\\]*)*("?)', re.DOTALL
+)
+_STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*("?)', re.DOTALL)
+
+
+class FeatureCollectionParser:
+    """Push parser yielding the Features of a FeatureCollection as they arrive
+
+    Feed it the response body in chunks of any size; each call returns the
+    Features completed by that chunk. Only the Feature being parsed and the
+    unparsed remainder of the last chunk are held in memory. Members of the
+    collection other than "features" are kept in `members`.
+
+    The chunks of a Feature are scanned once, tracking bracket depth and
+    strings, to find where it ends, and it is then decoded in one go, so a
+    Feature split over many chunks is parsed in linear time.
+
+    Example:
+        parser = FeatureCollectionParser()
+        for chunk in chunks:
+            for feature in parser.feed(chunk):
+                ...
+        parser.close()
+    """
+
+    def __init__(self):
+        self.members: dict[str, typing.Any] = {}
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = "start"
+        self._key: str | None = None
+        # Chunks of the object or array being scanned, and the scan state
+        self._parts: list[str] | None = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, data: bytes) -> list[dict]:
+        """Parse a chunk of the body and return the Features it completed"""
+        self._buffer += self._text.decode(data)
+        return self._parse(final=False)
+
+    def close(self) -> list[dict]:
+        """Parse the rest of the body, raising ValueError if it is incomplete"""
+        self._buffer += self._text.decode(b"", final=True)
+        features = self._parse(final=True)
+        if self._state != "done":
+            raise ValueError("Incomplete GeoJSON FeatureCollection")
+        return features
+
+    def _parse(self, final: bool) -> list[dict]:
+        features: list[dict] = []
+        buffer, pos = self._buffer, 0
+        while True:
+            if self._parts is not None:
+                end = self._scan(buffer, pos)
+                if end is None:
+                    self._parts.append(buffer[pos:])
+                    pos = len(buffer)
+                    break
+                self._parts.append(buffer[pos:end])
+                value = self._decoder.decode("".join(self._parts))
+                self._parts = None
+                pos = end
+                self._add(value, features)
+                continue
+            match = _WHITESPACE.match(buffer, pos)
+            assert match is not None
+            pos = match.end()
+            if pos == len(buffer) or self._state == "done":
+                break
+            char = buffer[pos]
+            state = self._state
+
+            if state == "start":
+                self._expect(char, "{")
+                pos += 1
+                self._state = "key"
+            elif state == "key":
+                if char == "}":
+                    pos += 1
+                    self._state = "done"
+                    continue
+                value, end = self._decode(buffer, pos, final)
+                if end is None:
+                    break
+                if not isinstance(value, str):
+                    raise ValueError(f"Expected a member name at {value!r}")
+                self._key, pos = value, end
+                self._state = "colon"
+            elif state == "colon":
+                self._expect(char, ":")
+                pos += 1
+                self._state = "value"
+            elif state == "value" and self._key == "features":
+                self._expect(char, "[")
+                pos += 1
+                self._state = "feature"
+            elif state in ("value", "feature") and char in "{[":
+                self._parts = []
+                self._depth = 0
+            elif state == "value":
+                value, end = self._decode(buffer, pos, final)
+                if end is None:
+                    break
+                pos = end
+                self._add(value, features)
+            elif state == "next_member":
+                self._expect(char, ",}")
+                pos += 1
+                self._state = "key" if char == "," else "done"
+            elif state == "feature":
+                if char == "]":
+                    pos += 1
+                    self._state = "next_member"
+                    continue
+                value, end = self._decode(buffer, pos, final)
+                if end is None:
+                    break
+                pos = end
+                self._add(value, features)
+            elif state == "next_feature":
+                self._expect(char, ",]")
+                pos += 1
+                self._state = "feature" if char == "," else "next_member"
+
+        self._buffer = buffer[pos:]
+        return features
+
+    def _add(self, value, features: list):
+        """Store a parsed member value or Feature"""
+        if self._state == "feature":
+            features.append(value)
+            self._state = "next_feature"
+        else:
+            assert self._key is not None
+            self.members[self._key] = value
+            self._state = "next_member"
+
+    def _scan(self, buffer: str, pos: int) -> int | None:
+        """Return the end of the object or array being scanned, if in `buffer`
+
+        Only the bracket depth and whether the buffer ended in a string, or
+        in an escape sequence, are kept between chunks.
+        """
+        if self._in_string:
+            if self._escape and pos < len(buffer):
+                pos += 1
+                self._escape = False
+            match = _STRING_REST.match(buffer, pos)
+            assert match is not None
+            if not match.group(1):
+                # Stopped at the end of the buffer, or before a final backslash
+                self._escape = self._escape or match.end() < len(buffer)
+                return None
+            pos = match.end()
+            self._in_string = False
+        for match in _TOKEN.finditer(buffer, pos):
+            start = match.start()
+            char = buffer[start]
+            if char == '"':
+                if not match.group(1):
+                    self._in_string = True
+                    self._escape = match.end() < len(buffer)
+                    return None
+            elif match.end() - start > 1:
+                if not self._depth:
+                    # The value scanned is itself such an array
+                    return buffer.index("]", start) + 1
+            elif char in "{[":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    return match.end()
+        return None
+
+    def _decode(self, buffer: str, pos: int, final: bool):
+        """Decode the value at `pos`, returning (None, None) if it is incomplete"""
+        try:
+            value, end = self._decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None, None
+        # A number at the end of the buffer may continue in the next chunk,
+        # even after a part that doesn't decode as a number by itself, like "1."
+        if not final and not buffer[end:].lstrip("0123456789+-.eE"):
+            return None, None
+        return value, end
+
+    @staticmethod
+    def _expect(char: str, expected: str):
+        if char not in expected:
+            raise ValueError(f"Invalid GeoJSON FeatureCollection: unexpected {char!r}")
+
+
+def iter_features(chunks: typing.Iterable[bytes]) -> typing.Iterator[dict]:
+    """Yield the Features of a FeatureCollection read in chunks"""
+    parser = FeatureCollectionParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def aiter_features(
+    chunks: typing.AsyncIterable[bytes],
+) -> typing.AsyncIterator[dict]:
+    """Yield the Features of a FeatureCollection read in chunks asynchronously"""
+    parser = FeatureCollectionParser()
+    async for chunk in chunks:
+        for feature in parser.feed(chunk):
+            yield feature
+    for feature in parser.close():
+        yield feature
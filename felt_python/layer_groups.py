@@ -1,10 +1,9 @@
 """Layer groups"""
 
-import json
-
 from urllib.parse import urljoin
 
-from .api import make_request, BASE_URL
+from .api import BASE_URL, load_json, make_request
+from .models import LayerGroup, load_model
 
 
 GROUPS = urljoin(BASE_URL, "maps/{map_id}/layer_groups")
@@ -14,12 +13,13 @@ GROUPS_PUBLISH = urljoin(
 )
 
 
-def list_layer_groups(map_id: str, api_token: str | None = None):
+def list_layer_groups(map_id: str, api_token: str | None = None, typed: bool = False):
     """List layer groups on a map
 
     Args:
         map_id: The ID of the map to list layer groups from
         api_token: Optional API token
+        typed: Whether to return `LayerGroup` models instead of dicts
 
     Returns:
         List of layer groups
@@ -29,13 +29,16 @@ def list_layer_groups(map_id: str, api_token: str | None = None):
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)
+    if typed:
+        return load_model(response, LayerGroup)
+    return load_json(response)
 
 
 def get_layer_group(
     map_id: str,
     layer_group_id: str,
     api_token: str | None = None,
+    typed: bool = False,
 ):
     """Get details of a layer group
 
@@ -43,6 +46,7 @@ def get_layer_group(
         map_id: The ID of the map containing the layer group
         layer_group_id: The ID of the layer group to get details for
         api_token: Optional API token
+        typed: Whether to return a `LayerGroup` model instead of a dict
 
     Returns:
         Layer group details
@@ -52,7 +56,9 @@ def get_layer_group(
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)
+    if typed:
+        return load_model(response, LayerGroup)
+    return load_json(response)
 
 
 def update_layer_groups(
@@ -78,7 +84,7 @@ def update_layer_groups(
         json=layer_group_params_list,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def delete_layer_group(
@@ -141,7 +147,7 @@ def update_layer_group(
         json=json_payload,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def publish_layer_group(
@@ -171,4 +177,4 @@ def publish_layer_group(
         json=json_payload,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
@@ -1,16 +1,24 @@
 """Layers"""
 
+import concurrent.futures
+import contextlib
 import io
-import json
 import os
 import tempfile
+import threading
+import time
 import typing
-import urllib.request
+import urllib.error
+import urllib.parse
 import uuid
-
 from urllib.parse import urljoin
 
-from .api import make_request, BASE_URL
+from . import bulk
+from .api import BASE_URL, get_client, load_json, make_request
+from .compression import should_zip, zip_file
+from .manifest import UploadManifest
+from .models import Layer, load_model
+from .pool import ConnectionPool, StreamingResponse
 from .util import deprecated
 
 
@@ -27,15 +35,37 @@ LAYER_CUSTOM_EXPORT_STATUS = urljoin(
 )
 LAYER_DUPLICATE = urljoin(BASE_URL, "duplicate_layers")
 
+# Statuses of layers that have finished processing
+LAYER_FINAL_STATUSES = frozenset({"completed", "failed"})
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Bytes of a frame serialized with `in_memory` kept in memory before the rest
+# spills over to a temporary file, for formats written to any file object
+IN_MEMORY_MAX_SIZE = 64 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Smallest byte range worth fetching on its own connection
+MIN_RANGE_SIZE = 8 * 1024 * 1024
+
+
+def list_layers(map_id: str, api_token: str | None = None, typed: bool = False):
+    """List layers on a map
+
+    Args:
+        map_id: The ID of the map to list layers from
+        api_token: Optional API token
+        typed: Whether to return `Layer` models instead of dicts
 
-def list_layers(map_id: str, api_token: str | None = None):
-    """List layers on a map"""
+    Returns:
+        List of layers
+    """
     response = make_request(
         url=LAYERS.format(map_id=map_id),
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)
+    if typed:
+        return load_model(response, Layer)
+    return load_json(response)
 
 
 def upload_file(
@@ -48,6 +78,8 @@ def upload_file(
     lng: float | None = None,
     zoom: float | None = None,
     api_token: str | None = None,
+    progress: typing.Callable[[int, int], None] | None = None,
+    compress: bool = False,
 ):
     """Upload a file to a Felt map
 
@@ -61,31 +93,68 @@ def upload_file(
         lng: Optional longitude of the image center (image uploads only)
         zoom: Optional zoom level of the image (image uploads only)
         api_token: Optional API token
+        progress: Optional callback called with the number of bytes sent and
+            the total size of the upload as the file is streamed
+        compress: Whether to upload the file as a zip archive. Files that are
+            already compressed, such as .zip or .parquet, are sent as they are.
 
     Returns:
         The upload response including layer ID and presigned upload details
     """
-    json_payload: dict = {"name": layer_name}
+    with _zipped(file_name, compress) as upload_name:
+        response = make_request(
+            url=LAYER_UPLOAD.format(map_id=map_id),
+            method="POST",
+            api_token=api_token,
+            json=_upload_payload(layer_name, metadata, hints, lat, lng, zoom),
+        )
+        return _upload_file(load_json(response), upload_name, progress)
 
-    if metadata is not None:
-        json_payload["metadata"] = metadata
-    if hints is not None:
-        json_payload["hints"] = hints
-    if lat is not None:
-        json_payload["lat"] = lat
-    if lng is not None:
-        json_payload["lng"] = lng
-    if zoom is not None:
-        json_payload["zoom"] = zoom
 
-    response = make_request(
-        url=LAYER_UPLOAD.format(map_id=map_id),
-        method="POST",
-        api_token=api_token,
-        json=json_payload,
-    )
+def upload_files(
+    map_id: str,
+    uploads: typing.Iterable[str | dict],
+    max_workers: int = 4,
+    progress: typing.Callable[[int, int], None] | None = None,
+    compress: bool = False,
+    api_token: str | None = None,
+) -> bulk.Results:
+    """Upload many files to a Felt map concurrently
 
-    return _upload_file(json.load(response), file_name)
+    Each file is uploaded as with `upload_file`, on a pool of `max_workers`
+    threads, so that creating uploads, reading files and sending them to
+    their presigned URLs overlap across files. A file that fails doesn't stop
+    the others.
+
+    Args:
+        map_id: The ID of the map to upload to
+        uploads: Paths of files, uploaded as layers named after the file, or
+            dicts of `upload_file` arguments, e.g.
+            `{"file_name": "roads.zip", "layer_name": "Roads", "hints": [...]}`
+        max_workers: Maximum number of files uploaded at once
+        progress: Optional callback called with the number of bytes sent and
+            the total size of all uploads as the files are streamed
+        compress: Whether to upload files as zip archives, see `upload_file`
+        api_token: Optional API token
+
+    Returns:
+        Results in the order of `uploads`, see `felt_python.bulk.run`. The
+        value of each successful upload is its upload response, including
+        the layer ID.
+    """
+    arguments = [_upload_arguments(upload, compress) for upload in uploads]
+    tracker = _UploadProgress([upload["file_name"] for upload in arguments], progress)
+    calls = [
+        bulk.Call(
+            upload_file,
+            map_id,
+            api_token=api_token,
+            progress=tracker.callback(index),
+            **upload,
+        )
+        for index, upload in enumerate(arguments)
+    ]
+    return bulk.run(calls, max_workers=max_workers)
 
 
 def upload_dataframe(
@@ -95,19 +164,43 @@ def upload_dataframe(
     metadata: dict[str, str] | None = None,
     hints: list[dict[str, str]] | None = None,
     api_token: str | None = None,
+    format: typing.Literal["csv", "parquet"] = "csv",
+    compression: str | None = None,
+    in_memory: bool = False,
 ):
-    """Upload a Pandas DataFrame to a Felt map"""
-    with tempfile.TemporaryDirectory() as tempdir:
-        file_name = os.path.join(tempdir, "dataframe.csv")
-        dataframe.to_csv(file_name)
-        return upload_file(
-            map_id,
-            file_name,
-            layer_name,
-            metadata=metadata,
-            hints=hints,
-            api_token=api_token,
-        )
+    """Upload a Pandas DataFrame to a Felt map
+
+    Args:
+        map_id: The ID of the map to upload to
+        dataframe: DataFrame to upload
+        layer_name: The display name for the new layer
+        metadata: Optional metadata for the layer
+        hints: Optional list of hints for interpreting the data
+        api_token: Optional API token
+        format: File format to serialize to. Parquet is much faster to write
+            and smaller to upload than CSV for large frames, and keeps column
+            types. Requires pyarrow.
+        compression: Parquet compression codec, e.g. "snappy" (the default),
+            "zstd" or "gzip". For CSV, "zip" uploads the file zipped.
+        in_memory: Whether to serialize into memory instead of a temporary
+            file. The upload is created while the frame is being serialized.
+            The file must be complete before it is sent, as its size is
+            needed up front, so up to `IN_MEMORY_MAX_SIZE` bytes of it are
+            held in memory and the rest spills over to a temporary file.
+
+    Returns:
+        The upload response including layer ID and presigned upload details
+    """
+    return _upload_frame(
+        map_id,
+        dataframe,
+        f"dataframe.{format}",
+        _upload_payload(layer_name, metadata, hints),
+        api_token,
+        format,
+        compression,
+        in_memory,
+    )
 
 
 def upload_geodataframe(
@@ -117,23 +210,57 @@ def upload_geodataframe(
     metadata: dict[str, str] | None = None,
     hints: list[dict[str, str]] | None = None,
     api_token: str | None = None,
+    format: typing.Literal["gpkg", "parquet", "fgb"] = "gpkg",
+    compression: str | None = None,
+    in_memory: bool = False,
 ):
-    """Upload a GeoPandas GeoDataFrame to a Felt map"""
-    with tempfile.TemporaryDirectory() as tempdir:
-        file_name = os.path.join(tempdir, "geodataframe.gpkg")
-        geodataframe.to_file(file_name)
-        return upload_file(
-            map_id,
-            file_name,
-            layer_name,
-            metadata=metadata,
-            hints=hints,
-            api_token=api_token,
-        )
+    """Upload a GeoPandas GeoDataFrame to a Felt map
+
+    Args:
+        map_id: The ID of the map to upload to
+        geodataframe: GeoDataFrame to upload
+        layer_name: The display name for the new layer
+        metadata: Optional metadata for the layer
+        hints: Optional list of hints for interpreting the data
+        api_token: Optional API token
+        format: File format to serialize to: GeoPackage, GeoParquet (requires
+            pyarrow) or FlatGeobuf. GeoParquet is the fastest to write and
+            usually the smallest to upload.
+        compression: GeoParquet compression codec, e.g. "snappy" (the
+            default), "zstd" or "gzip". For GeoPackage and FlatGeobuf, "zip"
+            uploads the file zipped.
+        in_memory: Whether to serialize into memory instead of a temporary
+            file. The upload is created while the frame is being serialized.
+            The file must be complete before it is sent, as its size is
+            needed up front. GeoPackage and FlatGeobuf files can only be
+            written to memory in full, so peak memory then includes the whole
+            file, twice while it is zipped. GeoParquet files keep up to
+            `IN_MEMORY_MAX_SIZE` bytes in memory and spill the rest over to a
+            temporary file.
+
+    Returns:
+        The upload response including layer ID and presigned upload details
+    """
+    return _upload_frame(
+        map_id,
+        geodataframe,
+        f"geodataframe.{format}",
+        _upload_payload(layer_name, metadata, hints),
+        api_token,
+        format,
+        compression,
+        in_memory,
+    )
 
 
 def refresh_file_layer(
-    map_id: str, layer_id: str, file_name: str, api_token: str | None = None
+    map_id: str,
+    layer_id: str,
+    file_name: str,
+    api_token: str | None = None,
+    progress: typing.Callable[[int, int], None] | None = None,
+    compress: bool = False,
+    manifest: UploadManifest | None = None,
 ):
     """Refresh a layer originated from a file upload
 
@@ -142,16 +269,31 @@ def refresh_file_layer(
         layer_id: The ID of the layer to refresh
         file_name: The path to the file to upload as the new data
         api_token: Optional API token
+        progress: Optional callback called with the number of bytes sent and
+            the total size of the upload as the file is streamed
+        compress: Whether to upload the file as a zip archive, see `upload_file`
+        manifest: Optional `UploadManifest` recording the files uploaded to
+            layers. The refresh is skipped if the file is the one last
+            uploaded to this layer.
 
     Returns:
-        The refresh response including presigned upload details
+        The refresh response including presigned upload details, or
+        `{"layer_id": layer_id, "skipped": True}` if the refresh was skipped
     """
-    response = make_request(
-        url=LAYER_REFRESH.format(map_id=map_id, layer_id=layer_id),
-        method="POST",
-        api_token=api_token,
-    )
-    return _upload_file(json.load(response), file_name)
+    upload = manifest.begin(layer_id, file_name) if manifest is not None else None
+    if manifest is not None and upload is None:
+        return {"layer_id": layer_id, "skipped": True}
+    with _zipped(file_name, compress) as upload_name:
+        response = make_request(
+            url=LAYER_REFRESH.format(map_id=map_id, layer_id=layer_id),
+            method="POST",
+            api_token=api_token,
+        )
+        reader = upload.reader if upload and upload_name == file_name else None
+        result = _upload_file(load_json(response), upload_name, progress, reader)
+    if upload is not None:
+        upload.commit()
+    return result
 
 
 def upload_url(
@@ -191,7 +333,7 @@ def upload_url(
         api_token=api_token,
         json=json_payload,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def refresh_url_layer(map_id: str, layer_id: str, api_token: str | None = None):
@@ -204,7 +346,7 @@ def refresh_url_layer(map_id: str, layer_id: str, api_token: str | None = None):
         method="POST",
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 @deprecated(reason="Please use `get_layer` instead")
@@ -216,8 +358,19 @@ def get_layer(
     map_id: str,
     layer_id: str,
     api_token: str | None = None,
+    typed: bool = False,
 ):
-    """Get details of a layer"""
+    """Get details of a layer
+
+    Args:
+        map_id: The ID of the map containing the layer
+        layer_id: The ID of the layer to get
+        api_token: Optional API token
+        typed: Whether to return a `Layer` model instead of a dict
+
+    Returns:
+        The layer
+    """
     response = make_request(
         url=LAYER.format(
             map_id=map_id,
@@ -226,7 +379,58 @@ def get_layer(
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)
+    if typed:
+        return load_model(response, Layer)
+    return load_json(response)
+
+
+def wait_for_layers(
+    map_id: str,
+    layer_ids: typing.Iterable[str],
+    timeout: float | None = 600.0,
+    poll_interval: float = 1.0,
+    max_poll_interval: float = 15.0,
+    backoff: float = 1.5,
+    progress: typing.Callable[[int, int], None] | None = None,
+    api_token: str | None = None,
+    typed: bool = False,
+):
+    """Wait until layers on a map have finished processing
+
+    Each check lists the layers of the map once for all the layers still
+    processing, rather than getting them one by one. Checks start
+    `poll_interval` seconds apart and slow down by `backoff` after each, up
+    to `max_poll_interval`. A client's `ResponseCache` is revalidated on
+    every check, so that cached listings don't hide progress.
+
+    Args:
+        map_id: The ID of the map containing the layers
+        layer_ids: The IDs of the layers to wait for, e.g. from `upload_file`
+        timeout: Maximum seconds to wait, or None to wait indefinitely
+        poll_interval: Seconds between the first checks
+        max_poll_interval: Maximum seconds between checks
+        backoff: Factor the interval between checks grows by
+        progress: Optional callback called with the number of finished layers
+            and the total whenever more layers finish
+        api_token: Optional API token
+        typed: Whether to return `Layer` models instead of dicts
+
+    Returns:
+        The final state of each layer, in the order of `layer_ids`. Layers
+        that failed to process are returned with status "failed".
+
+    Raises:
+        TimeoutError: If layers are still processing after `timeout` seconds
+    """
+    waiter = _LayerWaiter(
+        map_id, layer_ids, timeout, poll_interval, max_poll_interval, backoff, progress
+    )
+    while True:
+        waiter.expire(get_client())
+        delay = waiter.update(list_layers(map_id, api_token))
+        if delay is None:
+            return waiter.result(typed)
+        time.sleep(delay)
 
 
 def update_layer_style(
@@ -245,7 +449,7 @@ def update_layer_style(
         json={"style": style},
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def get_export_link(
@@ -262,7 +466,7 @@ def get_export_link(
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)["export_link"]
+    return load_json(response)["export_link"]
 
 
 def download_layer(
@@ -270,21 +474,41 @@ def download_layer(
     layer_id: str,
     file_name: str | None = None,
     api_token: str | None = None,
+    resume: bool = False,
+    progress: typing.Callable[[int, int | None, float], None] | None = None,
+    parallel: int = 1,
 ) -> str:
     """Download a layer to a file.
 
     Vector layers will be downloaded in GPKG format. Raster layers will be GeoTIFFs.
     If a specific file name is not provided, the default file name will be saved to
     the current working directory.
+
+    The export is streamed to a temporary ".part" file next to the destination,
+    which is renamed once the download completes.
+
+    Args:
+        map_id: The ID of the map containing the layer
+        layer_id: The ID of the layer to download
+        file_name: Optional path to save the file to
+        api_token: Optional API token
+        resume: Whether to continue a previously interrupted download from its
+            ".part" file. If False, partial files are removed on failure.
+        progress: Optional callback called with the number of bytes downloaded,
+            the total size if known, and the average throughput in bytes per second
+        parallel: Number of byte ranges to fetch concurrently for large exports.
+            Falls back to a single stream if the server doesn't support range
+            requests, or when resuming.
+
+    If the client has a `DiskCache`, the export is kept in it and copied from
+    it instead when the server reports it unchanged since the last download.
+
+    Returns:
+        The path of the downloaded file
     """
     export_link = get_export_link(map_id, layer_id, api_token)
-    with urllib.request.urlopen(export_link) as response:
-        if file_name is None:
-            parsed_url = urllib.parse.urlparse(response.url)
-            file_name = os.path.basename(parsed_url.path)
-        with open(file_name, "wb") as file_obj:
-            file_obj.write(response.read())
-    return file_name
+    cache_key = LAYER.format(map_id=map_id, layer_id=layer_id)
+    return _download_file(export_link, file_name, resume, progress, parallel, cache_key)
 
 
 def update_layers(
@@ -311,7 +535,7 @@ def update_layers(
         json=layer_params_list,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def delete_layer(
@@ -354,7 +578,7 @@ def publish_layer(
         json=json_payload,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def create_custom_export(
@@ -394,7 +618,7 @@ def create_custom_export(
         json=json_payload,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def get_custom_export_status(
@@ -423,7 +647,47 @@ def get_custom_export_status(
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
+
+
+def download_custom_export(
+    map_id: str,
+    layer_id: str,
+    export_id: str,
+    file_name: str | None = None,
+    api_token: str | None = None,
+    resume: bool = False,
+    progress: typing.Callable[[int, int | None, float], None] | None = None,
+    parallel: int = 1,
+) -> str:
+    """Download a completed custom export to a file
+
+    Args:
+        map_id: The ID of the map containing the layer
+        layer_id: The ID of the layer that was exported
+        export_id: The ID of the export request
+        file_name: Optional path to save the file to. Defaults to the name of
+            the exported file in the current working directory.
+        api_token: Optional API token
+        resume: Whether to continue a previously interrupted download
+        progress: Optional callback, see `download_layer`
+        parallel: Number of byte ranges to fetch concurrently, see `download_layer`
+
+    Returns:
+        The path of the downloaded file
+    """
+    status = get_custom_export_status(map_id, layer_id, export_id, api_token)
+    download_url = status.get("download_url")
+    if not download_url:
+        raise ValueError(
+            f"Custom export {export_id} is not ready (status: {status.get('status')})"
+        )
+    cache_key = LAYER_CUSTOM_EXPORT_STATUS.format(
+        map_id=map_id, layer_id=layer_id, export_id=export_id
+    )
+    return _download_file(
+        download_url, file_name, resume, progress, parallel, cache_key
+    )
 
 
 def duplicate_layers(
@@ -450,29 +714,349 @@ def duplicate_layers(
         json=duplicate_params,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
+
+
+class _UploadProgress:
+    """Adds up the progress of files uploaded concurrently"""
+
+    def __init__(
+        self,
+        file_names: list[str],
+        progress: typing.Callable[[int, int], None] | None,
+    ):
+        self.progress = progress
+        self.sent = [0] * len(file_names)
+        # File sizes until the uploads report their actual, e.g. zipped, size
+        self.totals = [_file_size(file_name) for file_name in file_names]
+        self.lock = threading.Lock()
+
+    def callback(self, index: int) -> typing.Callable[[int, int], None] | None:
+        progress = self.progress
+        if progress is None:
+            return None
+
+        def update(sent: int, total: int):
+            with self.lock:
+                self.sent[index] = sent
+                self.totals[index] = total
+                progress(sum(self.sent), sum(self.totals))
+
+        return update
+
+
+def _upload_arguments(upload: str | os.PathLike | dict, compress: bool) -> dict:
+    """Arguments of `upload_file` for an item of `upload_files`"""
+    if isinstance(upload, dict):
+        arguments = {"compress": compress, **upload}
+    else:
+        arguments = {"compress": compress, "file_name": os.fspath(upload)}
+    if "layer_name" not in arguments:
+        base_name = os.path.basename(arguments["file_name"])
+        arguments["layer_name"] = os.path.splitext(base_name)[0]
+    return arguments
+
+
+def _file_size(file_name: str) -> int:
+    try:
+        return os.path.getsize(file_name)
+    except OSError:
+        return 0
+
+
+class _LayerWaiter:
+    """State of `wait_for_layers`, shared with its async version"""
+
+    def __init__(
+        self,
+        map_id: str,
+        layer_ids: typing.Iterable[str],
+        timeout: float | None,
+        poll_interval: float,
+        max_poll_interval: float,
+        backoff: float,
+        progress: typing.Callable[[int, int], None] | None,
+    ):
+        self.map_id = map_id
+        self.layer_ids = list(layer_ids)
+        self.pending = set(self.layer_ids)
+        self.final: dict[str, dict] = {}
+        self.timeout = timeout
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+        self.progress = progress
+
+    def expire(self, client):
+        """Have a cached listing of the layers revalidated by the next check"""
+        if client.cache is not None:
+            path = LAYERS.format(map_id=self.map_id)[len(BASE_URL) :]
+            client.cache.expire(path)
+
+    def update(self, layers: list[dict]) -> float | None:
+        """Record the layers that finished
+
+        Returns:
+            Seconds to wait before the next check, or None if all finished
+        """
+        finished = [
+            layer
+            for layer in layers
+            if layer["id"] in self.pending
+            and layer.get("status") in LAYER_FINAL_STATUSES
+        ]
+        for layer in finished:
+            self.final[layer["id"]] = layer
+            self.pending.discard(layer["id"])
+        if finished and self.progress is not None:
+            self.progress(len(self.final), len(self.final) + len(self.pending))
+        if not self.pending:
+            return None
+
+        delay = self.interval
+        if self.deadline is not None:
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(
+                    f"Layers {sorted(self.pending)} on map {self.map_id} are still "
+                    f"processing after {self.timeout} seconds"
+                )
+            delay = min(delay, remaining)
+        self.interval = min(self.interval * self.backoff, self.max_poll_interval)
+        return delay
+
+    def result(self, typed: bool) -> list:
+        if typed:
+            return [Layer.from_dict(self.final[i]) for i in self.layer_ids]
+        return [self.final[i] for i in self.layer_ids]
+
+
+def _upload_payload(
+    layer_name: str,
+    metadata: dict[str, str] | None = None,
+    hints: list[dict[str, str]] | None = None,
+    lat: float | None = None,
+    lng: float | None = None,
+    zoom: float | None = None,
+) -> dict:
+    json_payload: dict = {"name": layer_name}
+
+    if metadata is not None:
+        json_payload["metadata"] = metadata
+    if hints is not None:
+        json_payload["hints"] = hints
+    if lat is not None:
+        json_payload["lat"] = lat
+    if lng is not None:
+        json_payload["lng"] = lng
+    if zoom is not None:
+        json_payload["zoom"] = zoom
+    return json_payload
+
+
+def _upload_frame(
+    map_id, frame, file_name, json_payload, api_token, format, compression, in_memory
+):
+    _check_format(format, compression)
+    if compression == "zip":
+        file_name += ".zip"
+
+    if not in_memory:
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = _write_frame_file(frame, tempdir, file_name, format, compression)
+            presigned_upload = _create_upload(map_id, json_payload, api_token)
+            return _upload_file(presigned_upload, path)
+
+    # S3 needs the size of the upload up front, so the frame can't be streamed
+    # as it is serialized. Create the upload meanwhile instead.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        written = executor.submit(
+            _write_frame_buffer, frame, file_name, format, compression
+        )
+        presigned_upload = _create_upload(map_id, json_payload, api_token)
+        try:
+            buffer = written.result()
+        except BaseException:
+            # Don't leave an empty layer behind
+            _discard_upload(map_id, presigned_upload, api_token)
+            raise
+    with buffer:
+        return _upload_buffer(presigned_upload, buffer, file_name)
+
+
+def _create_upload(map_id: str, json_payload: dict, api_token: str | None) -> dict:
+    response = make_request(
+        url=LAYER_UPLOAD.format(map_id=map_id),
+        method="POST",
+        api_token=api_token,
+        json=json_payload,
+    )
+    return load_json(response)
+
+
+def _discard_upload(map_id: str, presigned_upload: dict, api_token: str | None):
+    if "layer_id" in presigned_upload:
+        try:
+            delete_layer(map_id, presigned_upload["layer_id"], api_token=api_token)
+        except urllib.error.URLError:
+            pass
+
+
+def _check_format(format: str, compression: str | None):
+    if format not in ("csv", "gpkg", "fgb", "parquet"):
+        raise ValueError(f"Unsupported format: {format}")
+    if format == "parquet" and compression == "zip":
+        raise ValueError("Parquet files are compressed with a codec, not zipped")
+    if format != "parquet" and compression not in (None, "zip"):
+        raise ValueError(f"{format} files can only be compressed with zip")
+
+
+def _write_frame_file(frame, directory, file_name, format, compression) -> str:
+    """Serialize a (Geo)DataFrame to `file_name` in `directory`, zipping if asked"""
+    path = os.path.join(directory, file_name)
+    if compression != "zip":
+        _write_frame(frame, path, format, compression)
+        return path
+    unzipped = path.removesuffix(".zip")
+    _write_frame(frame, unzipped, format, None)
+    zip_file(unzipped, os.path.basename(unzipped), path)
+    os.remove(unzipped)
+    return path
+
+
+def _write_frame_buffer(frame, file_name, format, compression) -> typing.IO[bytes]:
+    """Serialize a (Geo)DataFrame into memory, zipping if asked
+
+    Files written by pandas spill over to disk past `IN_MEMORY_MAX_SIZE`, but
+    pyogrio only writes GeoPackage and FlatGeobuf files to a BytesIO.
+    """
+    with contextlib.ExitStack() as stack:
+        buffer: typing.IO[bytes]
+        if format in ("gpkg", "fgb"):
+            buffer = stack.enter_context(io.BytesIO())
+        else:
+            buffer = stack.enter_context(
+                tempfile.SpooledTemporaryFile(max_size=IN_MEMORY_MAX_SIZE)
+            )
+        codec = None if compression == "zip" else compression
+        _write_frame(frame, buffer, format, codec)
+        if compression == "zip":
+            buffer.seek(0)
+            archive = stack.enter_context(
+                tempfile.SpooledTemporaryFile(max_size=IN_MEMORY_MAX_SIZE)
+            )
+            zip_file(buffer, file_name.removesuffix(".zip"), archive)
+            buffer.close()
+            buffer = archive
+        buffer.seek(0)
+        # The buffer is only closed here on errors, otherwise by the caller
+        stack.pop_all()
+        return buffer
+
+
+def _write_frame(frame, target: str | typing.IO[bytes], format: str, compression):
+    """Serialize a (Geo)DataFrame to a path or binary file object"""
+    if format == "csv":
+        frame.to_csv(target)
+    elif format == "gpkg":
+        frame.to_file(target, driver="GPKG")
+    elif format == "fgb":
+        frame.to_file(target, driver="FlatGeobuf")
+    else:
+        frame.to_parquet(target, compression=compression or "snappy")
+
+
+@contextlib.contextmanager
+def _zipped(file_name: str, compress: bool) -> typing.Iterator[str]:
+    """Yield the path of a zipped copy of the file, if compressing is worthwhile"""
+    if not (compress and should_zip(file_name)):
+        yield file_name
+        return
+    with tempfile.TemporaryDirectory() as tempdir:
+        arcname = os.path.basename(file_name)
+        zip_name = os.path.join(tempdir, arcname + ".zip")
+        zip_file(file_name, arcname, zip_name)
+        yield zip_name
+
+
+def _upload_file(presigned_upload, file_name, progress=None, reader=None):
+    """Send a file to its presigned upload, retrying per the client's policy
+
+    `reader` optionally wraps the opened file, e.g. to hash it as it is sent.
+    """
+
+    def send():
+        with open(file_name, "rb") as file_obj:
+            return _upload_file_obj(
+                presigned_upload,
+                reader(file_obj) if reader is not None else file_obj,
+                os.path.basename(file_name),
+                progress,
+            )
 
+    return _retry_upload(send)
 
-def _upload_file(presigned_upload, file_name):
-    url = presigned_upload["url"]
-    presigned_attributes = presigned_upload["presigned_attributes"]
 
-    with open(file_name, "rb") as file_obj:
-        request = _multipart_request(url, presigned_attributes, file_obj)
-        urllib.request.urlopen(request)
+def _upload_buffer(presigned_upload, buffer, file_name):
+    """Send a file object to its presigned upload from the start, retrying"""
+
+    def send():
+        buffer.seek(0)
+        return _upload_file_obj(presigned_upload, buffer, file_name)
+
+    return _retry_upload(send)
+
+
+def _retry_upload(send: typing.Callable[[], dict]) -> dict:
+    """Call `send` until it succeeds or the client's retry policy gives up
+
+    Sending to a presigned URL can be repeated without creating another
+    layer, so it is retried like an idempotent request.
+    """
+    retry = get_client().retry
+    attempt = 1
+    while True:
+        try:
+            return send()
+        except urllib.error.URLError as exc:
+            delay = retry.get_delay("PUT", attempt, exc)
+            if delay is None:
+                raise
+        time.sleep(delay)
+        attempt += 1
+
+
+def _upload_file_obj(presigned_upload, file_obj, file_name, progress=None):
+    headers, preamble, epilogue = _multipart_envelope(
+        presigned_upload["presigned_attributes"], file_obj, file_name
+    )
+    get_client().pool.urlopen(
+        "POST",
+        presigned_upload["url"],
+        body=_iter_multipart_body(
+            preamble,
+            file_obj,
+            epilogue,
+            int(headers["Content-Length"]),
+            progress,
+        ),
+        headers=headers,
+    )
     return presigned_upload
 
 
-def _multipart_request(
-    url: str, presigned_attributes: dict[str, str], file_obj: typing.IO[bytes]
-) -> urllib.request.Request:
-    """Make a multipart/form-data request with the given file"""
+def _multipart_envelope(
+    presigned_attributes: dict[str, str], file_obj: typing.IO[bytes], fname: str
+) -> tuple[dict[str, str], bytes, bytes]:
+    """Build a multipart/form-data body around the given file
+
+    Returns the request headers and the parts of the body that go before and
+    after the file contents, so that the file itself can be streamed.
+    """
     boundary = "-" * 20 + str(uuid.uuid4())
-    headers = {"Content-Type": f'multipart/form-data; boundary="{boundary}"'}
-    fname = os.path.basename(file_obj.name)
 
-    data = io.BytesIO()
-    text = io.TextIOWrapper(data, encoding="latin-1")
+    text = io.StringIO()
     for key, value in presigned_attributes.items():
         text.write(f"--{boundary}\r\n")
         text.write(f'Content-Disposition: form-data; name="{key}"\r\n\r\n')
@@ -480,9 +1064,216 @@ def _multipart_request(
     text.write(f"--{boundary}\r\n")
     text.write(f'Content-Disposition: form-data; name="file"; filename="{fname}"\r\n')
     text.write("Content-Type: application/octet-stream\r\n\r\n")
-    text.flush()
-    data.write(file_obj.read())
-    data.write(f"\r\n--{boundary}".encode("latin-1"))
-    body = data.getvalue()
+    preamble = text.getvalue().encode("latin-1")
+    epilogue = f"\r\n--{boundary}".encode("latin-1")
+
+    position = file_obj.tell()
+    file_size = file_obj.seek(0, os.SEEK_END) - position
+    file_obj.seek(position)
 
-    return urllib.request.Request(url, data=body, headers=headers, method="POST")
+    headers = {
+        "Content-Type": f'multipart/form-data; boundary="{boundary}"',
+        "Content-Length": str(len(preamble) + file_size + len(epilogue)),
+    }
+    return headers, preamble, epilogue
+
+
+def _iter_multipart_body(
+    preamble: bytes,
+    file_obj: typing.IO[bytes],
+    epilogue: bytes,
+    total: int,
+    progress: typing.Callable[[int, int], None] | None = None,
+) -> typing.Iterator[bytes]:
+    """Yield a multipart body, reading the file in chunks"""
+    yield preamble
+    sent = len(preamble)
+    while chunk := file_obj.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
+        sent += len(chunk)
+        if progress is not None:
+            progress(sent, total)
+    yield epilogue
+    if progress is not None:
+        progress(total, total)
+
+
+def _download_file(
+    url: str,
+    file_name: str | None = None,
+    resume: bool = False,
+    progress: typing.Callable[[int, int | None, float], None] | None = None,
+    parallel: int = 1,
+    cache_key: str | None = None,
+) -> str:
+    """Stream a URL to a file through a temporary file
+
+    Resumes a previous partial download if requested, or fetches byte ranges
+    concurrently when `parallel` > 1 and the server supports range requests.
+    With a `cache_key` and a client disk cache, a stored copy is used if the
+    server answers the conditional request with 304 Not Modified.
+    """
+    if file_name is None and resume:
+        # The partial file has to be found before the request is made
+        file_name = os.path.basename(urllib.parse.urlparse(url).path)
+
+    offset = 0
+    if file_name is not None and resume and os.path.exists(f"{file_name}.part"):
+        offset = os.path.getsize(f"{file_name}.part")
+
+    headers = {}
+    if offset:
+        headers = {"Range": f"bytes={offset}-"}
+    elif parallel > 1:
+        # Probe for range support. Servers that ignore it send the whole object,
+        # which is then downloaded as a single stream.
+        headers = {"Range": "bytes=0-0"}
+
+    client = get_client()
+    disk_cache = client.disk_cache if cache_key is not None and not offset else None
+    cached = None
+    if disk_cache is not None:
+        assert cache_key is not None
+        cached = disk_cache.get_file(cache_key)
+    if cached is not None:
+        headers.update(cached.validators())
+
+    pool = client.pool
+    try:
+        response = pool.stream("GET", url, headers=headers)
+    except urllib.error.HTTPError as exc:
+        if exc.code == 304 and cached is not None:
+            if file_name is None:
+                file_name = os.path.basename(urllib.parse.urlparse(url).path)
+            assert disk_cache is not None
+            with contextlib.suppress(FileNotFoundError):
+                return disk_cache.restore_file(cached, file_name)
+            # Evicted since it was looked up, so download it after all
+            response = pool.stream("GET", url)
+        else:
+            if exc.code != 416:
+                raise
+            total = _content_range_total(exc.headers.get("Content-Range"))
+            if offset and total == offset:
+                # The partial file already holds the whole object
+                assert file_name is not None
+                os.replace(f"{file_name}.part", file_name)
+                return file_name
+            # The partial file is no longer valid for this object, or the object
+            # is empty, so start over with a plain request
+            offset = 0
+            response = pool.stream("GET", url)
+
+    with response:
+        if file_name is None:
+            parsed_url = urllib.parse.urlparse(response.url)
+            file_name = os.path.basename(parsed_url.path)
+        part_name = f"{file_name}.part"
+
+        if response.status == 206:
+            total = _content_range_total(response.getheader("Content-Range"))
+        else:
+            offset = 0
+            content_length = response.getheader("Content-Length")
+            total = int(content_length) if content_length else None
+
+        ranged = response.status == 206 and not offset and total is not None
+        if not ranged:
+            try:
+                _write_stream(response, part_name, offset, total, progress)
+            except BaseException:
+                if not resume and os.path.exists(part_name):
+                    os.remove(part_name)
+                raise
+        else:
+            # Consume the probed byte so the connection can be reused
+            response.read()
+
+    if ranged:
+        assert total is not None
+        try:
+            _download_ranges(pool, response.url, part_name, total, parallel, progress)
+        except BaseException:
+            if os.path.exists(part_name):
+                os.remove(part_name)
+            raise
+
+    os.replace(part_name, file_name)
+    if disk_cache is not None:
+        assert cache_key is not None
+        disk_cache.put_file(cache_key, file_name, response.headers)
+    return file_name
+
+
+def _write_stream(
+    response: StreamingResponse,
+    part_name: str,
+    offset: int,
+    total: int | None,
+    progress: typing.Callable[[int, int | None, float], None] | None = None,
+):
+    downloaded = offset
+    started = time.monotonic()
+    with open(part_name, "ab" if offset else "wb") as file_obj:
+        for chunk in response.iter_chunks(DOWNLOAD_CHUNK_SIZE):
+            file_obj.write(chunk)
+            downloaded += len(chunk)
+            if progress is not None:
+                elapsed = time.monotonic() - started
+                rate = (downloaded - offset) / elapsed if elapsed else 0.0
+                progress(downloaded, total, rate)
+
+
+def _download_ranges(
+    pool: ConnectionPool,
+    url: str,
+    part_name: str,
+    total: int,
+    parallel: int,
+    progress: typing.Callable[[int, int | None, float], None] | None = None,
+):
+    """Download byte ranges concurrently into a preallocated file"""
+    with open(part_name, "wb") as file_obj:
+        file_obj.truncate(total)
+
+    count = max(1, min(parallel, total // MIN_RANGE_SIZE))
+    size = -(-total // count)
+    ranges = [(start, min(start + size, total) - 1) for start in range(0, total, size)]
+
+    lock = threading.Lock()
+    downloaded = 0
+    started = time.monotonic()
+
+    def fetch(byte_range: tuple[int, int]):
+        nonlocal downloaded
+        start, end = byte_range
+        response = pool.stream("GET", url, headers={"Range": f"bytes={start}-{end}"})
+        with response:
+            content_range = response.getheader("Content-Range") or ""
+            if response.status != 206 or not content_range.startswith(
+                f"bytes {start}-"
+            ):
+                raise ValueError(f"Server did not honour range {start}-{end}")
+            # Each worker writes its own region through its own file handle
+            with open(part_name, "r+b") as file_obj:
+                file_obj.seek(start)
+                for chunk in response.iter_chunks(DOWNLOAD_CHUNK_SIZE):
+                    file_obj.write(chunk)
+                    with lock:
+                        downloaded += len(chunk)
+                        if progress is not None:
+                            elapsed = time.monotonic() - started
+                            rate = downloaded / elapsed if elapsed else 0.0
+                            progress(downloaded, total, rate)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=count) as executor:
+        for future in [executor.submit(fetch, byte_range) for byte_range in ranges]:
+            future.result()
+
+
+def _content_range_total(content_range: str | None) -> int | None:
+    """Parse the total size from a "bytes start-end/total" Content-Range header"""
+    if not content_range or "/" not in content_range:
+        return None
+    total = content_range.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
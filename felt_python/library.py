@@ -1,10 +1,8 @@
 """Layer library"""
 
-import json
-
 from urllib.parse import urljoin
 
-from .api import make_request, BASE_URL
+from .api import BASE_URL, load_json, make_request
 
 
 LIBRARY = urljoin(BASE_URL, "library")
@@ -30,4 +28,4 @@ def list_library_layers(source: str = "workspace", api_token: str | None = None)
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
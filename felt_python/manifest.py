@@ -0,0 +1,183 @@
+"""Manifest of uploaded files, to skip uploading unchanged files again"""
+
+import contextlib
+import hashlib
+import os
+import tempfile
+import threading
+import typing
+
+from .codec import decode_json, encode_json
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadManifest:
+    """Record of the file last uploaded to each layer
+
+    For every layer refreshed with it, the manifest keeps the SHA-256 digest,
+    size and modification time of the file that was uploaded, in a JSON file.
+    `refresh_file_layer` given a manifest skips the refresh when the file is
+    unchanged since:
+
+    - A file with the same size and modification time isn't read at all,
+      unless `trust_mtime` is False.
+    - A file with a new modification time but the same size is hashed and
+      compared with the recorded digest.
+    - A file whose size changed is uploaded, and hashed as it is streamed so
+      that it is only read once.
+
+    Args:
+        path: JSON file to keep the manifest in, created if missing. Without
+            a path the manifest is only kept in memory.
+        trust_mtime: Whether to consider a file with the recorded size and
+            modification time unchanged without hashing it
+    """
+
+    def __init__(self, path: str | os.PathLike | None = None, trust_mtime: bool = True):
+        self.path = os.fspath(path) if path is not None else None
+        self.trust_mtime = trust_mtime
+        self._entries: dict[str, dict] = {}
+        if self.path is not None and os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                self._entries = decode_json(f.read())
+        self._lock = threading.Lock()
+        self._stats = {"uploaded": 0, "skipped": 0}
+
+    def stats(self) -> dict[str, int]:
+        """Number of uploads made and skipped through this manifest"""
+        with self._lock:
+            return dict(self._stats)
+
+    def get(self, layer_id: str) -> dict | None:
+        """The digest, size and mtime_ns of the file last uploaded to a layer"""
+        with self._lock:
+            entry = self._entries.get(layer_id)
+        return dict(entry) if entry is not None else None
+
+    def forget(self, layer_id: str):
+        """Drop the record of a layer, so that its next refresh uploads"""
+        with self._lock:
+            self._entries.pop(layer_id, None)
+            self._save()
+
+    def begin(self, layer_id: str, file_name: str) -> "ManifestUpload | None":
+        """Check a file against the record of the layer it is uploaded to
+
+        Returns:
+            None if the file is unchanged and the upload can be skipped, or
+            else the pending upload, to `commit` once it succeeded
+        """
+        stat = os.stat(file_name)
+        entry = self.get(layer_id)
+        upload = ManifestUpload(self, layer_id, file_name, stat)
+        if entry is not None and entry["size"] == stat.st_size:
+            if self.trust_mtime and entry["mtime_ns"] == stat.st_mtime_ns:
+                self._skipped()
+                return None
+            upload.digest = file_digest(file_name)
+            if upload.digest == entry["digest"]:
+                # Record the new mtime so the file isn't hashed again next time
+                upload.commit(uploaded=False)
+                self._skipped()
+                return None
+        return upload
+
+    def _skipped(self):
+        with self._lock:
+            self._stats["skipped"] += 1
+
+    def _record(self, layer_id: str, entry: dict, uploaded: bool):
+        with self._lock:
+            self._entries[layer_id] = entry
+            if uploaded:
+                self._stats["uploaded"] += 1
+            self._save()
+
+    def _save(self):
+        """Replace the manifest file, so that it is never left half written"""
+        if self.path is None:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_name = tempfile.mkstemp(dir=directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(encode_json(self._entries))
+            os.replace(temp_name, self.path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temp_name)
+            raise
+
+
+class ManifestUpload:
+    """An upload of a changed file, recorded in the manifest once committed"""
+
+    def __init__(
+        self,
+        manifest: UploadManifest,
+        layer_id: str,
+        file_name: str,
+        stat: os.stat_result,
+    ):
+        self.manifest = manifest
+        self.layer_id = layer_id
+        self.file_name = file_name
+        self.stat = stat
+        self.digest: str | None = None
+        self._reader: HashingReader | None = None
+
+    def reader(self, file_obj: typing.IO[bytes]) -> "typing.IO[bytes] | HashingReader":
+        """Wrap the file being uploaded, to hash it as it is read"""
+        if self.digest is not None:
+            return file_obj
+        # A retried upload reads the file again from the start
+        self._reader = HashingReader(file_obj)
+        return self._reader
+
+    def commit(self, uploaded: bool = True):
+        """Record the file as the one uploaded to the layer"""
+        if self.digest is None:
+            reader = self._reader
+            if reader is not None and reader.size == self.stat.st_size:
+                self.digest = reader.hexdigest()
+            else:
+                # Not streamed, e.g. because a zipped copy was uploaded
+                self.digest = file_digest(self.file_name)
+        entry = {
+            "digest": self.digest,
+            "size": self.stat.st_size,
+            "mtime_ns": self.stat.st_mtime_ns,
+        }
+        self.manifest._record(self.layer_id, entry, uploaded)
+
+
+class HashingReader:
+    """File wrapper computing the SHA-256 digest of the bytes read through it"""
+
+    def __init__(self, file_obj: typing.IO[bytes]):
+        self.file_obj = file_obj
+        self.size = 0
+        self._digest = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.file_obj.read(size)
+        self._digest.update(data)
+        self.size += len(data)
+        return data
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+    def __getattr__(self, name):
+        return getattr(self.file_obj, name)
+
+
+def file_digest(file_name: str) -> str:
+    """SHA-256 digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_name, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,10 +1,9 @@
 """Maps"""
 
-import json
-
 from urllib.parse import urljoin
 
-from .api import make_request, BASE_URL
+from .api import BASE_URL, load_json, make_request
+from .models import Map, load_model
 from .util import deprecated
 
 
@@ -83,7 +82,7 @@ def create_map(
         json=json_args,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def delete_map(map_id: str, api_token: str | None = None):
@@ -95,14 +94,25 @@ def delete_map(map_id: str, api_token: str | None = None):
     )
 
 
-def get_map(map_id: str, api_token: str | None = None):
-    """Get details of a map"""
+def get_map(map_id: str, api_token: str | None = None, typed: bool = False):
+    """Get details of a map
+
+    Args:
+        map_id: The ID of the map to get
+        api_token: Optional API token
+        typed: Whether to return a `Map` model instead of a dict
+
+    Returns:
+        The map, with its layers, layer groups and elements
+    """
     response = make_request(
         url=MAP.format(map_id=map_id),
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)
+    if typed:
+        return load_model(response, Map)
+    return load_json(response)
 
 
 @deprecated(reason="Please use `get_map` instead")
@@ -167,7 +177,7 @@ def update_map(
         json=json_args,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def move_map(
@@ -204,7 +214,7 @@ def move_map(
         json=json_args,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def create_embed_token(
@@ -231,7 +241,7 @@ def create_embed_token(
         method="POST",
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def add_source_layer(
@@ -257,7 +267,7 @@ def add_source_layer(
         json=source_layer_params,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def duplicate_map(
@@ -299,4 +309,4 @@ def duplicate_map(
         json=json_args,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
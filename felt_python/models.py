@@ -0,0 +1,239 @@
+"""Typed models of maps, layers and layer groups"""
+
+import typing
+
+from .codec import decode_json, encode_json, load_json
+
+
+M = typing.TypeVar("M", bound="Model")
+
+
+class Model:
+    """Base class of the models returned with `typed=True`
+
+    Known fields are slotted attributes, which take less memory than the
+    dicts the API functions return otherwise. Members of the response that
+    aren't known fields are kept in `extra`, so `to_dict` returns everything
+    that was received.
+
+    Rarely used nested fields, like the style of a layer, are kept as compact
+    JSON bytes, which take a fraction of the memory of the decoded dicts, and
+    only decoded when first accessed.
+    """
+
+    __slots__ = ("extra",)
+
+    _fields: typing.ClassVar[tuple[str, ...]] = ()
+    _nested: typing.ClassVar[dict[str, type["Model"]]] = {}
+    _lazy: typing.ClassVar[frozenset[str]] = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = tuple(cls.__slots__)
+        # Wrap the slots of lazy fields declared by this class
+        for name in cls._lazy.intersection(cls.__slots__):
+            setattr(cls, name, _LazyField(cls.__dict__[name]))
+
+    def __init__(self, **fields):
+        self.extra = {}
+        for name in self._fields:
+            setattr(self, name, fields.pop(name, None))
+        self.extra.update(fields)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "typing.Self":
+        """Build a model from the decoded JSON of an API response"""
+        obj = cls.__new__(cls)
+        fields = set(cls._fields)
+        obj.extra = {k: v for k, v in data.items() if k not in fields}
+        for name in cls._fields:
+            value = data.get(name)
+            if value is not None and name in cls._nested:
+                value = [cls._nested[name].from_dict(item) for item in value]
+            elif value is not None and name in cls._lazy:
+                value = _Encoded(encode_json(value))
+            setattr(obj, name, value)
+        return obj
+
+    @classmethod
+    def from_json(cls, data: bytes | str) -> "typing.Self":
+        """Build a model from the JSON of an API response"""
+        return cls.from_dict(decode_json(data))
+
+    def to_dict(self) -> dict:
+        """Convert back to the dict the API returned, leaving out None fields"""
+        data = {}
+        for name in self._fields:
+            value = getattr(self, name)
+            if value is None:
+                continue
+            if name in self._nested:
+                value = [item.to_dict() for item in value]
+            data[name] = value
+        data.update(self.extra)
+        return data
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        name = getattr(self, "name", None) or getattr(self, "title", None)
+        return f"{type(self).__name__}(id={self.id!r}, name={name!r})"
+
+
+class _Encoded:
+    """JSON of a lazily decoded field"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+
+class _LazyField:
+    """Descriptor decoding the JSON a slot holds when it is first read"""
+
+    def __init__(self, slot):
+        self.slot = slot
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = self.slot.__get__(obj, objtype)
+        if isinstance(value, _Encoded):
+            value = decode_json(value.data)
+            self.slot.__set__(obj, value)
+        return value
+
+    def __set__(self, obj, value):
+        self.slot.__set__(obj, value)
+
+
+class Layer(Model):
+    """A layer on a map"""
+
+    __slots__ = (
+        "caption",
+        "geometry_type",
+        "hide_from_legend",
+        "id",
+        "is_spreadsheet",
+        "legend_display",
+        "legend_visibility",
+        "links",
+        "metadata",
+        "name",
+        "ordering_key",
+        "progress",
+        "refresh_period",
+        "status",
+        "style",
+        "subtitle",
+        "tile_url",
+        "type",
+    )
+    _lazy: typing.ClassVar[frozenset[str]] = frozenset({"style"})
+
+    caption: str | None
+    geometry_type: str | None
+    hide_from_legend: bool | None
+    id: str
+    is_spreadsheet: bool | None
+    legend_display: str | None
+    legend_visibility: str | None
+    links: dict | None
+    metadata: dict | None
+    name: str | None
+    ordering_key: int | None
+    progress: float | None
+    refresh_period: str | None
+    status: str | None
+    style: dict | None
+    subtitle: str | None
+    tile_url: str | None
+    type: str | None
+
+
+class LayerGroup(Model):
+    """A group of layers on a map"""
+
+    __slots__ = (
+        "caption",
+        "id",
+        "layers",
+        "legend_visibility",
+        "links",
+        "name",
+        "ordering_key",
+        "subtitle",
+        "type",
+        "visibility_interaction",
+    )
+    _nested: typing.ClassVar[dict[str, type[Model]]] = {"layers": Layer}
+
+    caption: str | None
+    id: str
+    layers: list[Layer] | None
+    legend_visibility: str | None
+    links: dict | None
+    name: str | None
+    ordering_key: int | None
+    subtitle: str | None
+    type: str | None
+    visibility_interaction: str | None
+
+
+class Map(Model):
+    """A Felt map"""
+
+    __slots__ = (
+        "basemap",
+        "created_at",
+        "description",
+        "elements",
+        "id",
+        "layer_groups",
+        "layers",
+        "links",
+        "project_id",
+        "public_access",
+        "table_settings",
+        "thumbnail_url",
+        "title",
+        "type",
+        "url",
+        "viewer_permissions",
+        "visited_at",
+    )
+    _nested: typing.ClassVar[dict[str, type[Model]]] = {
+        "layers": Layer,
+        "layer_groups": LayerGroup,
+    }
+
+    basemap: str | None
+    created_at: str | None
+    description: str | None
+    elements: dict | None
+    id: str
+    layer_groups: list[LayerGroup] | None
+    layers: list[Layer] | None
+    links: dict | None
+    project_id: str | None
+    public_access: str | None
+    table_settings: dict | None
+    thumbnail_url: str | None
+    title: str | None
+    type: str | None
+    url: str | None
+    viewer_permissions: dict | None
+    visited_at: str | None
+
+
+def load_model(response: typing.IO[bytes], model: type[M]) -> M | list[M]:
+    """Decode a response into a model, or a list of models for a JSON array"""
+    data = load_json(response)
+    if isinstance(data, list):
+        return [model.from_dict(item) for item in data]
+    return model.from_dict(data)
@@ -0,0 +1,389 @@
+"""Keep-alive HTTP connection pool"""
+
+import collections
+import functools
+import http.client
+import io
+import ssl
+import threading
+import time
+import typing
+import urllib.error
+import urllib.parse
+import urllib.request
+
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 10
+
+# Errors that indicate a kept-alive connection was closed by the server while idle
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class Response(io.BytesIO):
+    """Fully buffered HTTP response
+
+    Behaves like the file-like object returned by `urllib.request.urlopen`, so it
+    can be passed to `json.load`, but its connection has already been released.
+    """
+
+    def __init__(self, url: str, status: int, reason: str, headers, body: bytes):
+        super().__init__(body)
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+
+    def getheader(self, name: str, default: str | None = None) -> str | None:
+        return self.headers.get(name, default)
+
+    def getcode(self) -> int:
+        return self.status
+
+    def geturl(self) -> str:
+        return self.url
+
+
+class StreamingResponse:
+    """HTTP response whose body is read from the connection on demand
+
+    Use as a context manager, or call `close`, to release the connection. If
+    `decoder` is set, e.g. to a `zlib.decompressobj`, reads return the body
+    decompressed with it.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        response: http.client.HTTPResponse,
+        release: typing.Callable[[], None] | None = None,
+    ):
+        self.url = url
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self.decoder = None
+        self._response = response
+        self._release = release
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def read(self, amt: int | None = None) -> bytes:
+        data = self._read(amt)
+        if self.decoder is None:
+            return data
+        # Compressed input may only produce output once more of it is read
+        while data:
+            if decoded := self.decoder.decompress(data):
+                return decoded
+            data = self._read(amt)
+        return self.decoder.flush()
+
+    def _read(self, amt: int | None) -> bytes:
+        try:
+            data = self._response.read(amt)
+            # Partial reads don't raise when the connection drops early
+            if amt and not data and self._response.length:
+                raise http.client.IncompleteRead(b"", self._response.length)
+        except (OSError, http.client.HTTPException) as exc:
+            self.close()
+            raise urllib.error.URLError(exc) from exc
+        return data
+
+    def iter_chunks(self, chunk_size: int) -> typing.Iterator[bytes]:
+        """Yield the body in chunks of at most `chunk_size` bytes"""
+        while chunk := self.read(chunk_size):
+            yield chunk
+
+    def getheader(self, name: str, default: str | None = None) -> str | None:
+        return self.headers.get(name, default)
+
+    def close(self):
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+        else:
+            self._response.close()
+
+
+class ConnectionPool:
+    """Thread-safe pool of HTTP/1.1 keep-alive connections, keyed by host
+
+    Args:
+        maxsize: Maximum number of idle connections kept per host. Connections
+            checked in while the host is full are closed.
+        idle_timeout: Seconds after which an idle connection is evicted instead
+            of being reused
+        timeout: Socket timeout in seconds for new connections
+        ssl_context: Optional SSL context used for HTTPS connections
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10,
+        idle_timeout: float = 30.0,
+        timeout: float | None = None,
+        ssl_context: ssl.SSLContext | None = None,
+    ):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.discarded = 0
+        self._idle: dict[tuple, collections.deque] = {}
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict[str, int]:
+        """Counters for connection reuse
+
+        `hits` are requests served by a reused connection, `misses` required a
+        new one, `evictions` were closed for being idle too long and `discarded`
+        were closed because the pool for their host was full.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "discarded": self.discarded,
+                "idle": sum(len(idle) for idle in self._idle.values()),
+            }
+
+    def clear(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn, _ in connections:
+                conn.close()
+
+    def urlopen(
+        self,
+        method: str,
+        url: str,
+        body: bytes | typing.Iterable[bytes] | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> Response:
+        """Send a request and return the buffered response
+
+        Redirects are followed and non-2xx responses raise
+        `urllib.error.HTTPError`, matching `urllib.request.urlopen`.
+        """
+        response = self._open(method, url, body, headers, stream=False)
+        assert isinstance(response, Response)
+        return response
+
+    def stream(
+        self,
+        method: str,
+        url: str,
+        body: bytes | typing.Iterable[bytes] | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> "StreamingResponse":
+        """Send a request and return a response whose body is read on demand
+
+        The connection is returned to the pool when the response is closed
+        after its body has been read completely.
+        """
+        response = self._open(method, url, body, headers, stream=True)
+        assert isinstance(response, StreamingResponse)
+        return response
+
+    def _open(self, method, url, body, headers, stream):
+        headers = dict(headers or {})
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(url)
+            if uses_proxy(parts):
+                return urllib_open(url, method, body, headers, stream)
+
+            key = pool_key(parts)
+            conn, http_response = self._send(key, parts, method, body, headers)
+            if stream and 200 <= http_response.status < 300:
+                return StreamingResponse(
+                    url,
+                    http_response,
+                    functools.partial(self._release, key, conn, http_response),
+                )
+
+            response = Response(
+                url,
+                http_response.status,
+                http_response.reason,
+                http_response.headers,
+                self._read(key, conn, http_response),
+            )
+            redirect = get_redirect(response, method, headers)
+            if redirect is None:
+                raise_for_status(response)
+                return response
+            url, method, headers = redirect
+            body = None
+
+        raise http_error(response, "Too many redirects")
+
+    def _send(self, key, parts, method, body, headers):
+        path = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        replayable = body is None or isinstance(body, bytes)
+        while True:
+            conn, reused = self._checkout(key)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                return conn, conn.getresponse()
+            except STALE_CONNECTION_ERRORS as exc:
+                conn.close()
+                if reused and replayable:
+                    continue
+                raise urllib.error.URLError(exc) from exc
+            except OSError as exc:
+                conn.close()
+                raise urllib.error.URLError(exc) from exc
+            except BaseException:
+                conn.close()
+                raise
+
+    def _read(self, key, conn, response: http.client.HTTPResponse) -> bytes:
+        try:
+            data = response.read()
+        except (OSError, http.client.HTTPException) as exc:
+            conn.close()
+            raise urllib.error.URLError(exc) from exc
+        except BaseException:
+            conn.close()
+            raise
+        self._release(key, conn, response)
+        return data
+
+    def _release(self, key, conn, response: http.client.HTTPResponse):
+        # A connection can only be reused once its response has been consumed
+        if response.isclosed() and not response.will_close:
+            self._checkin(key, conn)
+        else:
+            conn.close()
+
+    def _checkout(self, key) -> tuple[http.client.HTTPConnection, bool]:
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle:
+                conn, last_used = idle.pop()
+                if now - last_used > self.idle_timeout or conn.sock is None:
+                    self.evictions += 1
+                    conn.close()
+                    continue
+                self.hits += 1
+                return conn, True
+            self.misses += 1
+
+        scheme, host, port = key
+        if scheme == "https":
+            return (
+                http.client.HTTPSConnection(
+                    host, port, timeout=self.timeout, context=self.ssl_context
+                ),
+                False,
+            )
+        return http.client.HTTPConnection(host, port, timeout=self.timeout), False
+
+    def _checkin(self, key, conn: http.client.HTTPConnection):
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.setdefault(key, collections.deque())
+            while idle and now - idle[0][1] > self.idle_timeout:
+                idle.popleft()[0].close()
+                self.evictions += 1
+            if len(idle) >= self.maxsize:
+                self.discarded += 1
+                conn.close()
+                return
+            idle.append((conn, now))
+
+
+def get_redirect(
+    response: Response, method: str, headers: dict[str, str]
+) -> tuple[str, str, dict[str, str]] | None:
+    """Return the URL, method and headers to follow a redirect response with
+
+    Follows the same rules as `urllib.request.HTTPRedirectHandler`.
+    """
+    location = response.getheader("Location")
+    if response.status not in REDIRECT_CODES or not location:
+        return None
+    if not (
+        method in ("GET", "HEAD")
+        or (method == "POST" and response.status in (301, 302, 303))
+    ):
+        raise http_error(response)
+
+    headers = {
+        k: v
+        for k, v in headers.items()
+        if k.lower() not in ("content-type", "content-length")
+    }
+    return (
+        urllib.parse.urljoin(response.url, location),
+        "HEAD" if method == "HEAD" else "GET",
+        headers,
+    )
+
+
+def raise_for_status(response: Response):
+    """Raise `urllib.error.HTTPError` for non-2xx responses"""
+    if not 200 <= response.status < 300:
+        raise http_error(response)
+
+
+def http_error(response: Response, reason: str | None = None):
+    return urllib.error.HTTPError(
+        response.url,
+        response.status,
+        reason or response.reason,
+        response.headers,
+        io.BytesIO(response.getvalue()),
+    )
+
+
+def pool_key(parts: urllib.parse.SplitResult) -> tuple[str, str, int]:
+    """Host a connection can be shared for"""
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https"):
+        raise ValueError(f"Unsupported URL scheme: {parts.scheme}")
+    port = parts.port or (443 if scheme == "https" else 80)
+    return scheme, parts.hostname or "", port
+
+
+def uses_proxy(parts: urllib.parse.SplitResult) -> bool:
+    """Whether urllib would send a request for this URL through a proxy"""
+    proxies = urllib.request.getproxies()
+    if parts.scheme not in proxies:
+        return False
+    return not urllib.request.proxy_bypass(parts.hostname or "")
+
+
+def urllib_open(url, method, body, headers, stream=False):
+    """Fall back to urllib so that proxy settings are honoured"""
+    if body is not None and not isinstance(body, bytes):
+        body = b"".join(body)
+    request = urllib.request.Request(url, data=body, headers=headers, method=method)
+    response = urllib.request.urlopen(request)
+    if stream:
+        return StreamingResponse(response.url, response)
+    with response:
+        return Response(
+            response.url,
+            response.status,
+            response.reason,
+            response.headers,
+            response.read(),
+        )
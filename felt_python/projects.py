@@ -1,10 +1,8 @@
 """Projects"""
 
-import json
-
 from urllib.parse import urljoin
 
-from .api import make_request, BASE_URL
+from .api import BASE_URL, load_json, make_request
 
 
 PROJECTS = urljoin(BASE_URL, "projects/")
@@ -22,7 +20,7 @@ def list_projects(workspace_id: str | None = None, api_token: str | None = None)
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def create_project(name: str, visibility: str, api_token: str | None = None):
@@ -43,7 +41,7 @@ def create_project(name: str, visibility: str, api_token: str | None = None):
         json={"name": name, "visibility": visibility},
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def get_project(project_id: str, api_token: str | None = None):
@@ -53,7 +51,7 @@ def get_project(project_id: str, api_token: str | None = None):
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def update_project(
@@ -85,7 +83,7 @@ def update_project(
         json=json_args,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def delete_project(project_id: str, api_token: str | None = None):
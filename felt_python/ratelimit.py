@@ -0,0 +1,234 @@
+"""Client-side rate limiting of API requests"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+import typing
+
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+from .retry import parse_retry_after
+
+
+class RateLimiter:
+    """Token bucket limiting the request rate and concurrency per API token
+
+    Requests wait, blocking the thread or awaiting in async code, until the
+    bucket for their token has capacity. With `adaptive`, the limiter also
+    follows the rate limit headers of responses: it never assumes more
+    capacity than the server reports as remaining, and pauses until the
+    reset time once it is exhausted or a 429 asks to retry later.
+
+    A limiter can be shared by clients in several threads. To share the
+    request rate between processes, pass the same `path` to each of them; the
+    bucket state is then kept in that file under an exclusive lock. The
+    concurrency cap always applies per process.
+
+    Args:
+        rate: Sustained requests per second. None disables the rate cap.
+        burst: Number of requests that can be sent at once after being idle.
+            Defaults to one second worth of requests.
+        max_concurrent: Maximum number of requests in flight. None disables
+            the concurrency cap.
+        adaptive: Whether to follow rate limit response headers
+        path: File in which to share the bucket state between processes.
+            Requires `fcntl`, so isn't supported on Windows.
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: int | None = None,
+        max_concurrent: int | None = None,
+        adaptive: bool = True,
+        path: str | os.PathLike | None = None,
+    ):
+        if path is not None and fcntl is None:
+            raise RuntimeError(
+                "Sharing a rate limit through `path` requires fcntl, "
+                "which is not available on this platform"
+            )
+        self.rate = rate
+        self.burst = burst or max(1, int(rate or 1))
+        self.max_concurrent = max_concurrent
+        self.adaptive = adaptive
+        self.path = path
+        self.throttled = 0
+        self.waited = 0.0
+        self._buckets: dict[str, list[float]] = {}
+        self._in_flight: dict[str, int] = {}
+        self._waiters: dict[str, list[typing.Callable[[], None]]] = {}
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict[str, float]:
+        """Number of requests that had to wait and the total seconds waited"""
+        with self._lock:
+            return {"throttled": self.throttled, "waited": self.waited}
+
+    def acquire(self, key: str):
+        """Block until a request for `key` may be sent"""
+        while self.max_concurrent is not None:
+            event = threading.Event()
+            if self._try_slot(key, event.set):
+                break
+            event.wait()
+        delay = self._reserve(key)
+        if delay > 0:
+            try:
+                time.sleep(delay)
+            except BaseException:
+                self.release(key)
+                raise
+
+    async def acquire_async(self, key: str):
+        """Wait until a request for `key` may be sent"""
+        loop = asyncio.get_running_loop()
+        while self.max_concurrent is not None:
+            future = loop.create_future()
+
+            def wake(future=future):
+                loop.call_soon_threadsafe(_set_result, future)
+
+            if self._try_slot(key, wake):
+                break
+            await future
+        try:
+            if self.path is None:
+                delay = self._reserve(key)
+            else:
+                # Locking and reading the shared file would block the loop
+                delay = await asyncio.to_thread(self._reserve, key)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            self.release(key)
+            raise
+
+    def release(self, key: str, headers=None, status: int | None = None):
+        """Mark a request for `key` as finished
+
+        Args:
+            key: Key the request was acquired with
+            headers: Response headers, used to adapt to the server's limits
+            status: HTTP status of the response
+        """
+        if self.adaptive and headers is not None:
+            self._update(key, headers, status)
+        if self.max_concurrent is None:
+            return
+        with self._lock:
+            self._in_flight[key] -= 1
+            waiters = self._waiters.pop(key, [])
+        # Every waiter retries, so none is lost if one has been cancelled
+        for wake in waiters:
+            wake()
+
+    async def release_async(self, key: str, headers=None, status: int | None = None):
+        """Mark a request for `key` as finished, see `release`"""
+        shared = self.adaptive and headers is not None and self.path is not None
+        try:
+            if shared:
+                await asyncio.to_thread(self._update, key, headers, status)
+        finally:
+            self.release(key, None if shared else headers, status)
+
+    def _try_slot(self, key: str, wake: typing.Callable[[], None]) -> bool:
+        assert self.max_concurrent is not None
+        with self._lock:
+            in_flight = self._in_flight.get(key, 0)
+            if in_flight < self.max_concurrent:
+                self._in_flight[key] = in_flight + 1
+                return True
+            self._waiters.setdefault(key, []).append(wake)
+            return False
+
+    def _reserve(self, key: str) -> float:
+        """Take a token and return how long to wait before it is available"""
+        with self._bucket(key) as bucket:
+            tokens, updated, blocked_until = bucket
+            now = time.time()
+            delay = max(0.0, blocked_until - now)
+            if self.rate is not None:
+                tokens = min(self.burst, tokens + (now - updated) * self.rate) - 1
+                # Tokens may go negative: later requests queue behind this one
+                delay = max(delay, -tokens / self.rate)
+            bucket[:] = [tokens, now, blocked_until]
+
+        if delay > 0:
+            with self._lock:
+                self.throttled += 1
+                self.waited += delay
+        return delay
+
+    def _update(self, key: str, headers, status: int | None):
+        remaining = _header_number(
+            headers, "RateLimit-Remaining", "X-RateLimit-Remaining"
+        )
+        reset = _header_number(headers, "RateLimit-Reset", "X-RateLimit-Reset")
+        retry_after = None
+        if status == 429:
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+        if remaining is None and retry_after is None:
+            return
+
+        now = time.time()
+        # Some servers send the reset time as a timestamp rather than a delay
+        if reset is not None and reset > 1e9:
+            reset = max(0.0, reset - now)
+
+        with self._bucket(key) as bucket:
+            tokens, updated, blocked_until = bucket
+            if remaining is not None:
+                tokens = min(tokens, remaining)
+                if remaining < 1 and reset is not None:
+                    blocked_until = max(blocked_until, now + reset)
+            if retry_after is not None:
+                blocked_until = max(blocked_until, now + retry_after)
+            bucket[:] = [tokens, updated, blocked_until]
+
+    @contextlib.contextmanager
+    def _bucket(self, key: str) -> typing.Iterator[list[float]]:
+        """Lock and yield the [tokens, updated, blocked_until] state of a key"""
+        key = hashlib.sha256(key.encode()).hexdigest()[:16]
+        with self._lock:
+            if self.path is None:
+                yield self._buckets.setdefault(key, [self.burst, time.time(), 0.0])
+                return
+            with open(self.path, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                f.seek(0)
+                try:
+                    buckets = json.loads(f.read() or "{}")
+                except ValueError:
+                    buckets = {}
+                bucket = buckets.setdefault(key, [self.burst, time.time(), 0.0])
+                yield bucket
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(buckets))
+                f.flush()
+
+
+def _header_number(headers, *names: str) -> float | None:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except ValueError:
+            continue
+    return None
+
+
+def _set_result(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,113 @@
+"""Retry policy for API requests"""
+
+import email.utils
+import random
+import socket
+import threading
+import time
+import urllib.error
+
+
+# Methods that can be repeated without changing the result
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class Retry:
+    """Policy for retrying failed API requests with jittered exponential backoff
+
+    Idempotent requests are retried on connection errors and on the statuses in
+    `status_forcelist`. Other requests, like POSTs, are only retried when the
+    server cannot have acted on them: on 429 responses and on connections that
+    failed before the request was sent.
+
+    Args:
+        max_attempts: Total number of attempts, including the first one
+        backoff_factor: Base delay in seconds. The n-th retry waits up to
+            `backoff_factor * 2 ** (n - 1)` seconds.
+        max_backoff: Maximum delay in seconds between attempts
+        jitter: Whether to randomize delays between zero and the computed
+            backoff, which spreads out retries from concurrent clients
+        status_forcelist: HTTP statuses that are retried
+        allowed_methods: Methods that are retried on any retryable failure
+        respect_retry_after: Whether to wait for as long as the Retry-After
+            header of a response asks, up to `max_backoff`
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        jitter: bool = True,
+        status_forcelist: frozenset[int] | set[int] = RETRY_STATUSES,
+        allowed_methods: frozenset[str] | set[str] = IDEMPOTENT_METHODS,
+        respect_retry_after: bool = True,
+    ):
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.status_forcelist = frozenset(status_forcelist)
+        self.allowed_methods = frozenset(allowed_methods)
+        self.respect_retry_after = respect_retry_after
+        self.retries = 0
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict[str, int]:
+        """Number of retries performed and of requests that ran out of attempts"""
+        with self._lock:
+            return {"retries": self.retries, "exhausted": self.exhausted}
+
+    def get_delay(self, method: str, attempt: int, error: Exception) -> float | None:
+        """Return how long to wait before retrying a failed attempt
+
+        Returns None if the request should not be retried.
+        """
+        if not self._is_retryable(method, error):
+            return None
+        if attempt >= self.max_attempts:
+            with self._lock:
+                self.exhausted += 1
+            return None
+
+        with self._lock:
+            self.retries += 1
+
+        if self.respect_retry_after and isinstance(error, urllib.error.HTTPError):
+            retry_after = parse_retry_after(error.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+
+        backoff = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        return random.uniform(0, backoff) if self.jitter else backoff
+
+    def _is_retryable(self, method: str, error: Exception) -> bool:
+        if isinstance(error, urllib.error.HTTPError):
+            if error.code not in self.status_forcelist:
+                return False
+            # A rate limited request was not processed, so it is always safe
+            return method in self.allowed_methods or error.code == 429
+        if isinstance(error, urllib.error.URLError):
+            return method in self.allowed_methods or _not_sent(error)
+        return False
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _not_sent(error: urllib.error.URLError) -> bool:
+    """Whether a connection error happened before any of the request was sent"""
+    return isinstance(error.reason, (ConnectionRefusedError, socket.gaierror))
@@ -0,0 +1,119 @@
+"""Coalescing of identical concurrent calls"""
+
+import asyncio
+import threading
+import typing
+
+
+R = typing.TypeVar("R")
+
+
+class _Call:
+    __slots__ = ("done", "error", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: typing.Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Runs one call at a time per key, sharing its outcome with concurrent callers
+
+    While a call for a key is in flight, other threads calling `do` with the
+    same key wait for it and receive its result, or its exception, instead of
+    making the call again.
+    """
+
+    def __init__(self):
+        self._calls: dict[typing.Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "coalesced": 0}
+
+    def stats(self) -> dict[str, int]:
+        """Number of calls made and of callers that shared another's call"""
+        with self._lock:
+            return dict(self._stats)
+
+    def do(
+        self, key: typing.Hashable, func: typing.Callable[..., R], *args
+    ) -> tuple[R, bool]:
+        """Call `func(*args)`, or wait for the call already in flight for `key`
+
+        Returns:
+            The result, and whether it was shared from another caller's call
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is None:
+                    call = self._calls[key] = _Call()
+                    self._stats["calls"] += 1
+                    break
+                self._stats["coalesced"] += 1
+            call.done.wait()
+            if call.error is None:
+                return call.result, True
+            if isinstance(call.error, Exception):
+                raise call.error
+            # The call was interrupted, e.g. by KeyboardInterrupt, try again
+
+        try:
+            call.result = func(*args)
+            return call.result, False
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """The asyncio counterpart of `SingleFlight`, for calls in one event loop"""
+
+    def __init__(self):
+        self._calls: dict[typing.Hashable, asyncio.Future] = {}
+        self._stats = {"calls": 0, "coalesced": 0}
+
+    def stats(self) -> dict[str, int]:
+        """Number of calls made and of callers that shared another's call"""
+        return dict(self._stats)
+
+    async def do(
+        self,
+        key: typing.Hashable,
+        func: typing.Callable[..., typing.Awaitable[R]],
+        *args,
+    ) -> tuple[R, bool]:
+        """Await `func(*args)`, or the call already in flight for `key`
+
+        Returns:
+            The result, and whether it was shared from another caller's call
+        """
+        while (future := self._calls.get(key)) is not None:
+            self._stats["coalesced"] += 1
+            # Unlike awaiting the future, this doesn't cancel it if we are
+            await asyncio.wait({future})
+            if not future.cancelled():
+                return future.result(), True
+            # The caller making the call was cancelled, try again
+
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        self._stats["calls"] += 1
+        try:
+            result = await func(*args)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Retrieve it so that asyncio doesn't warn when nobody else waits
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
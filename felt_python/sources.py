@@ -1,10 +1,8 @@
 """Sources"""
 
-import json
-
 from urllib.parse import urljoin
 
-from .api import make_request, BASE_URL
+from .api import BASE_URL, load_json, make_request
 
 
 SOURCES = urljoin(BASE_URL, "sources")
@@ -23,7 +21,7 @@ def list_sources(workspace_id: str | None = None, api_token: str | None = None):
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def create_source(
@@ -53,7 +51,7 @@ def create_source(
         json=json_payload,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def get_source(source_id: str, api_token: str | None = None):
@@ -63,7 +61,7 @@ def get_source(source_id: str, api_token: str | None = None):
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def update_source(
@@ -99,7 +97,7 @@ def update_source(
         json=json_payload,
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
 
 
 def delete_source(source_id: str, api_token: str | None = None):
@@ -122,4 +120,4 @@ def sync_source(source_id: str, api_token: str | None = None):
         method="POST",
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
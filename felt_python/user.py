@@ -1,10 +1,8 @@
 """User"""
 
-import json
-
 from urllib.parse import urljoin
 
-from .api import make_request, BASE_URL
+from .api import BASE_URL, load_json, make_request
 
 
 USER = urljoin(BASE_URL, "user")
@@ -24,4 +22,4 @@ def get_current_user(api_token: str | None = None):
         method="GET",
         api_token=api_token,
     )
-    return json.load(response)
+    return load_json(response)
@@ -0,0 +1,60 @@
+"""
+End-to-end test for the async Felt client.
+Uses felt_python.aio to run several API calls concurrently on one event loop.
+"""
+
+import asyncio
+import datetime
+import os
+import sys
+import unittest
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from felt_python import aio
+
+
+class FeltAsyncTest(unittest.TestCase):
+    """Test the async Felt API functions."""
+
+    def setUp(self):
+        if not os.environ.get("FELT_API_TOKEN"):
+            self.skipTest("FELT_API_TOKEN environment variable not set")
+
+        # Generate timestamp for unique resource names
+        self.timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    def test_async_workflow(self):
+        """Test creating a map and reading it concurrently."""
+        asyncio.run(self._async_workflow())
+
+    async def _async_workflow(self):
+        # Step 1: Create a map to work with
+        map_name = f"Async Test Map ({self.timestamp})"
+        print(f"Creating map: {map_name}...")
+
+        map_resp = await aio.create_map(title=map_name, public_access="private")
+        self.assertIn("id", map_resp)
+        map_id = map_resp["id"]
+
+        # Step 2: Read the map, its layers and layer groups concurrently
+        print("Fetching map details concurrently...")
+        map_details, layers, layer_groups = await asyncio.gather(
+            aio.get_map(map_id),
+            aio.list_layers(map_id),
+            aio.list_layer_groups(map_id),
+        )
+
+        self.assertEqual(map_details["title"], map_name)
+        self.assertEqual(layers, [])
+        self.assertEqual(layer_groups, [])
+
+        # Step 3: Clean up
+        await aio.delete_map(map_id)
+
+        print("\nAsync test completed successfully!")
+
+
+if __name__ == "__main__":
+    unittest.main()
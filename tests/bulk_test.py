@@ -0,0 +1,61 @@
+"""
+End-to-end test for the bulk executor.
+Runs reads for several maps concurrently and checks results keep their order.
+"""
+
+import datetime
+import os
+import sys
+import unittest
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from felt_python import bulk, create_map, delete_map, get_map, list_layers
+
+
+class FeltBulkTest(unittest.TestCase):
+    """Test running API calls with felt_python.bulk."""
+
+    def setUp(self):
+        if not os.environ.get("FELT_API_TOKEN"):
+            self.skipTest("FELT_API_TOKEN environment variable not set")
+
+        # Generate timestamp for unique resource names
+        self.timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    def test_bulk_workflow(self):
+        """Test fanning out reads over several maps."""
+        # Step 1: Create a few maps to read
+        print("Creating maps...")
+        map_ids = [
+            create_map(title=f"Bulk Test Map {i} ({self.timestamp})")["id"]
+            for i in range(3)
+        ]
+
+        # Step 2: Read them concurrently, along with a map that doesn't exist
+        calls = [bulk.Call(get_map, map_id) for map_id in map_ids]
+        calls += [(list_layers, map_id) for map_id in map_ids]
+        calls.append(bulk.Call(get_map, "does-not-exist"))
+
+        progress = []
+        results = bulk.run(calls, max_workers=4, progress=lambda *p: progress.append(p))
+        print(f"Bulk stats: {results.stats()}")
+
+        self.assertEqual(len(results), len(calls))
+        self.assertEqual([r["id"] for r in results.values[:3]], map_ids)
+        self.assertEqual(results.values[3:6], [[], [], []])
+        self.assertEqual(len(results.errors), 1)
+        self.assertIs(results.errors[0], results[-1])
+        self.assertEqual(progress[-1], (len(calls), len(calls)))
+        self.assertEqual(results.stats()["failed"], 1)
+
+        # Step 3: Clean up, also in bulk
+        results = bulk.run([(delete_map, map_id) for map_id in map_ids])
+        self.assertEqual(results.errors, [])
+
+        print("\nBulk test completed successfully!")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+End-to-end test for the Felt client session.
+Uses a FeltClient to check that methods share its token and connection pool.
+"""
+
+import concurrent.futures
+import datetime
+import os
+import sys
+import unittest
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from felt_python import FeltClient, ResponseCache
+
+
+class FeltClientTest(unittest.TestCase):
+    """Test the Felt API client session."""
+
+    def setUp(self):
+        if not os.environ.get("FELT_API_TOKEN"):
+            self.skipTest("FELT_API_TOKEN environment variable not set")
+
+        # Generate timestamp for unique resource names
+        self.timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    def test_client_workflow(self):
+        """Test making several calls through the same client."""
+        with FeltClient(api_token=os.environ["FELT_API_TOKEN"]) as client:
+            # Step 1: Get the current user
+            print("Getting current user...")
+            current_user = client.get_current_user()
+
+            self.assertIsNotNone(current_user)
+            self.assertIn("id", current_user)
+
+            # Step 2: Create a map and read it back
+            map_name = f"Client Test Map ({self.timestamp})"
+            print(f"Creating map: {map_name}...")
+
+            map_resp = client.create_map(title=map_name, public_access="private")
+            map_id = map_resp["id"]
+
+            self.assertEqual(client.get_map(map_id)["title"], map_name)
+            self.assertEqual(client.list_layers(map_id), [])
+
+            # Step 3: Calls after the first should reuse the open connection
+            stats = client.pool.stats()
+            print(f"Connection pool stats: {stats}")
+            self.assertGreater(stats["hits"], 0)
+
+            # Step 4: A cached client answers repeated reads locally until a
+            # mutation on the map invalidates them
+            cache = ResponseCache(ttl=60)
+            cached = FeltClient(
+                api_token=os.environ["FELT_API_TOKEN"], pool=client.pool, cache=cache
+            )
+            cached.get_map(map_id)
+            cached.get_map(map_id)
+            self.assertEqual(cache.stats()["hits"], 1)
+
+            new_title = f"{map_name} (updated)"
+            cached.update_map(map_id, title=new_title)
+            self.assertEqual(cached.get_map(map_id)["title"], new_title)
+
+            # Step 5: Concurrent identical reads through a coalescing client
+            # share requests, and each caller gets its own result
+            print("Reading the map concurrently...")
+            coalescing = FeltClient(
+                api_token=os.environ["FELT_API_TOKEN"], pool=client.pool, coalesce=True
+            )
+            with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+                maps = list(executor.map(coalescing.get_map, [map_id] * 8))
+            self.assertTrue(all(m["id"] == map_id for m in maps))
+            self.assertEqual(len({id(m) for m in maps}), len(maps))
+            stats = coalescing.single_flight.stats()
+            self.assertEqual(stats["calls"] + stats["coalesced"], len(maps))
+
+            client.delete_map(map_id)
+
+        print("\nClient test completed successfully!")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Tests for the JSON codecs and their fallbacks.
+Everything runs locally, so no API token is needed.
+"""
+
+import io
+import json
+import os
+import sys
+import unittest
+import unittest.mock
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from felt_python import codec as codec_module
+from felt_python.api import (
+    JSONCodec,
+    decode_json,
+    encode_json,
+    get_json_codec,
+    load_json,
+    set_json_codec,
+)
+
+
+DATA = {"name": "Café", "values": [1, 2.5, None, True], "big": 2**70}
+
+
+class FeltCodecTest(unittest.TestCase):
+    """Test selecting JSON codecs and falling back to the standard library."""
+
+    def setUp(self):
+        self.addCleanup(set_json_codec, get_json_codec())
+
+    def test_stdlib(self):
+        set_json_codec("json")
+        self.assertEqual(get_json_codec().name, "json")
+        encoded = encode_json(DATA)
+        # Compact UTF-8, as sent to the API
+        expected = json.dumps(DATA, ensure_ascii=False, separators=(",", ":"))
+        self.assertEqual(encoded, expected.encode())
+        self.assertEqual(decode_json(encoded), DATA)
+        self.assertEqual(decode_json(encoded.decode()), DATA)
+
+    def test_default_without_optional_packages(self):
+        with (
+            unittest.mock.patch.object(codec_module, "orjson", None),
+            unittest.mock.patch.object(codec_module, "msgspec", None),
+        ):
+            set_json_codec(None)
+            self.assertEqual(get_json_codec().name, "json")
+            with self.assertRaises(ImportError):
+                set_json_codec("orjson")
+            with self.assertRaises(ImportError):
+                set_json_codec("msgspec")
+        self.assertEqual(decode_json(encode_json(DATA)), DATA)
+
+    def test_fast_codecs(self):
+        for name in ("orjson", "msgspec"):
+            with self.subTest(name):
+                if getattr(codec_module, name) is None:
+                    self.skipTest(f"requires {name}")
+                set_json_codec(name)
+                self.assertEqual(get_json_codec().name, name)
+                # Integers beyond 64 bits fall back to the standard library
+                self.assertEqual(decode_json(encode_json(DATA)), DATA)
+
+    def test_custom_codec(self):
+        with self.assertRaises(ValueError):
+            set_json_codec("simplejson")
+
+        calls = []
+
+        def encode(obj):
+            calls.append(obj)
+            return json.dumps(obj).encode()
+
+        set_json_codec(JSONCodec("custom", encode, json.loads))
+        self.assertEqual(repr(get_json_codec()), "JSONCodec('custom')")
+        self.assertEqual(decode_json(encode_json([1])), [1])
+        self.assertEqual(calls, [[1]])
+
+    def test_load_json(self):
+        body = encode_json(DATA)
+        self.assertEqual(load_json(io.BytesIO(body)), DATA)
+
+        # Streamed responses are read rather than copied with getvalue
+        stream = io.BufferedReader(io.BytesIO(body))
+        self.assertEqual(load_json(stream), DATA)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Tests for compressing request bodies, responses and uploaded files.
+Everything runs locally, so no API token is needed.
+"""
+
+import gzip
+import io
+import os
+import sys
+import tempfile
+import unittest
+import unittest.mock
+import zipfile
+import zlib
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from felt_python import FeltClient
+from felt_python.compression import (
+    accept_encoding,
+    compress,
+    decompress,
+    decompressor,
+    should_zip,
+    zip_file,
+)
+
+
+DATA = b'{"type": "FeatureCollection", "features": []}' * 1000
+
+
+class FeltCompressionTest(unittest.TestCase):
+    """Test compression helpers and their fallbacks without zstandard."""
+
+    def test_gzip(self):
+        compressed = compress(DATA, "gzip")
+        self.assertLess(len(compressed), len(DATA))
+        self.assertEqual(gzip.decompress(compressed), DATA)
+        # Bodies are reproducible, as no timestamp is stored
+        self.assertEqual(compress(DATA, "gzip"), compressed)
+        self.assertEqual(decompress(compressed, "gzip"), DATA)
+        self.assertEqual(decompress(compressed, " X-GZIP "), DATA)
+
+    def test_decompress(self):
+        self.assertEqual(decompress(zlib.compress(DATA), "deflate"), DATA)
+        self.assertEqual(decompress(DATA, None), DATA)
+        self.assertEqual(decompress(DATA, "identity"), DATA)
+        self.assertIsNone(decompressor(None))
+        with self.assertRaises(ValueError):
+            decompress(DATA, "br")
+        with self.assertRaises(ValueError):
+            compress(DATA, "deflate")
+
+        # Responses are decompressed as they are read
+        decoder = decompressor("gzip")
+        compressed = compress(DATA, "gzip")
+        chunks = [compressed[i : i + 100] for i in range(0, len(compressed), 100)]
+        decoded = b"".join(decoder.decompress(chunk) for chunk in chunks)
+        self.assertEqual(decoded + decoder.flush(), DATA)
+
+    @unittest.mock.patch("felt_python.compression.zstandard", None)
+    def test_without_zstandard(self):
+        self.assertEqual(accept_encoding(), "gzip, deflate")
+        with self.assertRaises(ImportError):
+            compress(DATA, "zstd")
+        with self.assertRaises(ValueError):
+            decompress(DATA, "zstd")
+        self.assertNotIn("zstd", FeltClient().headers["Accept-Encoding"])
+
+    def test_request_body(self):
+        client = FeltClient(
+            api_token="test", compression="gzip", compression_threshold=1000
+        )
+        _, data, headers = client.prepare_request("https://felt.com", DATA)
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(data), DATA)
+
+        # Small bodies aren't worth compressing
+        _, data, headers = client.prepare_request("https://felt.com", {"a": 1})
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertEqual(data, b'{"a":1}')
+
+    def test_should_zip(self):
+        self.assertTrue(should_zip("points.csv"))
+        self.assertTrue(should_zip("points.geojson"))
+        self.assertFalse(should_zip("points.ZIP"))
+        self.assertFalse(should_zip("points.parquet"))
+        self.assertFalse(should_zip("archive.tar.gz"))
+
+    def test_zip_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "points.csv")
+            with open(path, "wb") as f:
+                f.write(DATA)
+            zip_path = os.path.join(directory, "points.zip")
+            zip_file(path, "points.csv", zip_path)
+            with zipfile.ZipFile(zip_path) as archive:
+                self.assertEqual(archive.read("points.csv"), DATA)
+
+        target = io.BytesIO()
+        zip_file(io.BytesIO(DATA), "points.csv", target)
+        self.assertLess(target.tell(), len(DATA))
+        with zipfile.ZipFile(target) as archive:
+            self.assertEqual(archive.namelist(), ["points.csv"])
+            self.assertEqual(archive.read("points.csv"), DATA)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,39 +3,40 @@ Deletion test for the Felt Python library.
 Creates and then deletes all types of resources to test deletion functionality.
 """
 
+import datetime
 import os
 import sys
-import unittest
 import time
-import datetime
+import unittest
+
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from felt_python import (
     # Maps
     create_map,
-    delete_map,
-    # Elements
-    list_elements,
-    upsert_elements,
+    create_project,
+    create_source,
     delete_element,
-    upsert_element_groups,
+    delete_layer,
+    delete_layer_group,
+    delete_map,
+    delete_project,
+    delete_source,
     # Layers
     get_layer,
-    upload_file,
-    delete_layer,
+    # Elements
+    list_elements,
     # Layer Groups
     list_layer_groups,
-    update_layer_groups,
-    delete_layer_group,
     # Projects
     list_projects,
-    create_project,
-    delete_project,
     # Sources
     list_sources,
-    create_source,
-    delete_source,
+    update_layer_groups,
+    upload_file,
+    upsert_element_groups,
+    upsert_elements,
 )
 
 
@@ -231,7 +232,7 @@ class FeltDeleteTest(unittest.TestCase):
         try:
             get_layer(map_id, layer_id)
             self.fail("Layer should have been deleted but was still accessible")
-        except Exception:
+        except Exception:  # noqa: BLE001 - any failure means the layer is gone
             print("Layer deleted successfully")
 
         # Delete the map
@@ -0,0 +1,111 @@
+"""
+Tests for the persistent disk cache of API responses.
+Serves the API from a local HTTP server, so no API token is needed.
+"""
+
+import asyncio
+import http.server
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+import unittest.mock
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from felt_python import DiskCache, FeltClient
+from felt_python.aio import AsyncFeltClient
+
+
+LIBRARY = {"layers": [{"id": "layer", "name": "Parks"}], "layer_groups": []}
+ETAG = '"library-v1"'
+
+
+class _LibraryHandler(http.server.BaseHTTPRequestHandler):
+    """Serves LIBRARY with an ETag, answering 304 when it is sent back"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps(LIBRARY).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FeltDiskCacheTest(unittest.TestCase):
+    """Test reusing stored responses across clients."""
+
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _LibraryHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/api/v2/"
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_dir = directory.name
+
+    def disk_cache(self) -> DiskCache:
+        disk_cache = DiskCache(self.cache_dir)
+        self.addCleanup(disk_cache.close)
+        return disk_cache
+
+    def test_reuse(self):
+        for hits in range(2):
+            disk_cache = self.disk_cache()
+            with FeltClient(
+                api_token="test", base_url=self.base_url, disk_cache=disk_cache
+            ) as client:
+                self.assertEqual(client.list_library_layers(source="felt"), LIBRARY)
+            stats = disk_cache.stats()
+            self.assertEqual((stats["hits"], stats["misses"]), (hits, 1 - hits))
+            self.assertEqual(stats["entries"], 1)
+        # The second client revalidated the stored copy
+        self.assertEqual(self.server.requests, [None, ETAG])
+
+    def test_reuse_async(self):
+        disk_cache = self.disk_cache()
+        threads = set()
+        get = disk_cache.get
+
+        def record_thread(*args):
+            threads.add(threading.current_thread())
+            return get(*args)
+
+        async def list_library():
+            async with AsyncFeltClient(
+                api_token="test", base_url=self.base_url, disk_cache=disk_cache
+            ) as client:
+                return await client.list_library_layers(source="felt")
+
+        with unittest.mock.patch.object(disk_cache, "get", record_thread):
+            for _ in range(2):
+                self.assertEqual(asyncio.run(list_library()), LIBRARY)
+        self.assertEqual(disk_cache.stats()["hits"], 1)
+        self.assertEqual(self.server.requests, [None, ETAG])
+        # Lookups ran in worker threads rather than on the event loop
+        self.assertTrue(threads)
+        self.assertNotIn(threading.current_thread(), threads)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Tests for streaming layer downloads to disk.
+Serves a file from a local HTTP server, so no API token is needed.
+"""
+
+import asyncio
+import http.server
+import os
+import re
+import sys
+import tempfile
+import threading
+import unittest
+import unittest.mock
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from felt_python import FeltClient, api
+from felt_python.aio import AsyncFeltClient
+from felt_python.aio import api as aio_api
+from felt_python.aio.layers import _download_file as _download_file_async
+from felt_python.layers import _download_file
+
+
+DATA = os.urandom(300_000)
+
+
+class _FileHandler(http.server.BaseHTTPRequestHandler):
+    """Serves DATA, honouring Range headers unless the server is told not to"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(self.headers.get("Range"))
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range") or "")
+        if match is None or not self.server.honour_ranges:
+            self._send(200, DATA)
+            return
+        start = int(match[1])
+        end = min(int(match[2] or len(DATA) - 1), len(DATA) - 1)
+        if start >= len(DATA):
+            self._send(416, b"", {"Content-Range": f"bytes */{len(DATA)}"})
+            return
+        content_range = f"bytes {start}-{end}/{len(DATA)}"
+        self._send(206, DATA[start : end + 1], {"Content-Range": content_range})
+
+    def _send(self, status: int, body: bytes, headers: dict | None = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FeltDownloadTest(unittest.TestCase):
+    """Test resumable and ranged downloads against a local server."""
+
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _FileHandler)
+        self.server.requests = []
+        self.server.honour_ranges = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/layer.gpkg"
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file_name = os.path.join(directory.name, "layer.gpkg")
+
+        client = FeltClient(api_token="test")
+        self.addCleanup(client.close)
+        token = api.current_client.set(client)
+        self.addCleanup(api.current_client.reset, token)
+
+    def read(self) -> bytes:
+        with open(self.file_name, "rb") as f:
+            return f.read()
+
+    def test_download(self):
+        progress = []
+        path = _download_file(
+            self.url, self.file_name, progress=lambda *p: progress.append(p)
+        )
+        self.assertEqual(path, self.file_name)
+        self.assertEqual(self.read(), DATA)
+        self.assertFalse(os.path.exists(f"{self.file_name}.part"))
+        self.assertEqual(progress[-1][:2], (len(DATA), len(DATA)))
+
+    def test_resume(self):
+        with open(f"{self.file_name}.part", "wb") as f:
+            f.write(DATA[:1000])
+        _download_file(self.url, self.file_name, resume=True)
+        self.assertEqual(self.read(), DATA)
+        self.assertEqual(self.server.requests, ["bytes=1000-"])
+
+    def test_resume_complete_part(self):
+        with open(f"{self.file_name}.part", "wb") as f:
+            f.write(DATA)
+        _download_file(self.url, self.file_name, resume=True)
+        self.assertEqual(self.read(), DATA)
+
+    def test_resume_without_range_support(self):
+        self.server.honour_ranges = False
+        with open(f"{self.file_name}.part", "wb") as f:
+            f.write(b"stale")
+        _download_file(self.url, self.file_name, resume=True)
+        self.assertEqual(self.read(), DATA)
+
+    def test_resume_async(self):
+        with open(f"{self.file_name}.part", "wb") as f:
+            f.write(DATA[:1000])
+
+        async def download():
+            aio_api.current_client.set(AsyncFeltClient(api_token="test"))
+            return await _download_file_async(self.url, self.file_name, resume=True)
+
+        asyncio.run(download())
+        self.assertEqual(self.read(), DATA)
+        self.assertEqual(self.server.requests, ["bytes=1000-"])
+
+    @unittest.mock.patch("felt_python.layers.MIN_RANGE_SIZE", 100_000)
+    def test_parallel_ranges(self):
+        progress = []
+        _download_file(
+            self.url,
+            self.file_name,
+            parallel=4,
+            progress=lambda *p: progress.append(p),
+        )
+        self.assertEqual(self.read(), DATA)
+        # A probe, then no more ranges than fit MIN_RANGE_SIZE each
+        self.assertEqual(self.server.requests[0], "bytes=0-0")
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertEqual(progress[-1][:2], (len(DATA), len(DATA)))
+
+    @unittest.mock.patch("felt_python.layers.MIN_RANGE_SIZE", 100_000)
+    def test_parallel_without_range_support(self):
+        self.server.honour_ranges = False
+        _download_file(self.url, self.file_name, parallel=4)
+        self.assertEqual(self.read(), DATA)
+        # The probe received the whole file, which was kept as a single stream
+        self.assertEqual(self.server.requests, ["bytes=0-0"])
+
+    @unittest.mock.patch("felt_python.aio.layers.MIN_RANGE_SIZE", 100_000)
+    def test_parallel_ranges_async(self):
+        async def download():
+            aio_api.current_client.set(AsyncFeltClient(api_token="test"))
+            return await _download_file_async(self.url, self.file_name, parallel=4)
+
+        asyncio.run(download())
+        self.assertEqual(self.read(), DATA)
+        self.assertEqual(len(self.server.requests), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
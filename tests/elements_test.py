@@ -3,21 +3,31 @@ End-to-end test for the Felt Elements functionality.
 Uses the felt_python library to test elements creation, listing, updating, and grouping operations.
 """
 
+import asyncio
+import datetime
+import importlib.util
 import os
 import sys
 import unittest
-import datetime
+import unittest.mock
+
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from felt_python import (
     create_map,
-    list_elements,
-    list_element_groups,
+    diff_elements,
     get_element_group,
-    upsert_elements,
+    iter_element_group,
+    iter_elements,
+    list_element_groups,
+    list_elements,
+    sync_elements,
     upsert_element_groups,
+    upsert_elements,
+    upsert_elements_batched,
 )
+from felt_python.aio import sync_elements as sync_elements_async
 
 
 class FeltElementsTest(unittest.TestCase):
@@ -85,6 +95,17 @@ class FeltElementsTest(unittest.TestCase):
         self.assertEqual(len(elements["features"]), 2)
         print(f"Found {len(elements['features'])} elements")
 
+        # Streaming the elements yields the same features one at a time
+        streamed = list(iter_elements(map_id))
+        self.assertEqual(streamed, elements["features"])
+
+        # The columnar form holds the same features in NumPy arrays
+        if importlib.util.find_spec("numpy"):
+            columnar = list_elements(map_id, columnar=True)
+            self.assertEqual(len(columnar), 2)
+            self.assertEqual(columnar.coords.shape, (2, 2))
+            self.assertEqual(columnar[0]["geometry"], streamed[0]["geometry"])
+
         # Step 4: Update an element (Barcelona with blue color)
         print("Updating Barcelona element...")
         barcelona_element = next(
@@ -154,6 +175,9 @@ class FeltElementsTest(unittest.TestCase):
         self.assertEqual(len(group_elements["features"]), 2)
         print(f"Found {len(group_elements['features'])} elements in the group")
 
+        streamed = list(iter_element_group(map_id, cities_group_id))
+        self.assertEqual(len(streamed), 2)
+
         # Step 9: Create elements directly with group assignment
         print("Creating park elements with direct group assignment...")
         parks_group_id = all_groups[1]["id"]
@@ -193,8 +217,113 @@ class FeltElementsTest(unittest.TestCase):
             f"Created and assigned {len(parks_group_elements['features'])} elements to Parks group"
         )
 
+        # Step 10: Create many elements in small concurrent batches
+        print("Creating elements in batches...")
+        grid_features = (
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [-4 + x / 10, 40 + y / 10],
+                },
+                "properties": {"name": f"Grid {x},{y}"},
+            }
+            for x in range(5)
+            for y in range(5)
+        )
+
+        batched_response = upsert_elements_batched(
+            map_id, grid_features, max_features=10, max_workers=2
+        )
+
+        self.assertEqual(len(batched_response["features"]), 25)
+        self.assertEqual(
+            batched_response["features"][7]["properties"]["name"], "Grid 1,2"
+        )
+        self.assertEqual(len(list_elements(map_id)["features"]), 29)
+        print(f"Created {len(batched_response['features'])} elements in batches")
+
+        # Step 11: Sync elements keyed by a property, changing only what differs
+        print("Syncing elements...")
+
+        def stations(moved: bool = False, count: int = 6):
+            return [
+                {
+                    "type": "Feature",
+                    "geometry": {
+                        "type": "Point",
+                        "coordinates": [-3.7 + i / 100, 40.4 + (i == 0 and moved)],
+                    },
+                    "properties": {"name": f"Station {i}", "station_id": i},
+                }
+                for i in range(count)
+            ]
+
+        synced = sync_elements(map_id, stations(), key="station_id")
+        self.assertEqual((synced["created"], synced["updated"]), (6, 0))
+
+        diff = diff_elements(map_id, stations(), key="station_id")
+        self.assertEqual(diff["unchanged"], 6)
+        self.assertEqual((diff["upsert"], diff["delete"]), ([], []))
+
+        synced = sync_elements(map_id, stations(moved=True, count=5), key="station_id")
+        self.assertEqual(synced["updated"], 1)
+        self.assertEqual(synced["unchanged"], 4)
+        self.assertEqual(len(synced["delete"]), 1)
+        # Elements without a station ID are left alone
+        self.assertEqual(len(list_elements(map_id)["features"]), 34)
+
+        # A property removed from the features is removed from the elements
+        unnamed = stations(moved=True, count=5)
+        for feature in unnamed:
+            del feature["properties"]["name"]
+        diff = diff_elements(map_id, unnamed, key="station_id", delete=False)
+        self.assertEqual(diff["updated"], 5)
+        self.assertIsNone(diff["upsert"][0]["properties"]["name"])
+
         print(f"\nElements test completed successfully! Map URL: {response['url']}")
 
 
+class FeltElementsSyncTest(unittest.TestCase):
+    """Test failure handling of element syncs, without an API token."""
+
+    def feature(self, id: str, name: str) -> dict:
+        return {
+            "type": "Feature",
+            "id": id,
+            "geometry": {"type": "Point", "coordinates": [0, 0]},
+            "properties": {"name": name},
+        }
+
+    def test_duplicate_keys(self):
+        features = [self.feature("a", "Park"), self.feature("a", "Pond")]
+        with self.assertRaisesRegex(ValueError, "ID 'a'"):
+            diff_elements("map", features)
+        features = [self.feature("a", "Park"), self.feature("b", "Park")]
+        with self.assertRaisesRegex(ValueError, "'name' property 'Park'"):
+            diff_elements("map", features, key="name")
+
+    def test_cancelled_delete(self):
+        diff = {"upsert": [], "delete": ["a", "b"], "created": 0, "updated": 0}
+
+        async def diff_elements(*args):
+            return dict(diff)
+
+        async def delete_element(map_id, element_id, api_token=None):
+            if element_id == "b":
+                raise asyncio.CancelledError
+
+        with (
+            unittest.mock.patch(
+                "felt_python.aio.elements.diff_elements", diff_elements
+            ),
+            unittest.mock.patch(
+                "felt_python.aio.elements.delete_element", delete_element
+            ),
+            self.assertRaises(asyncio.CancelledError),
+        ):
+            asyncio.run(sync_elements_async("map", []))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -3,27 +3,34 @@ End-to-end test for the Felt Layers functionality.
 Uses the felt_python library to test layer creation, updating, styling and other operations.
 """
 
+import datetime
 import os
 import sys
-import unittest
+import tempfile
 import time
-import datetime
+import unittest
+import unittest.mock
+
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from felt_python import (
+    Layer,
+    create_custom_export,
     create_map,
+    exports,
+    get_custom_export_status,
+    get_export_link,
+    get_layer,
     list_layers,
-    upload_file,
-    upload_url,
     refresh_file_layer,
     refresh_url_layer,
-    get_layer,
     update_layer_style,
-    get_export_link,
     update_layers,
-    create_custom_export,
-    get_custom_export_status,
+    upload_file,
+    upload_files,
+    upload_url,
+    wait_for_layers,
 )
 
 
@@ -164,6 +171,16 @@ class FeltLayersTest(unittest.TestCase):
 
         self.assertEqual(updated_layer["style"]["color"], "red")
         self.assertEqual(updated_layer["style"]["size"], 20)
+
+        typed_layer = get_layer(map_id, layer_id, typed=True)
+
+        self.assertIsInstance(typed_layer, Layer)
+        self.assertEqual(typed_layer.id, layer_id)
+        self.assertEqual(typed_layer.style["color"], "red")
+        self.assertEqual(
+            typed_layer.to_dict(),
+            {k: v for k, v in updated_layer.items() if v is not None},
+        )
         print("Layer style updated successfully")
 
         # Step 7: Update multiple layers
@@ -251,8 +268,102 @@ class FeltLayersTest(unittest.TestCase):
             if i < max_polls - 1:  # Don't sleep on the last attempt
                 time.sleep(5)
 
+        # Step 10: Export through the export manager, which polls and
+        # downloads the file
+        print("Exporting with the export manager...")
+
+        with tempfile.TemporaryDirectory() as directory:
+            [future] = exports.export_layers(
+                map_id, [layer_id], "csv", directory=directory, timeout=300
+            )
+            file_name = future.result()
+            self.assertTrue(os.path.getsize(file_name) > 0)
+            print(f"Exported after {future.polls} status checks")
+
+        # Step 11: Upload several files at once, keeping their order
+        print("Uploading several files...")
+        fixtures = os.path.join(os.path.dirname(__file__), "fixtures")
+        results = upload_files(
+            map_id,
+            [
+                os.path.join(fixtures, "null-island-points.geojson"),
+                {
+                    "file_name": os.path.join(fixtures, "null-island-polygons-wkt.csv"),
+                    "layer_name": "Polygons Layer",
+                },
+            ],
+            max_workers=2,
+        )
+        self.assertEqual(results.errors, [])
+        layer_ids = [result.value["layer_id"] for result in results]
+        layers = wait_for_layers(map_id, layer_ids, timeout=max_wait_time)
+        self.assertEqual([layer["id"] for layer in layers], layer_ids)
+        self.assertEqual(layers[1]["name"], "Polygons Layer")
+
         print(f"\nLayers test completed successfully! Map URL: {response['url']}")
 
 
+class FeltWaitForLayersTest(unittest.TestCase):
+    """Test waiting for layers against canned listings, without an API token."""
+
+    def listings(self, *statuses: tuple[str, str]) -> list[list[dict]]:
+        return [
+            [{"id": "a", "status": a}, {"id": "b", "status": b}, {"id": "c"}]
+            for a, b in statuses
+        ]
+
+    @unittest.mock.patch("felt_python.layers.time.sleep")
+    def test_wait_for_layers(self, sleep):
+        listings = self.listings(
+            ("processing", "uploading"),
+            ("completed", "processing"),
+            ("completed", "failed"),
+        )
+        progress = []
+        with unittest.mock.patch(
+            "felt_python.layers.list_layers", side_effect=listings
+        ) as list_layers:
+            layers = wait_for_layers(
+                "map",
+                ["b", "a"],
+                poll_interval=1,
+                backoff=2,
+                progress=lambda *p: progress.append(p),
+            )
+        # One listing per check, for all layers
+        self.assertEqual(list_layers.call_count, 3)
+        self.assertEqual(
+            [sleep_call.args[0] for sleep_call in sleep.call_args_list], [1, 2]
+        )
+        # Failed layers are returned rather than raised, in the order asked for
+        self.assertEqual([layer["id"] for layer in layers], ["b", "a"])
+        self.assertEqual([layer["status"] for layer in layers], ["failed", "completed"])
+        self.assertEqual(progress, [(1, 2), (2, 2)])
+
+    @unittest.mock.patch("felt_python.layers.time.sleep")
+    def test_wait_for_layers_timeout(self, sleep):
+        listings = self.listings(("completed", "processing"))
+        with (
+            unittest.mock.patch("felt_python.layers.list_layers", side_effect=listings),
+            self.assertRaisesRegex(TimeoutError, r"\['b'\] on map map"),
+        ):
+            wait_for_layers("map", ["a", "b"], timeout=0)
+        sleep.assert_not_called()
+
+        # The last check comes no later than the timeout
+        listings = self.listings(*[("processing", "processing")] * 3)
+        with (
+            unittest.mock.patch("felt_python.layers.list_layers", side_effect=listings),
+            unittest.mock.patch(
+                "felt_python.layers.time.monotonic", side_effect=[0, 0, 9, 10]
+            ),
+            self.assertRaises(TimeoutError),
+        ):
+            wait_for_layers("map", ["a"], timeout=10, poll_interval=5)
+        self.assertEqual(
+            [sleep_call.args[0] for sleep_call in sleep.call_args_list], [5, 1]
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -3,20 +3,24 @@ End-to-end test for the Felt Library functionality.
 Uses the felt_python library to test library functions including listing and publishing layers.
 """
 
+import datetime
 import os
 import sys
-import unittest
+import tempfile
 import time
-import datetime
+import unittest
+
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from felt_python import (
-    list_library_layers,
+    DiskCache,
+    FeltClient,
     create_map,
-    upload_file,
     get_layer,
+    list_library_layers,
     publish_layer,
+    upload_file,
 )
 
 
@@ -66,6 +70,19 @@ class FeltLibraryTest(unittest.TestCase):
         for i, layer in enumerate(felt_library["layers"][:5]):
             print(f"Layer {i + 1}: {layer['name']} (ID: {layer['id']})")
 
+        # A client with a disk cache answers a later listing from its copy
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for hits in range(2):
+                with FeltClient(disk_cache=DiskCache(cache_dir)) as client:
+                    cached_library = client.list_library_layers(source="felt")
+                self.assertEqual(cached_library, felt_library)
+                stats = client.disk_cache.stats()
+                print(f"Disk cache: {stats}")
+                # The first client stores the listing, the second reuses it
+                self.assertEqual((stats["hits"], stats["misses"]), (hits, 1 - hits))
+                self.assertEqual(stats["entries"], 1)
+                client.disk_cache.close()
+
         # Step 3: Create a map with a layer and publish it to the library
         map_name = f"Library Test Map ({self.timestamp})"
         print(f"\nCreating map: {map_name}...")
@@ -0,0 +1,134 @@
+"""
+Tests for skipping refreshes of unchanged files with an upload manifest.
+Requests go to fakes, so no API token is needed.
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+import unittest.mock
+import urllib.error
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from felt_python import FeltClient, Retry, UploadManifest, api, refresh_file_layer
+from felt_python.manifest import file_digest
+
+
+PRESIGNED_UPLOAD = {
+    "url": "https://uploads.felt.com",
+    "presigned_attributes": {"key": "value"},
+    "layer_id": "layer",
+}
+
+
+class _Pool:
+    """Records the files sent to presigned uploads"""
+
+    def __init__(self):
+        self.files: list[bytes] = []
+        self.error: Exception | None = None
+
+    def urlopen(self, method, url, body, headers):
+        if self.error is not None:
+            raise self.error
+        # The body is the multipart preamble, the file chunks and the epilogue
+        chunks = list(body)
+        self.files.append(b"".join(chunks[1:-1]))
+
+
+class FeltUploadManifestTest(unittest.TestCase):
+    """Test refresh_file_layer with an UploadManifest."""
+
+    def setUp(self):
+        self.pool = _Pool()
+        client = FeltClient(api_token="test", retry=Retry(max_attempts=1))
+        client.pool = self.pool
+        token = api.current_client.set(client)
+        self.addCleanup(api.current_client.reset, token)
+
+        patcher = unittest.mock.patch(
+            "felt_python.layers.make_request",
+            side_effect=lambda **kwargs: io.BytesIO(
+                json.dumps(PRESIGNED_UPLOAD).encode()
+            ),
+        )
+        self.make_request = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.file_name = os.path.join(directory.name, "points.csv")
+        self.write(b"lat,lng\n0,0\n")
+
+    def write(self, data: bytes, mtime_ns: int = 1_000_000_000_000_000_000):
+        with open(self.file_name, "wb") as f:
+            f.write(data)
+        os.utime(self.file_name, ns=(mtime_ns, mtime_ns))
+
+    def refresh(self, manifest: UploadManifest) -> dict:
+        return refresh_file_layer("map", "layer", self.file_name, manifest=manifest)
+
+    def test_skip_unchanged(self):
+        manifest = UploadManifest()
+        self.assertEqual(self.refresh(manifest), PRESIGNED_UPLOAD)
+        # The digest was computed from the bytes as they were uploaded
+        self.assertEqual(manifest.get("layer")["digest"], file_digest(self.file_name))
+
+        skipped = {"layer_id": "layer", "skipped": True}
+        self.assertEqual(self.refresh(manifest), skipped)
+
+        # A touched file with the same contents is hashed, then skipped
+        self.write(b"lat,lng\n0,0\n", mtime_ns=2_000_000_000_000_000_000)
+        with unittest.mock.patch(
+            "felt_python.manifest.file_digest", wraps=file_digest
+        ) as digest:
+            self.assertEqual(self.refresh(manifest), skipped)
+            self.assertEqual(self.refresh(manifest), skipped)
+        # The new mtime was recorded, so the file was only hashed once
+        digest.assert_called_once()
+
+        # Changed contents of the same size are uploaded
+        self.write(b"lat,lng\n1,1\n", mtime_ns=3_000_000_000_000_000_000)
+        self.assertEqual(self.refresh(manifest), PRESIGNED_UPLOAD)
+
+        self.assertEqual(manifest.stats(), {"uploaded": 2, "skipped": 3})
+        self.assertEqual(len(self.pool.files), 2)
+        self.assertEqual(self.make_request.call_count, 2)
+
+    def test_failed_upload(self):
+        manifest = UploadManifest()
+        self.pool.error = urllib.error.URLError(ConnectionResetError())
+        with self.assertRaises(urllib.error.URLError):
+            self.refresh(manifest)
+        # Nothing was recorded, so the next refresh uploads
+        self.assertIsNone(manifest.get("layer"))
+        self.pool.error = None
+        self.assertEqual(self.refresh(manifest), PRESIGNED_UPLOAD)
+
+    def test_persisted(self):
+        path = os.path.join(self.directory, "manifest.json")
+        self.refresh(UploadManifest(path))
+
+        manifest = UploadManifest(path)
+        self.assertEqual(self.refresh(manifest)["skipped"], True)
+
+        # Without trusting mtimes, unchanged files are hashed every time
+        with unittest.mock.patch(
+            "felt_python.manifest.file_digest", wraps=file_digest
+        ) as digest:
+            self.refresh(UploadManifest(path, trust_mtime=False))
+        digest.assert_called_once()
+
+        manifest.forget("layer")
+        self.assertEqual(self.refresh(UploadManifest(path)), PRESIGNED_UPLOAD)
+        self.assertEqual(len(self.pool.files), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,23 +3,24 @@ End-to-end test for the Felt Map functionality.
 Uses the felt_python library to test the map creation, updates, and other map-related operations.
 """
 
+import datetime
 import os
 import sys
 import unittest
-import datetime
+
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from felt_python import (
+    create_embed_token,
     create_map,
+    delete_comment,
     delete_map,
-    get_map,
-    update_map,
+    duplicate_map,
     export_comments,
+    get_map,
     resolve_comment,
-    delete_comment,
-    create_embed_token,
-    duplicate_map,
+    update_map,
 )
 
 
@@ -0,0 +1,71 @@
+"""
+Tests for the typed models of maps, layers and layer groups.
+Models are built from local data, so no API token is needed.
+"""
+
+import io
+import os
+import sys
+import unittest
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from felt_python import Layer, LayerGroup, Map
+from felt_python.api import encode_json
+from felt_python.models import _Encoded, load_model
+
+
+LAYER = {
+    "id": "layer",
+    "name": "Parks",
+    "status": "completed",
+    "style": {"version": "2.1", "type": "simple", "paint": {"color": "green"}},
+    "new_field": [1, 2],
+}
+MAP = {
+    "id": "map",
+    "title": "Parks",
+    "layers": [LAYER],
+    "layer_groups": [{"id": "group", "name": "Group", "layers": [LAYER]}],
+}
+
+
+class FeltModelsTest(unittest.TestCase):
+    """Test building typed models and converting them back."""
+
+    def test_round_trip(self):
+        layer = Layer.from_dict(LAYER)
+        self.assertEqual(layer.name, "Parks")
+        self.assertIsNone(layer.caption)
+        self.assertEqual(layer.extra, {"new_field": [1, 2]})
+        self.assertEqual(layer.to_dict(), LAYER)
+        self.assertEqual(Layer.from_json(encode_json(LAYER)), layer)
+        self.assertEqual(repr(layer), "Layer(id='layer', name='Parks')")
+
+        map_ = Map.from_dict(MAP)
+        self.assertIsInstance(map_.layers[0], Layer)
+        self.assertIsInstance(map_.layer_groups[0], LayerGroup)
+        self.assertIsInstance(map_.layer_groups[0].layers[0], Layer)
+        self.assertEqual(map_.to_dict(), MAP)
+
+    def test_lazy_style(self):
+        layer = Layer.from_dict(LAYER)
+        slot = Layer.__dict__["style"].slot
+        # The style is kept encoded until it is read
+        self.assertIsInstance(slot.__get__(layer), _Encoded)
+        self.assertEqual(layer.style, LAYER["style"])
+        self.assertIs(slot.__get__(layer), layer.style)
+
+        layer.style = {"paint": {"color": "red"}}
+        self.assertEqual(layer.to_dict()["style"], {"paint": {"color": "red"}})
+        self.assertEqual(Layer(id="layer", style={}).style, {})
+
+    def test_load_model(self):
+        layers = load_model(io.BytesIO(encode_json([LAYER, LAYER])), Layer)
+        self.assertEqual(layers, [Layer.from_dict(LAYER)] * 2)
+        self.assertEqual(load_model(io.BytesIO(encode_json(MAP)), Map).id, "map")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,20 +3,21 @@ End-to-end test for the Felt Projects functionality.
 Uses the felt_python library to test project creation, updating, and related map operations.
 """
 
+import datetime
 import os
 import sys
 import unittest
-import datetime
+
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from felt_python import (
-    list_projects,
+    create_map,
     create_project,
     get_project,
-    update_project,
-    create_map,
+    list_projects,
     move_map,
+    update_project,
 )
 
 
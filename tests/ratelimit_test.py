@@ -0,0 +1,117 @@
+"""
+Tests for client-side rate limiting.
+Delays are checked without sleeping, so no API token is needed.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import unittest
+import unittest.mock
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from felt_python import RateLimiter
+
+
+class FeltRateLimitTest(unittest.TestCase):
+    """Test the RateLimiter token bucket, concurrency cap and adaptive mode."""
+
+    def setUp(self):
+        patcher = unittest.mock.patch("felt_python.ratelimit.time.sleep")
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def slept(self) -> list[float]:
+        return [call.args[0] for call in self.sleep.call_args_list]
+
+    def test_token_bucket(self):
+        limiter = RateLimiter(rate=10, burst=2)
+        for _ in range(3):
+            limiter.acquire("token")
+        # The burst is sent at once, the next request waits for a new token
+        self.assertEqual(len(self.slept()), 1)
+        self.assertAlmostEqual(self.slept()[0], 0.1, delta=0.02)
+        self.assertEqual(limiter.stats()["throttled"], 1)
+
+        # Each key has its own bucket
+        limiter.acquire("other")
+        self.assertEqual(len(self.slept()), 1)
+
+    def test_concurrency(self):
+        limiter = RateLimiter(max_concurrent=2)
+        limiter.acquire("token")
+        limiter.acquire("token")
+
+        acquired = threading.Event()
+
+        def acquire():
+            limiter.acquire("token")
+            acquired.set()
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        self.assertFalse(acquired.wait(0.2))
+        limiter.release("token")
+        self.assertTrue(acquired.wait(5))
+        thread.join()
+
+        # Other keys are not held up
+        limiter.acquire("other")
+
+    def test_adaptive(self):
+        limiter = RateLimiter()
+        limiter.acquire("token")
+        limiter.release("token", {"RateLimit-Remaining": "0", "RateLimit-Reset": "5"})
+        limiter.acquire("token")
+        self.assertAlmostEqual(self.slept()[-1], 5, delta=0.1)
+
+        limiter = RateLimiter()
+        limiter.release("token", {"Retry-After": "3"}, 429)
+        limiter.acquire("token")
+        self.assertAlmostEqual(self.slept()[-1], 3, delta=0.1)
+
+        # Retry-After only blocks when the request was rate limited
+        self.sleep.reset_mock()
+        limiter = RateLimiter()
+        limiter.release("token", {"Retry-After": "3"}, 503)
+        limiter.acquire("token")
+        self.assertEqual(self.slept(), [])
+
+        limiter = RateLimiter(adaptive=False)
+        limiter.release("token", {"RateLimit-Remaining": "0", "RateLimit-Reset": "5"})
+        limiter.acquire("token")
+        self.assertEqual(self.slept(), [])
+
+    def test_shared_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ratelimit.json")
+            first = RateLimiter(rate=1, burst=1, path=path)
+            second = RateLimiter(rate=1, burst=1, path=path)
+            first.acquire("token")
+            # The token taken by the first limiter is gone for the second one
+            second.acquire("token")
+            self.assertEqual(len(self.slept()), 1)
+            self.assertAlmostEqual(self.slept()[0], 1, delta=0.1)
+
+    def test_async(self):
+        limiter = RateLimiter(max_concurrent=1)
+
+        async def run():
+            await limiter.acquire_async("token")
+            waiter = asyncio.create_task(limiter.acquire_async("token"))
+            await asyncio.sleep(0.05)
+            self.assertFalse(waiter.done())
+            await limiter.release_async("token", {"RateLimit-Remaining": "10"})
+            await asyncio.wait_for(waiter, 5)
+            limiter.release("token")
+
+        asyncio.run(run())
+        self.assertEqual(self.slept(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Tests for the retry policy of API requests.
+The policy is pure logic, so no API token is needed.
+"""
+
+import email.message
+import email.utils
+import os
+import socket
+import sys
+import time
+import unittest
+import urllib.error
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from felt_python import Retry
+from felt_python.retry import parse_retry_after
+
+
+def http_error(code: int, retry_after: str | None = None) -> urllib.error.HTTPError:
+    headers = email.message.Message()
+    if retry_after is not None:
+        headers["Retry-After"] = retry_after
+    return urllib.error.HTTPError("https://felt.com", code, "Error", headers, None)
+
+
+class FeltRetryTest(unittest.TestCase):
+    """Test the Retry policy."""
+
+    def test_backoff(self):
+        retry = Retry(backoff_factor=0.5, max_backoff=3.0, jitter=False)
+        error = http_error(503)
+        delays = [retry.get_delay("GET", attempt, error) for attempt in (1, 2, 3)]
+        self.assertEqual(delays, [0.5, 1.0, 2.0])
+        # The fourth attempt is the last one by default
+        self.assertIsNone(retry.get_delay("GET", 4, error))
+        self.assertEqual(retry.stats(), {"retries": 3, "exhausted": 1})
+
+        # Delays stop growing at max_backoff
+        retry = Retry(max_attempts=10, max_backoff=3.0, jitter=False)
+        self.assertEqual(retry.get_delay("GET", 8, error), 3.0)
+
+        # Jittered delays stay between zero and the backoff
+        retry = Retry(backoff_factor=0.5, max_backoff=3.0, max_attempts=10)
+        for attempt in range(1, 10):
+            delay = retry.get_delay("GET", attempt, error)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(3.0, 0.5 * 2 ** (attempt - 1)))
+
+    def test_retry_after(self):
+        retry = Retry(max_backoff=30.0)
+        self.assertEqual(retry.get_delay("GET", 1, http_error(429, "7")), 7.0)
+        # A server asking for longer than max_backoff is waited for max_backoff
+        self.assertEqual(retry.get_delay("GET", 1, http_error(429, "120")), 30.0)
+        date = email.utils.formatdate(time.time() + 10, usegmt=True)
+        self.assertAlmostEqual(
+            retry.get_delay("GET", 1, http_error(503, date)), 10.0, delta=1.5
+        )
+
+        retry = Retry(respect_retry_after=False, jitter=False, backoff_factor=1.0)
+        self.assertEqual(retry.get_delay("GET", 1, http_error(429, "7")), 1.0)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("5"), 5.0)
+        self.assertEqual(parse_retry_after(" 5 "), 5.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after(""))
+        self.assertIsNone(parse_retry_after("soon"))
+        past = email.utils.formatdate(time.time() - 60, usegmt=True)
+        self.assertEqual(parse_retry_after(past), 0.0)
+
+    def test_retryable(self):
+        retry = Retry()
+        refused = urllib.error.URLError(ConnectionRefusedError())
+        unresolved = urllib.error.URLError(socket.gaierror())
+        reset = urllib.error.URLError(ConnectionResetError())
+
+        # Idempotent requests are retried on retryable statuses and errors
+        for method in ("GET", "PUT", "DELETE"):
+            self.assertIsNotNone(retry.get_delay(method, 1, http_error(503)))
+            self.assertIsNotNone(retry.get_delay(method, 1, reset))
+        # Others only when the server can't have acted on them
+        self.assertIsNone(retry.get_delay("POST", 1, http_error(503)))
+        self.assertIsNone(retry.get_delay("PATCH", 1, reset))
+        self.assertIsNotNone(retry.get_delay("POST", 1, http_error(429)))
+        self.assertIsNotNone(retry.get_delay("POST", 1, refused))
+        self.assertIsNotNone(retry.get_delay("POST", 1, unresolved))
+        # Client errors and other exceptions never are
+        self.assertIsNone(retry.get_delay("GET", 1, http_error(404)))
+        self.assertIsNone(retry.get_delay("GET", 1, ValueError()))
+
+        retry = Retry(status_forcelist={500}, allowed_methods={"POST"})
+        self.assertIsNotNone(retry.get_delay("POST", 1, http_error(500)))
+        self.assertIsNone(retry.get_delay("GET", 1, http_error(500)))
+        self.assertIsNone(retry.get_delay("POST", 1, http_error(503)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,22 +3,23 @@ End-to-end test for the Felt Sources functionality.
 Uses the felt_python library to test source creation, updating, and map integration.
 """
 
+import datetime
 import os
 import sys
-import unittest
 import time
-import datetime
+import unittest
+
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from felt_python import (
-    list_sources,
+    add_source_layer,
+    create_map,
     create_source,
     get_source,
-    update_source,
+    list_sources,
     sync_source,
-    create_map,
-    add_source_layer,
+    update_source,
 )
 
 
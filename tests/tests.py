@@ -6,17 +6,30 @@ import os
 import sys
 import unittest
 
+
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import test files
-from maps_test import FeltAPITest
-from elements_test import FeltElementsTest
-from layers_test import FeltLayersTest
+from aio_test import FeltAsyncTest
+from bulk_test import FeltBulkTest
+from client_test import FeltClientTest
+from codec_test import FeltCodecTest
+from compression_test import FeltCompressionTest
+from delete_test import FeltDeleteTest
+from diskcache_test import FeltDiskCacheTest
+from download_test import FeltDownloadTest
+from elements_test import FeltElementsSyncTest, FeltElementsTest
 from layer_groups_test import FeltLayerGroupsTest
+from layers_test import FeltLayersTest, FeltWaitForLayersTest
 from library_test import FeltLibraryTest
+from manifest_test import FeltUploadManifestTest
+from maps_test import FeltAPITest
+from models_test import FeltModelsTest
 from projects_test import FeltProjectsTest
+from ratelimit_test import FeltRateLimitTest
+from retry_test import FeltRetryTest
 from sources_test import FeltSourcesTest
-from delete_test import FeltDeleteTest
+from upload_test import FeltUploadTest
 
 
 if __name__ == "__main__":
@@ -34,12 +47,26 @@ if __name__ == "__main__":
     test_cases = [
         FeltAPITest,
         FeltElementsTest,
+        FeltElementsSyncTest,
         FeltLayersTest,
+        FeltWaitForLayersTest,
         FeltLayerGroupsTest,
         FeltLibraryTest,
         FeltProjectsTest,
         FeltSourcesTest,
         FeltDeleteTest,
+        FeltClientTest,
+        FeltAsyncTest,
+        FeltBulkTest,
+        FeltDownloadTest,
+        FeltRetryTest,
+        FeltRateLimitTest,
+        FeltUploadTest,
+        FeltCompressionTest,
+        FeltCodecTest,
+        FeltModelsTest,
+        FeltDiskCacheTest,
+        FeltUploadManifestTest,
     ]
 
     for test_case in test_cases:
@@ -0,0 +1,153 @@
+"""
+Tests for uploading serialized DataFrames.
+Uploads go to a fake connection pool, so no API token is needed.
+"""
+
+import asyncio
+import importlib.util
+import io
+import os
+import sys
+import unittest
+import unittest.mock
+import urllib.error
+import zipfile
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from felt_python import FeltClient, Retry, api, upload_dataframe
+from felt_python.aio import AsyncFeltClient
+from felt_python.aio import api as aio_api
+from felt_python.aio import upload_dataframe as upload_dataframe_async
+
+
+try:
+    import pandas  # type: ignore[import-untyped, import-not-found]
+except ImportError:
+    pandas = None
+
+PRESIGNED_UPLOAD = {
+    "url": "https://uploads.felt.com",
+    "presigned_attributes": {"key": "value"},
+    "layer_id": "layer",
+}
+
+
+class _Pool:
+    """Records the file sent by each upload, failing the first one if asked"""
+
+    def __init__(self, fail_first: bool = False):
+        self.files: list[bytes] = []
+        self.fail_first = fail_first
+
+    def record(self, chunks: list[bytes], headers: dict):
+        assert len(b"".join(chunks)) == int(headers["Content-Length"])
+        # The body is the multipart preamble, the file chunks and the epilogue
+        self.files.append(b"".join(chunks[1:-1]))
+        if self.fail_first and len(self.files) == 1:
+            raise urllib.error.URLError(ConnectionResetError())
+
+    def urlopen(self, method, url, body, headers):
+        self.record(list(body), headers)
+
+
+class _AsyncPool(_Pool):
+    async def urlopen(self, method, url, body, headers):
+        self.record([chunk async for chunk in body], headers)
+
+
+@unittest.skipIf(pandas is None, "requires pandas")
+class FeltUploadTest(unittest.TestCase):
+    """Test uploading DataFrames serialized into memory."""
+
+    def setUp(self):
+        self.frame = pandas.DataFrame({"name": ["a", "b", "c"] * 100, "value": 1.5})
+        self.pool = _Pool()
+        client = FeltClient(api_token="test", retry=Retry(backoff_factor=0.01))
+        client.pool = self.pool
+        token = api.current_client.set(client)
+        self.addCleanup(api.current_client.reset, token)
+
+        patcher = unittest.mock.patch(
+            "felt_python.layers._create_upload", return_value=PRESIGNED_UPLOAD
+        )
+        self.create_upload = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def upload(self, **kwargs):
+        # The frame is never written to a file in a temporary directory first
+        with unittest.mock.patch("felt_python.layers._write_frame_file") as write:
+            result = upload_dataframe(
+                "map", self.frame, "Layer", in_memory=True, **kwargs
+            )
+        write.assert_not_called()
+        return result
+
+    def test_csv(self):
+        self.assertEqual(self.upload(), PRESIGNED_UPLOAD)
+        self.assertEqual(self.pool.files, [self.frame.to_csv().encode()])
+
+    def test_zip(self):
+        self.upload(compression="zip")
+        with zipfile.ZipFile(io.BytesIO(self.pool.files[0])) as archive:
+            self.assertEqual(archive.namelist(), ["dataframe.csv"])
+            self.assertEqual(
+                archive.read("dataframe.csv"), self.frame.to_csv().encode()
+            )
+
+    @unittest.mock.patch("felt_python.layers.IN_MEMORY_MAX_SIZE", 100)
+    def test_spilled_buffer_is_resent(self):
+        # The buffer has spilled over to a temporary file and is sent again
+        self.pool.fail_first = True
+        self.upload()
+        self.assertEqual(self.pool.files, [self.frame.to_csv().encode()] * 2)
+
+    def test_parquet(self):
+        if importlib.util.find_spec("pyarrow") is None:
+            self.skipTest("requires pyarrow")
+        self.upload(format="parquet", compression="zstd")
+        frame = pandas.read_parquet(io.BytesIO(self.pool.files[0]))
+        pandas.testing.assert_frame_equal(frame, self.frame)
+
+    def test_serialization_error(self):
+        with (
+            unittest.mock.patch(
+                "felt_python.layers._write_frame", side_effect=ValueError
+            ),
+            unittest.mock.patch("felt_python.layers._discard_upload") as discard,
+            self.assertRaises(ValueError),
+        ):
+            self.upload()
+        # The layer created meanwhile is deleted
+        discard.assert_called_once_with("map", PRESIGNED_UPLOAD, None)
+        self.assertEqual(self.pool.files, [])
+
+    def test_async(self):
+        pool = _AsyncPool(fail_first=True)
+
+        async def create_upload(*args):
+            return PRESIGNED_UPLOAD
+
+        async def upload():
+            client = AsyncFeltClient(api_token="test", retry=Retry(backoff_factor=0.01))
+            client.pool = pool
+            aio_api.current_client.set(client)
+            return await upload_dataframe_async(
+                "map", self.frame, "Layer", compression="zip", in_memory=True
+            )
+
+        with unittest.mock.patch(
+            "felt_python.aio.layers._create_upload", create_upload
+        ):
+            self.assertEqual(asyncio.run(upload()), PRESIGNED_UPLOAD)
+        self.assertEqual(len(pool.files), 2)
+        self.assertEqual(pool.files[0], pool.files[1])
+        with zipfile.ZipFile(io.BytesIO(pool.files[0])) as archive:
+            self.assertEqual(
+                archive.read("dataframe.csv"), self.frame.to_csv().encode()
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()